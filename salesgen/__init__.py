@@ -0,0 +1,14 @@
+"""
+Synthetic electronics sales data generator.
+
+    from salesgen import SalesGenerator
+
+    paths, summary = SalesGenerator(seed=42).write('data/raw')
+
+Importing the package does no work: numpy, pandas and faker are only
+loaded once data is actually generated. The same options are available on
+the command line through ``python -m salesgen``.
+"""
+from .generator import SalesGenerator, output_paths
+
+__all__ = ['SalesGenerator', 'output_paths']
@@ -0,0 +1,14 @@
+"""
+Analysis of the generated sales data.
+
+The results of the analysis notebooks (monthly metrics, quarterly
+performance, day-of-week patterns, seasonal indices, product rankings)
+computed from pre-aggregated, mergeable summaries instead of repeated
+scans of every transaction. Like the generator, importing the package
+loads nothing heavy.
+"""
+from .cube import SalesCube, refresh_cube
+from .sketches import DistinctCounter
+from .topk import ProductTotals
+
+__all__ = ['DistinctCounter', 'ProductTotals', 'SalesCube', 'refresh_cube']
@@ -0,0 +1,41 @@
+"""Command-line entry point: ``python -m salesgen.analysis``."""
+import argparse
+import sys
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='salesgen.analysis',
+                                     description="Compute the sales analysis tables in one streaming pass.")
+    parser.add_argument('source',
+                        help="sales_transactions.csv, or the directory of a partitioned Parquet dataset")
+    parser.add_argument('--output-dir', default='data/processed',
+                        help="directory the result CSV files are written to")
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000,
+                        help="rows read from the input at a time")
+    parser.add_argument('--distinct', choices=['exact', 'approx'], default='exact',
+                        help="count distinct customers exactly or with HyperLogLog sketches")
+    parser.add_argument('--top', type=int, default=10,
+                        help="products in each ranking")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="scan the input partitions on this many processes; results are "
+                             "identical for any worker count")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    from .pipeline import analyze, write_results
+
+    tables = analyze(args.source, args.chunk_rows, args.distinct, n=args.top, workers=args.workers)
+    paths = write_results(tables, args.output_dir)
+    monthly = tables['monthly_summary']
+    print(f"Analyzed {monthly['transaction_count'].sum():,} transactions "
+          f"over {len(monthly)} months")
+    print("\nFiles created:")
+    for path in paths.values():
+        print(f"- {path}")
+    return 0
+
+
+sys.exit(main())
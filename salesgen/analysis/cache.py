@@ -0,0 +1,157 @@
+"""
+On-disk memoization of analysis results.
+
+Results are pickled into a directory, one file per entry, under a hash of
+what they were computed from: the fingerprints of the input partitions (see
+sources.py) and the parameters. Nothing is ever invalidated explicitly; a
+changed input gives a new key, and entries nobody asks for any more age out.
+Writing an entry evicts the least recently used ones (by file modification
+time, which every hit refreshes) until the cache fits in ``max_bytes``.
+
+Results are cached at two levels:
+
+* ``partition_cubes`` keeps a SalesCube per partition. When a partition
+  changes, such as the newest month being rewritten, only that partition is
+  scanned again. Rows appended to a CSV file are added to the cube of its
+  previous version. The cube of the whole input is merged from the
+  per-partition cubes, which costs a pass over the cubes, not the rows.
+* ``ResultCache.memoize`` keeps final results, keyed by ``data_key`` of the
+  whole input (they depend on every partition) plus their parameters.
+"""
+import hashlib
+import json
+import os
+import pickle
+
+from .cube import SalesCube
+from .sketches import DEFAULT_PRECISION
+from .sources import list_partitions
+
+DEFAULT_MAX_BYTES = 512 * 2 ** 20
+
+# Returned by ResultCache.get for keys it does not hold
+MISSING = object()
+
+
+def data_key(source):
+    """JSON-serializable fingerprint of every partition of ``source``."""
+    return [[partition.name, partition.fingerprint()] for partition in list_partitions(source)]
+
+
+class ResultCache:
+    """
+    Size-bounded, least-recently-used cache of pickled results in ``directory``.
+
+    Keys are any JSON-serializable values.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{digest}.pkl')
+
+    def get(self, key, default=MISSING):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        os.utime(path)
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._evict(keep=path)
+
+    def memoize(self, key, compute):
+        """The value cached under ``key``, calling ``compute()`` to fill it on a miss."""
+        value = self.get(key)
+        if value is MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.pkl'):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return sorted(entries)
+
+    def _evict(self, keep=None):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                os.remove(path)
+                total -= size
+
+    def size(self):
+        """Bytes held by the cache."""
+        return sum(size for _, size, _ in self._entries())
+
+    def clear(self):
+        for _, _, path in self._entries():
+            os.remove(path)
+
+
+def partition_cubes(source, cache, chunk_rows=1_000_000, distinct='exact', precision=DEFAULT_PRECISION,
+                    workers=None):
+    """
+    The SalesCube of the sales files at ``source``, merged from cubes cached per partition.
+
+    Only partitions without a cached cube are scanned, on ``workers``
+    processes if given (see parallel.py); a CSV file that grew since its
+    last cached cube only has its new rows scanned.
+    """
+    partitions = list_partitions(source)
+    fingerprints = [partition.fingerprint() for partition in partitions]
+    cubes, reads = [], []
+    for i, (partition, fingerprint) in enumerate(zip(partitions, fingerprints)):
+        cube = cache.get(['cube', partition.name, fingerprint, distinct, precision])
+        if cube is MISSING:
+            cube, offset = SalesCube(distinct, precision), 0
+            previous = cache.get(['latest', partition.name, distinct, precision], None)
+            if previous is not None and partition.extends(previous):
+                base = cache.get(['cube', partition.name, previous, distinct, precision])
+                if base is not MISSING:
+                    cube, offset = base, previous['size']
+            reads.append((i, offset))
+        cubes.append(cube)
+
+    if workers:
+        from .parallel import scan_parallel
+
+        rows = {partitions[i].name: i for i, _ in reads}
+        pieces = scan_parallel([(partitions[i], offset) for i, offset in reads], workers, chunk_rows,
+                               distinct, precision)
+        for partition, piece in pieces:
+            cubes[rows[partition.name]].merge(piece)
+    else:
+        for i, offset in reads:
+            # Up to the size the fingerprint was taken at, not to wherever the file has grown since
+            cubes[i].merge(SalesCube.scan(partitions[i], offset, partitions[i].size, chunk_rows, distinct,
+                                          precision))
+    for i, _ in reads:
+        cubes[i]._compact()
+        cache.put(['cube', partitions[i].name, fingerprints[i], distinct, precision], cubes[i])
+        cache.put(['latest', partitions[i].name, distinct, precision], fingerprints[i])
+
+    merged = SalesCube(distinct, precision)
+    for partition, fingerprint, cube in zip(partitions, fingerprints, cubes):
+        merged.merge(cube)
+        merged.partitions[partition.name] = fingerprint
+    return merged
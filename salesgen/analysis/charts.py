@@ -0,0 +1,122 @@
+"""
+Compact chart data for the notebook's Plotly figures.
+
+A Plotly figure embeds every point it draws, so a revenue trend over years
+of daily data makes a figure of thousands of points per trace. The series
+here are computed from a SalesCube (or a pre-aggregated table) rather than
+the transactions, and long time series are downsampled with
+Largest-Triangle-Three-Buckets (LTTB), which keeps the points that shape
+the line: peaks, troughs and turns. A trace never has more than
+``max_points`` points, so figure size and render time stay flat however
+many rows are underneath. Trend lines are fitted on the full series before
+downsampling.
+
+Everything is returned as plain lists and dicts, ready for Plotly or for
+JSON, and nothing here imports Plotly.
+"""
+import numpy as np
+
+from .cube import DAY_NAMES, MONTH_ABBREVIATIONS
+
+DEFAULT_MAX_POINTS = 1000
+GRAINS = ('day', 'week', 'month')
+
+
+def lttb(values, n_out, positions=None):
+    """
+    Indices of the ``n_out`` points of a series that LTTB keeps.
+
+    The first and last points are always kept. Every other bucket of the
+    series contributes the point forming the largest triangle with the point
+    kept from the previous bucket and the average of the next one.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:n_out], dtype=np.int64)
+    positions = np.arange(n, dtype=np.float64) if positions is None else np.asarray(positions, dtype=np.float64)
+
+    # n_out - 2 buckets over the points between the first and the last
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x, next_y = positions[end:next_end].mean(), values[end:next_end].mean()
+        x, y = positions[start:end], values[start:end]
+        area = np.abs((positions[previous] - next_x) * (y - values[previous])
+                      - (positions[previous] - x) * (next_y - values[previous]))
+        previous = start + int(np.argmax(area))
+        keep[i + 1] = previous
+    return keep
+
+
+def trend_series(labels, values, max_points=DEFAULT_MAX_POINTS):
+    """
+    A time series and its linear trend, downsampled to ``max_points`` points.
+
+    Returns a dict of 'x' (labels), 'y' (values) and 'trend' lists.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    steps = np.arange(len(values))
+    trend = np.poly1d(np.polyfit(steps, values, 1))(steps) if len(values) > 1 else values
+    keep = lttb(values, max_points)
+    return {'x': np.asarray(labels, dtype=object)[keep].tolist(),
+            'y': values[keep].tolist(),
+            'trend': trend[keep].tolist()}
+
+
+def revenue_series(cube, grain='month'):
+    """Revenue per 'day', 'week' (starting Monday) or 'month' as (labels, values)."""
+    import pandas as pd
+
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown grain {grain!r}; expected one of {GRAINS}")
+    if grain == 'month':
+        totals = cube.rollup(['year', 'month'])
+        labels = [f'{year}-{month:02d}' for year, month in totals.index]
+        return labels, (totals['revenue_cents'] / 100).tolist()
+
+    totals = cube.rollup('date_key')['revenue_cents']
+    dates = pd.to_datetime(totals.index.astype(str), format='%Y%m%d')
+    if grain == 'week':
+        totals = totals.groupby(dates.to_period('W-SUN').start_time).sum()
+        dates = totals.index
+    return dates.strftime('%Y-%m-%d').tolist(), (totals / 100).tolist()
+
+
+def heatmap_matrix(heatmap):
+    """
+    Month by weekday heatmap (see SalesCube.heatmap) as 'x', 'y' and 'z'
+    lists, with every calendar month present so rows match their labels.
+    """
+    heatmap = heatmap.reindex(index=range(1, 13), columns=DAY_NAMES, fill_value=0)
+    return {'x': list(DAY_NAMES), 'y': list(MONTH_ABBREVIATIONS), 'z': heatmap.to_numpy().tolist()}
+
+
+def bar_series(series):
+    """A pandas Series as 'x' (index) and 'y' (values) lists."""
+    return {'x': [str(label) for label in series.index], 'y': series.tolist()}
+
+
+def dashboard_data(cube, grain='month', max_points=DEFAULT_MAX_POINTS, n=10):
+    """Data of every dashboard chart, computed from ``cube``."""
+    quarterly = cube.quarterly_performance()['total_revenue']
+    quarterly.index = [f'Q{quarter}' for quarter in quarterly.index]
+    seasonal = cube.seasonal_indices()
+    seasonal.index = [MONTH_ABBREVIATIONS[month - 1] for month in seasonal.index]
+    top = cube.top_products(n, by='revenue')
+    return {
+        'revenue': trend_series(*revenue_series(cube, grain), max_points),
+        'quarterly': bar_series(quarterly),
+        'daily': bar_series(cube.daily_patterns()['total_sales']),
+        'seasonal': bar_series(seasonal),
+        'heatmap': heatmap_matrix(cube.heatmap()),
+        'top_products': {'x': top['total_sales'].tolist(),
+                         'y': top.index.get_level_values('product_name').astype(str).tolist(),
+                         'quantity': top['quantity'].tolist()},
+    }
@@ -0,0 +1,394 @@
+"""
+Pre-aggregated sales cube behind the analysis notebooks.
+
+Transactions are summed into one cell per (date_key, product_id, city,
+loyalty_tier) holding the transaction count, units sold, revenue and the
+total of unit prices. Money is accumulated in integer cents, so the sums do
+not depend on the order chunks arrive in, and cubes built from different
+partitions merge exactly. Distinct customers do not add up across cells;
+the cube counts them in DistinctCounters (see sketches.py) per month and
+per product, exactly or with HyperLogLog sketches, and quarterly counts
+merge the months of the quarter.
+
+The monthly, quarterly, day-of-week, seasonal, heatmap and top-N product
+results of main_analyis.ipynb are roll-ups of the cube, so they cost a
+pass over the cells instead of over every transaction. A cube saved next to
+the data remembers which partitions it has read (see sources.py), and
+``refresh`` only reads partitions that are new, or the rows appended to a
+CSV file since the last refresh.
+"""
+import heapq
+import itertools
+import json
+import os
+
+import numpy as np
+
+from .sketches import DEFAULT_PRECISION, DistinctCounter
+from .sources import list_partitions, partition_columns, plan_reads, read_partition
+
+DIMENSIONS = ['date_key', 'product_id', 'city', 'loyalty_tier']
+MEASURES = ['transactions', 'quantity', 'revenue_cents', 'unit_price_cents']
+INPUT_COLUMNS = ['date', 'date_key', 'product_id', 'product_name', 'quantity', 'unit_price',
+                 'total_sales', 'customer_id', 'city', 'loyalty_tier']
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+MONTH_ABBREVIATIONS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                       'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# Roll-ups available through SalesCube.rollup, derived from date_key
+CALENDAR_LEVELS = ['year', 'month', 'quarter', 'weekday', 'day_name']
+
+# Metric and companion column of each product ranking
+RANKINGS = {
+    'revenue': ('total_sales', 'quantity'),
+    'quantity': ('quantity', 'total_sales'),
+    'unit_price': ('unit_price', 'total_sales'),
+}
+
+
+def to_cents(values):
+    """Round money amounts to integer cents."""
+    return np.rint(np.asarray(values, dtype=np.float64) * 100).astype(np.int64)
+
+
+def rank_products(totals, names, n=10, by='revenue'):
+    """
+    Top ``n`` products by 'revenue', 'quantity' or average 'unit_price'.
+
+    ``totals`` holds the MEASURES of every product, indexed by product_id,
+    and ``names`` maps product IDs to names. The result is indexed by
+    (product_id, product_name) like the notebook's ProductAnalyzer, or keeps
+    the index of ``totals`` if ``names`` is None. The top
+    rows are picked with a heap of ``n`` entries rather than by sorting
+    every product.
+    """
+    import pandas as pd
+
+    try:
+        metric, companion = RANKINGS[by]
+    except KeyError:
+        raise ValueError(f"Unknown ranking {by!r}; expected one of {list(RANKINGS)}") from None
+    products = pd.DataFrame({
+        'total_sales': totals['revenue_cents'] / 100,
+        'quantity': totals['quantity'],
+        'unit_price': totals['unit_price_cents'] / 100 / totals['transactions'],
+    })
+    values = products[metric].to_numpy()
+    products = products.iloc[heapq.nlargest(n, range(len(products)), key=values.__getitem__)]
+    if names is not None:
+        products.index = pd.MultiIndex.from_arrays(
+            [products.index, [names[product_id] for product_id in products.index]],
+            names=['product_id', 'product_name'])
+    return products[[metric, companion]]
+
+
+def input_columns(partition):
+    """The INPUT_COLUMNS a partition has."""
+    names = partition_columns(partition)
+    return [name for name in INPUT_COLUMNS if name in names]
+
+
+def chunk_date_keys(chunk):
+    """YYYYMMDD keys of a chunk's rows, from its date_key column or its dates."""
+    import pandas as pd
+
+    if 'date_key' in chunk:
+        return chunk['date_key'].to_numpy(dtype=np.int32)
+    dates = pd.to_datetime(chunk['date'])
+    return (dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day).to_numpy(dtype=np.int32)
+
+
+def calendar_levels(date_keys):
+    """Year, month, quarter, weekday and day name for an array of date keys."""
+    import pandas as pd
+
+    keys, rows = np.unique(np.asarray(date_keys, dtype=np.int32), return_inverse=True)
+    dates = pd.to_datetime(keys.astype(str), format='%Y%m%d')
+    month = keys // 100 % 100
+    weekday = dates.dayofweek.to_numpy()
+    return {
+        'year': (keys // 10000)[rows],
+        'month': month[rows],
+        'quarter': ((month - 1) // 3 + 1)[rows],
+        'weekday': weekday[rows],
+        'day_name': np.asarray(DAY_NAMES, dtype=object)[weekday][rows],
+    }
+
+
+class SalesCube:
+    """
+    Incrementally maintained (date_key, product_id, city, loyalty_tier) cube.
+
+    Feed it transaction chunks with ``update`` (or whole sources with
+    ``refresh``) and read results from the roll-up methods. Chunks need the
+    columns of the generator's sales output, CSV or Parquet.
+
+    Args:
+        distinct: 'exact' or 'approx' distinct customer counts.
+        precision: HyperLogLog precision of approximate counts.
+    """
+
+    def __init__(self, distinct='exact', precision=DEFAULT_PRECISION):
+        self.distinct = distinct
+        self.precision = precision
+        self._reset()
+
+    def _reset(self):
+        self._cells = None
+        self._pending = []
+        # Keyed by year * 100 + month and by product_id
+        self.customers_by_month = DistinctCounter(self.distinct, self.precision)
+        self.customers_by_product = DistinctCounter(self.distinct, self.precision)
+        self.products = {}
+        self.partitions = {}
+
+    @classmethod
+    def from_frame(cls, df, chunk_rows=1_000_000, distinct='exact', precision=DEFAULT_PRECISION):
+        """Build a cube from an in-memory transaction table."""
+        cube = cls(distinct, precision)
+        for start in range(0, len(df), chunk_rows):
+            cube.update(df.iloc[start:start + chunk_rows])
+        return cube
+
+    @classmethod
+    def scan(cls, partition, start=0, end=None, chunk_rows=1_000_000, distinct='exact',
+             precision=DEFAULT_PRECISION):
+        """A cube of the rows of ``partition`` between bytes ``start`` and ``end`` (see read_partition)."""
+        cube = cls(distinct, precision)
+        for chunk in read_partition(partition, input_columns(partition), chunk_rows, start, end):
+            cube.update(chunk)
+        # Merge the chunks' cells here rather than wherever the cube is merged
+        cube._compact()
+        return cube
+
+    def update(self, chunk):
+        """Add a chunk of transactions."""
+        import pandas as pd
+
+        date_keys = chunk_date_keys(chunk)
+        cells = pd.DataFrame({
+            'date_key': date_keys,
+            'product_id': chunk['product_id'].to_numpy(),
+            'city': chunk['city'].astype('category'),
+            'loyalty_tier': chunk['loyalty_tier'].astype('category'),
+            'transactions': np.ones(len(chunk), dtype=np.int64),
+            'quantity': chunk['quantity'].to_numpy(dtype=np.int64),
+            'revenue_cents': to_cents(chunk['total_sales']),
+            'unit_price_cents': to_cents(chunk['unit_price']),
+        })
+        self._pending.append(cells.groupby(DIMENSIONS, observed=True, sort=False).sum().reset_index())
+
+        customer_ids = chunk['customer_id'].to_numpy()
+        self.customers_by_month.add(date_keys // 100, customer_ids)
+        self.customers_by_product.add(chunk['product_id'].to_numpy(), customer_ids)
+
+        names = chunk[['product_id', 'product_name']].drop_duplicates('product_id')
+        for product_id, product_name in zip(names['product_id'].tolist(), names['product_name'].tolist()):
+            self.products.setdefault(product_id, product_name)
+        return self
+
+    def merge(self, other):
+        """Add every transaction of another cube."""
+        self._pending.append(other.cells)
+        self.customers_by_month.merge(other.customers_by_month)
+        self.customers_by_product.merge(other.customers_by_product)
+        for product_id, product_name in other.products.items():
+            self.products.setdefault(product_id, product_name)
+        return self
+
+    def _compact(self):
+        import pandas as pd
+
+        if self._pending:
+            parts = self._pending if self._cells is None else [self._cells] + self._pending
+            cells = pd.concat([part.astype({'city': object, 'loyalty_tier': object}) for part in parts],
+                              ignore_index=True)
+            cells = cells.groupby(DIMENSIONS, sort=True).sum().reset_index()
+            self._cells = cells.astype({'city': 'category', 'loyalty_tier': 'category'})
+            self._pending = []
+
+    @property
+    def cells(self):
+        """One row per non-empty (date_key, product_id, city, loyalty_tier) cell."""
+        self._compact()
+        if self._cells is None:
+            import pandas as pd
+
+            return pd.DataFrame(columns=DIMENSIONS + MEASURES)
+        return self._cells
+
+    def __len__(self):
+        return len(self.cells)
+
+    # Roll-ups
+
+    def rollup(self, by):
+        """
+        Sum the measures over the cube grouped by ``by``: any of the cube
+        dimensions and the calendar levels in CALENDAR_LEVELS.
+        """
+        cells = self.cells
+        by = [by] if isinstance(by, str) else list(by)
+        levels = [level for level in by if level in CALENDAR_LEVELS]
+        if levels:
+            derived = calendar_levels(cells['date_key'].to_numpy())
+            cells = cells.assign(**{level: derived[level] for level in levels})
+        return cells.groupby(by, observed=True)[MEASURES].sum()
+
+    @staticmethod
+    def _money(totals, measure='revenue_cents'):
+        return totals[measure] / 100
+
+    def monthly_metrics(self):
+        """Per (year, month): revenue, average transaction, transactions, units and customers."""
+        totals = self.rollup(['year', 'month'])
+        customers = [self.customers_by_month.count(year * 100 + month) for year, month in totals.index]
+        monthly = totals.assign(
+            total_revenue=self._money(totals),
+            avg_transaction=self._money(totals) / totals['transactions'],
+            transaction_count=totals['transactions'],
+            total_units=totals['quantity'],
+            unique_customers=customers,
+        )
+        monthly = monthly[['total_revenue', 'avg_transaction', 'transaction_count', 'total_units',
+                           'unique_customers']].round(2)
+        return monthly.reset_index()
+
+    def quarterly_performance(self):
+        """Per quarter of the year: revenue, units and distinct customers."""
+        totals = self.rollup('quarter')
+        months = self.customers_by_month.keys()
+        customers = [self.distinct_customers([key for key in months if (key % 100 - 1) // 3 + 1 == quarter])
+                     for quarter in totals.index]
+        quarterly = totals.assign(total_revenue=self._money(totals),
+                                  total_units_sold=totals['quantity'],
+                                  unique_customers=customers)
+        return quarterly[['total_revenue', 'total_units_sold', 'unique_customers']].round(2)
+
+    def distinct_customers(self, months):
+        """Distinct customers over the months ``months`` (year * 100 + month keys)."""
+        return self.customers_by_month.count(*months)
+
+    def customers_per_product(self):
+        """Distinct customers of every product."""
+        return self.customers_by_product.counts().rename_axis('product_id')
+
+    def daily_patterns(self):
+        """Per day of the week, Monday first: total sales, average transaction and transactions."""
+        totals = self.rollup('day_name')
+        daily = totals.assign(total_sales=self._money(totals),
+                              avg_transaction_value=self._money(totals) / totals['transactions'],
+                              transaction_count=totals['transactions'])
+        daily = daily[['total_sales', 'avg_transaction_value', 'transaction_count']].round(2)
+        return daily.reindex(DAY_NAMES)
+
+    def seasonal_indices(self):
+        """Average transaction of each calendar month relative to the overall one (100 = average)."""
+        totals = self.rollup('month')
+        overall = totals['revenue_cents'].sum() / totals['transactions'].sum()
+        return (totals['revenue_cents'] / totals['transactions'] / overall * 100).round(1)
+
+    def heatmap(self):
+        """Total sales by calendar month (rows) and day of the week (columns, Monday first)."""
+        totals = self.rollup(['month', 'day_name'])
+        return self._money(totals).unstack(fill_value=0).reindex(columns=DAY_NAMES)
+
+    def top_products(self, n=10, by='revenue'):
+        """Top ``n`` products by 'revenue', 'quantity' or average 'unit_price' (see rank_products)."""
+        return rank_products(self.rollup('product_id'), self.products, n, by)
+
+    # Persistence
+
+    def refresh(self, source, chunk_rows=1_000_000, workers=None):
+        """
+        Bring the cube up to date with the sales files at ``source``.
+
+        New partitions and rows appended to a CSV file are added; if a
+        partition was removed or rewritten the cube is rebuilt from scratch.
+        ``workers`` scans the input on that many processes (see parallel.py);
+        the cube is the same for any worker count.
+
+        Each partition is scanned into a cube of its own, up to the size it
+        had when it was listed, and merged with its fingerprint once the
+        scan is complete. A scan that fails leaves the cube as it was before
+        that partition, so the next refresh reads it again from the same
+        offset.
+        """
+        partitions = list_partitions(source)
+        reads = plan_reads(self.partitions, partitions)
+        if reads is None:
+            self._reset()
+            reads = [(partition, 0) for partition in partitions]
+        if workers:
+            from .parallel import scan_parallel
+
+            # Pieces come back in input order, so a partition's pieces are adjacent
+            pieces = scan_parallel(reads, workers, chunk_rows, self.distinct, self.precision)
+            for partition, cubes in itertools.groupby(pieces, key=lambda piece: piece[0]):
+                scratch = SalesCube(self.distinct, self.precision)
+                for _, cube in cubes:
+                    scratch.merge(cube)
+                self._add_partition(partition, scratch)
+            # Partitions without rows to read have no pieces
+            for partition, _ in reads:
+                self.partitions[partition.name] = partition.fingerprint()
+            return self
+        for partition, offset in reads:
+            self._add_partition(partition, SalesCube.scan(partition, offset, partition.size, chunk_rows,
+                                                          self.distinct, self.precision))
+        return self
+
+    def _add_partition(self, partition, cube):
+        """Merge the cube of the rows of ``partition`` not read yet, and record its fingerprint."""
+        self.merge(cube)
+        self.partitions[partition.name] = partition.fingerprint()
+
+    def save(self, path):
+        """Write the cube to the directory ``path``."""
+        os.makedirs(path, exist_ok=True)
+        self.cells.to_parquet(os.path.join(path, 'cells.parquet'), index=False)
+        self.customers_by_month.to_frame().to_parquet(os.path.join(path, 'customers_by_month.parquet'))
+        self.customers_by_product.to_frame().to_parquet(os.path.join(path, 'customers_by_product.parquet'))
+        manifest = {'distinct': self.distinct,
+                    'precision': self.precision,
+                    'products': [[product_id, name] for product_id, name in self.products.items()],
+                    'partitions': self.partitions}
+        with open(os.path.join(path, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, default=int)
+
+    @classmethod
+    def load(cls, path, distinct='exact', precision=DEFAULT_PRECISION):
+        """
+        Read a cube written by ``save``. Returns an empty cube with the given
+        distinct count settings if there is none, or if it was saved with
+        different ones.
+        """
+        import pandas as pd
+
+        cube = cls(distinct, precision)
+        manifest_path = os.path.join(path, 'manifest.json')
+        if not os.path.exists(manifest_path):
+            return cube
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if (manifest.get('distinct'), manifest.get('precision')) != (distinct, precision):
+            return cube
+        cube._cells = pd.read_parquet(os.path.join(path, 'cells.parquet'))
+        for name in ['customers_by_month', 'customers_by_product']:
+            frame = pd.read_parquet(os.path.join(path, f'{name}.parquet'))
+            setattr(cube, name, DistinctCounter.from_frame(frame, distinct, precision))
+        cube.products = {product_id: name for product_id, name in manifest['products']}
+        cube.partitions = manifest['partitions']
+        return cube
+
+
+def refresh_cube(source, path, chunk_rows=1_000_000, distinct='exact', precision=DEFAULT_PRECISION,
+                 workers=None):
+    """Load the cube saved at ``path``, catch it up with ``source`` and save it back."""
+    cube = SalesCube.load(path, distinct, precision)
+    known = dict(cube.partitions)
+    cube.refresh(source, chunk_rows, workers)
+    if cube.partitions != known:
+        cube.save(path)
+    return cube
@@ -0,0 +1,263 @@
+"""
+Typed loaders for the generated tables.
+
+``pd.read_csv`` with default dtypes leaves every ID, product name, city and
+loyalty tier as a string per row and the dates as text that has to be
+parsed afterwards. These loaders read the CSV or Parquet output through
+Arrow datasets with an explicit schema per table:
+
+* IDs ('T000001', 'P0042', 'C0007') become their integer codes, as in the
+  Parquet layout (see salesgen.columnar);
+* low-cardinality strings become categoricals;
+* dates are parsed by the reader into datetime64;
+* counts are int32 and money float32 (``float_dtype='float64'`` keeps
+  totals of many rows exact to the cent).
+
+``columns`` reads only the listed columns, and the date range and product
+filters are applied while the files are scanned, so rows outside them are
+never converted. On Parquet input the filters also skip whole year
+partitions and row groups. The Parquet sales dataset has no total_sales
+column; it is computed from quantity and unit_price as the rows are read.
+CSV and Parquet input load to identical frames, rows in the same order.
+"""
+import datetime as dt
+import os
+
+from ..columnar import DERIVED_COLUMNS, ID_PREFIXES, total_sales
+
+# Type of every known column: 'id', 'date', 'category', 'str', 'float'
+# (float_dtype) or a NumPy integer dtype
+SALES_SCHEMA = {
+    'transaction_id': 'id',
+    'date': 'date',
+    'product_id': 'id',
+    'product_name': 'category',
+    'quantity': 'int32',
+    'unit_price': 'float',
+    'total_sales': 'float',
+    'customer_id': 'id',
+    'city': 'category',
+    'loyalty_tier': 'category',
+    'date_key': 'int32',
+    'year': 'int16',
+    'month': 'int8',
+}
+PRODUCTS_SCHEMA = {
+    'product_id': 'id',
+    'product_name': 'category',
+    'subcategory': 'category',
+    'brand': 'category',
+    'base_price': 'float',
+    'cost_price': 'float',
+    'popularity_factor': 'int32',
+    'seasonal_factor': 'float',
+    'stock_level': 'int32',
+}
+CUSTOMERS_SCHEMA = {
+    'customer_id': 'id',
+    'first_name': 'category',
+    'last_name': 'category',
+    'email': 'str',
+    'segment': 'category',
+    'age': 'int32',
+    'income': 'int32',
+    'total_orders': 'int32',
+    'city': 'category',
+}
+# Integer dtype of each ID column's codes
+ID_DTYPES = {'transaction_id': 'int32', 'product_id': 'int32', 'customer_id': 'int32'}
+
+
+def _csv_format(schema):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from pyarrow import csv
+
+    types = {'id': pa.string(), 'date': pa.timestamp('s'), 'str': pa.string(),
+             'category': pa.dictionary(pa.int32(), pa.string()), 'float': pa.float64()}
+    column_types = {name: types.get(kind, pa.int64()) for name, kind in schema.items()}
+    return ds.CsvFileFormat(convert_options=csv.ConvertOptions(column_types=column_types,
+                                                               strings_can_be_null=False))
+
+
+def _partition_order(path):
+    """Sort key putting 'month=9' before 'month=10': numeric hive values compare as numbers."""
+    key = []
+    for part in path.split(os.sep):
+        name, _, value = part.rpartition('=')
+        key.append((name, int(value), '') if value.isdigit() else (name, -1, value))
+    return key
+
+
+def _dataset(source, schema):
+    import pyarrow.dataset as ds
+
+    if str(source).endswith('.csv'):
+        return ds.dataset(source, format=_csv_format(schema))
+    if not os.path.isdir(source):
+        return ds.dataset(source, format='parquet')
+    # Files in transaction order; pyarrow would list month=10 before month=7
+    files = sorted((os.path.join(directory, name)
+                    for directory, _, names in os.walk(source) for name in names if name.endswith('.parquet')),
+                   key=lambda path: _partition_order(os.path.relpath(path, source)))
+    return ds.dataset(files, format='parquet', partitioning='hive', partition_base_dir=str(source))
+
+
+def id_codes(column, name):
+    """An Arrow ID column as integer codes, stripping the letter prefix of string IDs."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+        column = pc.utf8_slice_codeunits(column, len(ID_PREFIXES[name]))
+    return pc.cast(column, pa.from_numpy_dtype(ID_DTYPES[name]))
+
+
+def _codes(name, values):
+    """IDs given as codes or prefixed strings, as an Arrow array of codes."""
+    import pyarrow as pa
+
+    prefix = ID_PREFIXES[name]
+    return pa.array([int(value[len(prefix):]) if isinstance(value, str) else int(value) for value in values],
+                    type=pa.from_numpy_dtype(ID_DTYPES[name]))
+
+
+def _timestamp(value):
+    import pyarrow as pa
+
+    if isinstance(value, str):
+        value = dt.datetime.strptime(value, '%Y-%m-%d')
+    return pa.scalar(value, type=pa.timestamp('s'))
+
+
+def _date_filter(dataset, start, end):
+    """Filter expression keeping dates from ``start`` through ``end``, pruning year partitions."""
+    import pyarrow.dataset as ds
+
+    expression = None
+    for bound, keep in [(start, lambda field, value: field >= value),
+                        (end, lambda field, value: field <= value)]:
+        if bound is None:
+            continue
+        condition = keep(ds.field('date'), _timestamp(bound))
+        if 'year' in dataset.schema.names:
+            condition = condition & keep(ds.field('year'), _timestamp(bound).as_py().year)
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def _derived(table, names):
+    """Add the DERIVED_COLUMNS among ``names`` that ``table`` lacks, before any float casts."""
+    import pyarrow as pa
+
+    for name in names:
+        if name in DERIVED_COLUMNS and name not in table.column_names:
+            quantity, unit_price = DERIVED_COLUMNS[name]
+            values = total_sales(table[quantity].to_numpy(), table[unit_price].to_numpy())
+            table = table.append_column(name, pa.array(values))
+    return table
+
+
+def _typed(table, schema, float_dtype):
+    """Convert the columns of an Arrow table to the types of ``schema``."""
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    arrays = []
+    for name, column in zip(table.column_names, table.columns):
+        kind = schema.get(name)
+        if kind == 'id':
+            column = id_codes(column, name)
+        elif kind == 'date':
+            column = pc.cast(column, pa.timestamp('ms'))
+        elif kind == 'category' and not pa.types.is_dictionary(column.type):
+            column = pc.dictionary_encode(column)
+        elif kind == 'float':
+            column = pc.cast(column, pa.from_numpy_dtype(np.dtype(float_dtype)))
+        elif kind not in (None, 'category', 'str'):
+            column = pc.cast(column, pa.from_numpy_dtype(np.dtype(kind)))
+        arrays.append(column)
+    return pa.table(arrays, names=table.column_names)
+
+
+def load_table(source, schema, columns=None, filter=None, ids=None, float_dtype='float32'):
+    """
+    Read a CSV file or a Parquet file or dataset into a DataFrame typed by ``schema``.
+
+    Args:
+        source: path of the CSV file, or of the Parquet file or directory.
+        schema: column name to type ('id', 'date', 'category', 'str',
+            'float' or an integer dtype); unknown columns are read as stored.
+        columns: columns to read (all by default).
+        filter: a function of the Arrow dataset returning a filter
+            expression, or None.
+        ids: ID column name to the IDs to keep, as codes or prefixed strings.
+            Integer ID columns are filtered by the scan; string ones batch by
+            batch once converted to codes.
+        float_dtype: dtype of the 'float' columns.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    dataset = _dataset(source, schema)
+    expression = filter(dataset) if filter is not None else None
+    batch_ids = {}
+    for name, values in (ids or {}).items():
+        codes = _codes(name, values)
+        if pa.types.is_integer(dataset.schema.field(name).type):
+            condition = ds.field(name).isin(codes)
+            expression = condition if expression is None else expression & condition
+        else:
+            batch_ids[name] = codes
+
+    stored = dataset.schema.names
+    derived = [name for name, needed in DERIVED_COLUMNS.items()
+               if name in schema and name not in stored and set(needed) <= set(stored)]
+    if columns is not None:
+        names = list(columns)
+    else:
+        # Derived columns take their place in the schema's column order
+        order = {name: i for i, name in enumerate(schema)}
+        names = sorted(stored + derived, key=lambda name: order.get(name, len(order)))
+    read = [name for name in names if name not in derived]
+    read += [name for name in batch_ids if name not in read]
+    for name in names:
+        if name in derived:
+            read += [needed for needed in DERIVED_COLUMNS[name] if needed not in read]
+    tables = []
+    for batch in dataset.to_batches(columns=read, filter=expression):
+        table = _typed(_derived(pa.Table.from_batches([batch]), names), schema, float_dtype)
+        for name, codes in batch_ids.items():
+            table = table.filter(pc.is_in(table[name], value_set=codes))
+        tables.append(table.select(names))
+    if not tables:
+        empty = _derived(dataset.schema.empty_table().select(read), names)
+        tables.append(_typed(empty, schema, float_dtype).select(names))
+    return pa.concat_tables(tables).to_pandas()
+
+
+def load_sales(source, columns=None, start=None, end=None, products=None, float_dtype='float32'):
+    """
+    Load the sales transactions (sales_transactions.csv or its Parquet dataset).
+
+    Args:
+        start, end: first and last date to keep (datetime or 'YYYY-MM-DD'), inclusive.
+        products: product IDs to keep, as codes or 'P0042' strings.
+        See load_table for the other arguments.
+    """
+    ids = {'product_id': products} if products is not None else None
+    return load_table(source, SALES_SCHEMA, columns, lambda dataset: _date_filter(dataset, start, end), ids,
+                      float_dtype)
+
+
+def load_products(source, columns=None, products=None, float_dtype='float32'):
+    """Load the product catalog, optionally only the product IDs in ``products``."""
+    ids = {'product_id': products} if products is not None else None
+    return load_table(source, PRODUCTS_SCHEMA, columns, None, ids, float_dtype)
+
+
+def load_customers(source, columns=None, float_dtype='float32'):
+    """Load the customer table."""
+    return load_table(source, CUSTOMERS_SCHEMA, columns, None, None, float_dtype)
@@ -0,0 +1,63 @@
+"""
+Process-pool scans of the sales partitions.
+
+The input is split into pieces that are scanned into SalesCubes on a
+process pool: one piece per partition of a partitioned Parquet dataset
+(the generator writes its parts under year=/month= directories, so every
+piece holds a single month) and byte ranges of a CSV file, cut at line
+starts. A piece's cube is its partial aggregate: integer sums per cell and
+distinct counters per month and product, far smaller than the rows it was
+built from, so shipping it back and merging it costs little next to the
+scan. Cell sums are exact and a merged counter counts the union of its
+parts, so the merged cube equals a sequential scan for any worker count.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from .cube import SalesCube
+from .sketches import DEFAULT_PRECISION
+from .sources import line_start
+
+# Size of the byte ranges a CSV file is split into; a worker holds one in memory
+CSV_PIECE_BYTES = 64 * 2 ** 20
+
+
+def plan_pieces(reads, workers):
+    """
+    Split ``(partition, offset)`` reads (see sources.plan_reads) into
+    ``(partition, start, end)`` pieces, ``end`` None for whole Parquet files.
+    CSV ranges are split into at least ``workers`` pieces.
+    """
+    pieces = []
+    for partition, offset in reads:
+        if partition.format == 'parquet':
+            pieces.append((partition, 0, None))
+            continue
+        # Rows start after the header line
+        offset = offset or line_start(partition.path, 1)
+        length = partition.size - offset
+        n_pieces = max(workers, -(-length // CSV_PIECE_BYTES))
+        bounds = [offset] + [line_start(partition.path, offset + length * i // n_pieces)
+                             for i in range(1, n_pieces)] + [partition.size]
+        pieces.extend((partition, start, end) for start, end in zip(bounds, bounds[1:]) if end > start)
+    return pieces
+
+
+def scan_piece(partition, start, end, chunk_rows, distinct, precision):
+    """A SalesCube of the rows of one piece."""
+    return SalesCube.scan(partition, start, end, chunk_rows, distinct, precision)
+
+
+def _scan_piece_task(task):
+    return scan_piece(*task)
+
+
+def scan_parallel(reads, workers, chunk_rows=1_000_000, distinct='exact', precision=DEFAULT_PRECISION):
+    """
+    Scan the pieces of ``reads`` on ``workers`` processes and yield
+    ``(partition, cube)`` pairs in input order.
+    """
+    pieces = plan_pieces(reads, workers)
+    tasks = [(partition, start, end, chunk_rows, distinct, precision) for partition, start, end in pieces]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for (partition, _, _), cube in zip(pieces, pool.map(_scan_piece_task, tasks)):
+            yield partition, cube
@@ -0,0 +1,88 @@
+"""
+Out-of-core run of the analysis notebook.
+
+main_analyis.ipynb loads the whole sales table, copies it and adds six
+calendar columns before grouping it, which takes several times the size of
+the data in memory. ``analyze`` streams the sales partitions chunk by chunk
+into a SalesCube instead, reading only the columns the cube needs, and
+derives every table the notebook produces from that single scan: the
+monthly summary, quarterly performance, day-of-week patterns, seasonal
+indices, the month by weekday heatmap and the product rankings. Memory is
+bounded by the size of the cube, not by the number of rows. With
+``workers`` the partitions are scanned on a process pool and the partial
+cubes merged (see parallel.py).
+
+The cube sums money in integer cents, so the tables equal the notebook's
+in-memory results whatever order the partitions are read in.
+``write_results`` saves them under the names the notebook's
+save_analysis_results uses; ``python -m salesgen.analysis`` does both.
+"""
+import os
+
+from .cube import MONTH_ABBREVIATIONS, SalesCube
+from .sketches import DEFAULT_PRECISION
+
+# File each result is saved to by write_results, and whether its index is written
+RESULT_FILES = {
+    'monthly_summary': ('monthly_summary_enhanced.csv', False),
+    'quarterly_sales': ('quarterly_analysis_enhanced.csv', True),
+    'daily_patterns': ('daily_patterns_enhanced.csv', True),
+    'top_revenue': ('top_products_revenue_enhanced.csv', True),
+    'seasonal_df': ('seasonal_indices_enhanced.csv', False),
+}
+
+
+def build_cube(source, chunk_rows=1_000_000, distinct='exact', precision=DEFAULT_PRECISION, workers=None):
+    """Scan the sales files at ``source`` once into a new SalesCube, on ``workers`` processes."""
+    return SalesCube(distinct, precision).refresh(source, chunk_rows, workers)
+
+
+def monthly_summary(cube):
+    """The notebook's monthly summary: monthly metrics plus labels and growth rates."""
+    monthly = cube.monthly_metrics()
+    monthly['month_year'] = monthly['year'].astype(str) + '-' + monthly['month'].astype(str).str.zfill(2)
+    monthly['avg_order_value'] = monthly['total_revenue'] / monthly['transaction_count']
+    monthly['revenue_growth'] = monthly['total_revenue'].pct_change() * 100
+    monthly['transaction_growth'] = monthly['transaction_count'].pct_change() * 100
+    return monthly.sort_values(['year', 'month'])
+
+
+def seasonal_table(cube):
+    """The notebook's seasonal index table, one row per calendar month."""
+    import pandas as pd
+
+    return pd.DataFrame([{'month': month,
+                          'month_name': MONTH_ABBREVIATIONS[month - 1],
+                          'seasonal_index': index,
+                          'status': "Above average" if index > 100 else "Below average"}
+                         for month, index in cube.seasonal_indices().items()])
+
+
+def results(cube, n=10):
+    """Every table of the notebook's analysis, rolled up from ``cube``, keyed by notebook variable name."""
+    return {
+        'monthly_summary': monthly_summary(cube),
+        'quarterly_sales': cube.quarterly_performance(),
+        'daily_patterns': cube.daily_patterns(),
+        'seasonal_df': seasonal_table(cube),
+        'heatmap_data': cube.heatmap(),
+        'top_revenue': cube.top_products(n, by='revenue'),
+        'top_quantity': cube.top_products(n, by='quantity'),
+        'highest_priced': cube.top_products(n, by='unit_price'),
+    }
+
+
+def analyze(source, chunk_rows=1_000_000, distinct='exact', precision=DEFAULT_PRECISION, n=10,
+            workers=None):
+    """Compute the notebook's tables from the sales files at ``source`` in one streaming pass."""
+    return results(build_cube(source, chunk_rows, distinct, precision, workers), n)
+
+
+def write_results(tables, output_dir):
+    """Save the tables of ``results`` as the CSV files of the notebook's save_analysis_results."""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {}
+    for name, (file_name, index) in RESULT_FILES.items():
+        paths[name] = os.path.join(output_dir, file_name)
+        tables[name].to_csv(paths[name], index=index)
+    return paths
@@ -0,0 +1,262 @@
+"""
+Local HTTP server of the analysis results, for dashboards.
+
+``python -m salesgen.analysis.server SOURCE`` serves the tables of the
+analysis notebook as JSON:
+
+    /api/monthly                 monthly summary
+    /api/quarterly               quarterly performance
+    /api/daily                   day-of-week patterns
+    /api/seasonal                seasonal indices
+    /api/heatmap                 month by weekday sales (see charts.heatmap_matrix)
+    /api/top-products?by=...     top products by revenue, quantity or unit_price
+    /api/charts?grain=...        dashboard chart series by day, week or month
+    /api/status                  data version and when it was computed
+
+Responses are computed from the SalesCube and serialized once per version
+of the data, so a request only sends bytes that are already in memory and
+never waits for pandas. A background thread checks the sales partitions
+every ``interval`` seconds; when partitions are added or change, the cube
+is brought up to date (only new partitions and rows appended to a CSV are
+read, see SalesCube.refresh, or changed partitions with ``cache_dir``, see
+cache.partition_cubes) and the responses are swapped for new ones. Until
+then, clients keep receiving the previous version, and ETags let them
+skip unchanged responses.
+
+Only the standard library's threading HTTP server is used; it is meant for
+local dashboards, not for exposure to a network.
+"""
+import argparse
+import copy
+import datetime as dt
+import hashlib
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .charts import DEFAULT_MAX_POINTS, GRAINS, dashboard_data, heatmap_matrix
+from .cube import RANKINGS, SalesCube
+from .pipeline import results
+from .sketches import DEFAULT_PRECISION
+from .sources import list_partitions
+
+# Endpoint of each table of pipeline.results
+ENDPOINTS = {
+    'monthly': 'monthly_summary',
+    'quarterly': 'quarterly_sales',
+    'daily': 'daily_patterns',
+    'seasonal': 'seasonal_df',
+}
+# Query parameter of the endpoints with variants, and its values
+VARIANTS = {
+    'top-products': ('by', list(RANKINGS)),
+    'charts': ('grain', list(GRAINS)),
+}
+
+
+def _records(frame):
+    """A DataFrame as a list of row dicts, with named index levels as columns."""
+    if any(name is not None for name in frame.index.names):
+        frame = frame.reset_index()
+    return json.loads(frame.to_json(orient='records', date_format='iso'))
+
+
+def _response(value):
+    body = json.dumps(value, separators=(',', ':')).encode('utf-8')
+    return body, '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+class DashboardResults:
+    """
+    Serialized analysis results of the sales files at ``source``, kept up to
+    date by ``refresh``.
+
+    ``get(path)`` returns the body and ETag of an endpoint, or None.
+    """
+
+    def __init__(self, source, chunk_rows=1_000_000, distinct='exact', precision=DEFAULT_PRECISION, n=10,
+                 workers=None, cache_dir=None, max_points=DEFAULT_MAX_POINTS):
+        self.source = source
+        self.chunk_rows = chunk_rows
+        self.distinct = distinct
+        self.precision = precision
+        self.n = n
+        self.workers = workers
+        self.max_points = max_points
+        self.cache = None
+        if cache_dir is not None:
+            from .cache import ResultCache
+
+            self.cache = ResultCache(cache_dir)
+        self.cube = SalesCube(distinct, precision)
+        self.version = 0
+        self.responses = {}
+        self._state = None
+        self._stop = threading.Event()
+
+    def _partition_state(self):
+        return [(partition.name, partition.size, partition.mtime_ns) for partition in list_partitions(self.source)]
+
+    def refresh(self):
+        """
+        Recompute the responses if the sales partitions changed; True if they did.
+
+        A copy of the cube is brought up to date, and the cube, responses and
+        version are only replaced once everything has been recomputed, so a
+        refresh that fails (on a partition caught mid-write, say) leaves the
+        previous version in place to be refreshed again.
+        """
+        state = self._partition_state()
+        if state == self._state:
+            return False
+        if self.cache is not None:
+            from .cache import partition_cubes
+
+            cube = partition_cubes(self.source, self.cache, self.chunk_rows, self.distinct, self.precision,
+                                   self.workers)
+        else:
+            cube = copy.deepcopy(self.cube).refresh(self.source, self.chunk_rows, self.workers)
+
+        tables = results(cube, self.n)
+        responses = {f'/api/{endpoint}': _response(_records(tables[name])) for endpoint, name in ENDPOINTS.items()}
+        responses['/api/heatmap'] = _response(heatmap_matrix(tables['heatmap_data']))
+        for by in RANKINGS:
+            responses[f'/api/top-products?by={by}'] = _response(_records(cube.top_products(self.n, by)))
+        for grain in GRAINS:
+            responses[f'/api/charts?grain={grain}'] = _response(dashboard_data(cube, grain, self.max_points, self.n))
+
+        monthly = tables['monthly_summary']
+        version = self.version + 1
+        responses['/api/status'] = _response({
+            'source': str(self.source),
+            'version': version,
+            'updated': dt.datetime.now().isoformat(timespec='seconds'),
+            'partitions': len(state),
+            'transactions': int(monthly['transaction_count'].sum()),
+            'months': len(monthly),
+        })
+        # Requests read self.responses without locking; swap it in whole
+        self.cube, self.responses, self.version, self._state = cube, responses, version, state
+        return True
+
+    def get(self, path):
+        """(body, etag) of the endpoint at ``path`` (with its query string), or None."""
+        url = urlsplit(path)
+        name = url.path.rstrip('/').removeprefix('/api/')
+        if name in VARIANTS:
+            parameter, values = VARIANTS[name]
+            value = parse_qs(url.query).get(parameter, [values[0]])[-1]
+            return self.responses.get(f'/api/{name}?{parameter}={value}')
+        return self.responses.get(url.path.rstrip('/'))
+
+    def watch(self, interval=2.0):
+        """Call ``refresh`` every ``interval`` seconds on a daemon thread, until ``stop``."""
+        def poll():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as error:
+                    # The previous version is still whole (see refresh); keep serving it and retry
+                    print(f"Refreshing {self.source} failed: {error!r}", file=sys.stderr)
+
+        thread = threading.Thread(target=poll, name='dashboard-refresh', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    """Serves the responses of ``server.results`` (a DashboardResults)."""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without TCP_NODELAY, Nagle's
+    # algorithm holds the body back for the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        response = self.server.results.get(self.path)
+        if response is None:
+            endpoints = sorted({key.split('?')[0] for key in self.server.results.responses})
+            body = json.dumps({'error': f"Unknown endpoint {self.path}", 'endpoints': endpoints}).encode('utf-8')
+            self._send(404, body)
+        elif self.headers.get('If-None-Match') == response[1]:
+            self._send(304, b'', response[1])
+        else:
+            self._send(200, *response)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        if etag is not None:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(results, host='127.0.0.1', port=8050, verbose=False):
+    """A threading HTTP server of ``results`` at ``host``:``port`` (0 picks a free port)."""
+    server = ThreadingHTTPServer((host, port), DashboardHandler)
+    server.daemon_threads = True
+    server.results = results
+    server.verbose = verbose
+    return server
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='salesgen.analysis.server',
+                                     description="Serve the sales analysis tables as JSON for dashboards.")
+    parser.add_argument('source',
+                        help="sales_transactions.csv, or the directory of a partitioned Parquet dataset")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on")
+    parser.add_argument('--port', type=int, default=8050, help="port to listen on")
+    parser.add_argument('--interval', type=float, default=2.0,
+                        help="seconds between checks of the sales partitions for new data")
+    parser.add_argument('--cache-dir', default=None,
+                        help="keep per-partition cubes in this directory, so a restart or a rewritten "
+                             "partition only reads the partitions that changed")
+    parser.add_argument('--chunk-rows', type=int, default=1_000_000,
+                        help="rows read from the input at a time")
+    parser.add_argument('--distinct', choices=['exact', 'approx'], default='exact',
+                        help="count distinct customers exactly or with HyperLogLog sketches")
+    parser.add_argument('--top', type=int, default=10,
+                        help="products in each ranking")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="scan new partitions on this many processes")
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    results = DashboardResults(args.source, args.chunk_rows, args.distinct, n=args.top, workers=args.workers,
+                               cache_dir=args.cache_dir)
+    results.refresh()
+    results.watch(args.interval)
+    server = make_server(results, args.host, args.port, args.verbose)
+    status = json.loads(results.get('/api/status')[0])
+    print(f"Serving {status['transactions']:,} transactions over {status['months']} months "
+          f"at http://{args.host}:{server.server_port}/api/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        results.stop()
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
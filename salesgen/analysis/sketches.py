@@ -0,0 +1,190 @@
+"""
+Mergeable distinct counts, exact or approximate.
+
+``customer_id: nunique`` hashes every ID of every row each time it runs.
+A DistinctCounter keeps one summary per bucket (a month, a product, ...)
+that can be updated chunk by chunk, merged with the counter of another
+partition and combined across buckets to count a wider window, such as a
+quarter made of three months.
+
+In 'exact' mode a bucket holds its distinct values, which is as large as
+the data is distinct. In 'approx' mode it holds a HyperLogLog sketch of
+``2 ** precision`` one-byte registers (16 KiB at the default precision 14),
+however many values it has seen. The estimate has a relative standard error
+of ``1.04 / sqrt(2 ** precision)``, 0.81% at precision 14, so about 99.7%
+of estimates fall within three times that (2.4%) of the true count. Counts
+below ``2.5 * 2 ** precision`` (about 41,000 at precision 14) use linear
+counting over the empty registers and are much closer still. Merging
+sketches adds no further error: a merged sketch is the sketch of the union.
+"""
+import math
+
+import numpy as np
+
+MODES = ('exact', 'approx')
+DEFAULT_PRECISION = 14
+
+
+def hash_values(values):
+    """Stable 64-bit hashes of an array of IDs (strings or integers)."""
+    import pandas as pd
+
+    return pd.util.hash_array(np.asarray(values), categorize=True)
+
+
+def relative_error(precision=DEFAULT_PRECISION):
+    """Relative standard error of a HyperLogLog estimate at ``precision``."""
+    return 1.04 / math.sqrt(2 ** precision)
+
+
+def register_updates(hashes, precision):
+    """Register index and rank (position of the first 1-bit) of every hash."""
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    width = 64 - precision
+    index = (hashes >> np.uint64(width)).astype(np.int64)
+    rest = hashes & np.uint64((1 << width) - 1)
+    # rest < 2**50 is exact in float64, so frexp's exponent is its bit length
+    _, bit_length = np.frexp(rest.astype(np.float64))
+    rank = (width - bit_length + 1).astype(np.uint8)
+    return index, rank
+
+
+def estimate(registers):
+    """Cardinality estimate of one HyperLogLog register array."""
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if raw <= 2.5 * m and zeros:
+        return m * math.log(m / zeros)
+    return raw
+
+
+class DistinctCounter:
+    """
+    Distinct values per bucket key, counted exactly or with HyperLogLog.
+
+    Args:
+        mode: 'exact' or 'approx'.
+        precision: HyperLogLog precision in approx mode (see module docstring).
+    """
+
+    def __init__(self, mode='exact', precision=DEFAULT_PRECISION):
+        if mode not in MODES:
+            raise ValueError(f"Unknown distinct count mode {mode!r}; expected one of {MODES}")
+        self.mode = mode
+        self.precision = precision
+        self._rows = {}
+        self._registers = np.zeros((0, 2 ** precision), dtype=np.uint8)
+        self._values = {}
+        self._pending = {}
+
+    @property
+    def relative_error(self):
+        """Relative standard error of a count; 0 in exact mode."""
+        return 0.0 if self.mode == 'exact' else relative_error(self.precision)
+
+    def keys(self):
+        return list(self._rows) if self.mode == 'approx' else list({**self._values, **self._pending})
+
+    def __contains__(self, key):
+        return key in self._rows or key in self._values or key in self._pending
+
+    def _row(self, key):
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = len(self._rows)
+            if row >= len(self._registers):
+                grown = np.zeros((max(2 * len(self._registers), 16), self._registers.shape[1]),
+                                 dtype=np.uint8)
+                grown[:len(self._registers)] = self._registers
+                self._registers = grown
+        return row
+
+    def add(self, keys, values):
+        """Add ``values[i]`` to bucket ``keys[i]``."""
+        import pandas as pd
+
+        codes, uniques = pd.factorize(np.asarray(keys))
+        if self.mode == 'approx':
+            rows = np.array([self._row(key) for key in uniques.tolist()], dtype=np.int64)
+            index, rank = register_updates(hash_values(values), self.precision)
+            np.maximum.at(self._registers, (rows[codes], index), rank)
+            return self
+
+        keys = uniques.tolist()
+        pairs = pd.DataFrame({'code': codes, 'value': np.asarray(values)}).drop_duplicates()
+        for code, group in pairs.groupby('code', sort=False)['value']:
+            self._pending.setdefault(keys[code], []).append(group.to_numpy())
+        return self
+
+    def merge(self, other):
+        """Add every value of another counter with the same mode and precision."""
+        if (other.mode, other.precision) != (self.mode, self.precision):
+            raise ValueError(f"Cannot merge a {other.mode} counter (precision {other.precision}) "
+                             f"into a {self.mode} one (precision {self.precision})")
+        if self.mode == 'approx':
+            for key, row in other._rows.items():
+                target = self._row(key)
+                np.maximum(self._registers[target], other._registers[row], out=self._registers[target])
+        else:
+            for key, values in other._distinct().items():
+                self._pending.setdefault(key, []).append(values)
+        return self
+
+    def _distinct(self):
+        import pandas as pd
+
+        for key, parts in self._pending.items():
+            if key in self._values:
+                parts = [self._values[key]] + parts
+            self._values[key] = pd.unique(np.concatenate(parts))
+        self._pending = {}
+        return self._values
+
+    def _union(self, keys):
+        keys = [key for key in keys if key in self]
+        if self.mode == 'approx':
+            if not keys:
+                return np.zeros(self._registers.shape[1], dtype=np.uint8)
+            return self._registers[[self._rows[key] for key in keys]].max(axis=0)
+        import pandas as pd
+
+        values = self._distinct()
+        return pd.unique(np.concatenate([values[key] for key in keys])) if keys else np.array([])
+
+    def count(self, *keys):
+        """Distinct values over the union of the buckets ``keys``."""
+        union = self._union(keys)
+        return int(round(estimate(union))) if self.mode == 'approx' else len(union)
+
+    def counts(self):
+        """Distinct values of every bucket, as a Series indexed by key."""
+        import pandas as pd
+
+        keys = self.keys()
+        return pd.Series([self.count(key) for key in keys], index=keys, dtype=np.int64)
+
+    def to_frame(self):
+        """The counter as a table: (key, value) pairs, or (key, registers) in approx mode."""
+        import pandas as pd
+
+        if self.mode == 'approx':
+            keys = list(self._rows)
+            return pd.DataFrame({'key': keys,
+                                 'registers': [self._registers[self._rows[key]].tobytes() for key in keys]})
+        values = self._distinct()
+        return pd.DataFrame({'key': np.repeat(list(values), [len(v) for v in values.values()]),
+                             'value': np.concatenate(list(values.values())) if values else []})
+
+    @classmethod
+    def from_frame(cls, frame, mode='exact', precision=DEFAULT_PRECISION):
+        """Rebuild a counter written by ``to_frame``."""
+        counter = cls(mode, precision)
+        if mode == 'approx':
+            for key, registers in zip(frame['key'].tolist(), frame['registers'].tolist()):
+                row = counter._row(key)
+                counter._registers[row] = np.frombuffer(registers, dtype=np.uint8)
+        elif len(frame):
+            counter.add(frame['key'].to_numpy(), frame['value'].to_numpy())
+        return counter
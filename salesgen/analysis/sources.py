@@ -0,0 +1,175 @@
+"""
+Sales inputs as a list of partitions.
+
+A partitioned Parquet dataset (the generator's 'parquet' format) has one
+partition per part file. A CSV file is a single partition that can grow
+at the end, which is what the generator's append mode does to it; its
+size only counts complete lines, so a row caught mid-write is left for a
+later read. Every partition has a fingerprint (size, modification time and
+a digest of its last bytes), so a reader that recorded the fingerprints it
+has seen can tell new partitions from changed ones and read only the rows
+it is missing.
+"""
+import hashlib
+import io
+import os
+
+from ..columnar import DERIVED_COLUMNS, derive_columns
+
+# Bytes at the end of a file that are hashed into its fingerprint
+TAIL_BYTES = 4096
+
+
+def tail_digest(path, size):
+    """SHA-1 of the TAIL_BYTES of ``path`` that end at offset ``size``."""
+    with open(path, 'rb') as f:
+        f.seek(max(0, size - TAIL_BYTES))
+        return hashlib.sha1(f.read(min(size, TAIL_BYTES))).hexdigest()
+
+
+def line_end(path, position):
+    """Offset just past the last line break of ``path`` at or before byte ``position``."""
+    with open(path, 'rb') as f:
+        while position > 0:
+            start = max(0, position - TAIL_BYTES)
+            f.seek(start)
+            block = f.read(position - start)
+            newline = block.rfind(b'\n')
+            if newline >= 0:
+                return start + newline + 1
+            position = start
+    return 0
+
+
+class Partition:
+    """
+    One input file; ``name`` is its path relative to the source.
+
+    The ``size`` of a CSV file ends at its last line break: everything read
+    from it stops there, and its fingerprint is taken there.
+    """
+
+    def __init__(self, path, name):
+        stat = os.stat(path)
+        self.path = path
+        self.name = name
+        self.format = 'csv' if path.endswith('.csv') else 'parquet'
+        self.size = line_end(path, stat.st_size) if self.format == 'csv' else stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+
+    def fingerprint(self):
+        return {'size': self.size, 'mtime_ns': self.mtime_ns, 'tail': tail_digest(self.path, self.size)}
+
+    def extends(self, fingerprint):
+        """Whether this CSV file is ``fingerprint``'s file with rows (or nothing) added at the end."""
+        return (self.format == 'csv' and self.size >= fingerprint['size']
+                and tail_digest(self.path, fingerprint['size']) == fingerprint['tail'])
+
+    def __repr__(self):
+        return f'Partition({self.name!r}, {self.size} bytes)'
+
+
+def list_partitions(source):
+    """The partitions of a CSV file, a Parquet file or a partitioned Parquet directory."""
+    if not os.path.isdir(source):
+        return [Partition(source, os.path.basename(source))]
+    partitions = []
+    for directory, subdirectories, files in os.walk(source):
+        subdirectories.sort()
+        for name in sorted(files):
+            if name.endswith('.parquet'):
+                path = os.path.join(directory, name)
+                partitions.append(Partition(path, os.path.relpath(path, source)))
+    return partitions
+
+
+def plan_reads(seen, partitions):
+    """
+    Work out what has to be read to catch up with ``partitions``.
+
+    ``seen`` maps partition names to the fingerprints recorded when they
+    were last read. Returns a list of ``(partition, offset)`` pairs, where
+    ``offset`` is the byte offset new rows start at (0 for whole files), or
+    None if a partition was removed or rewritten and everything has to be
+    read again.
+    """
+    names = {partition.name for partition in partitions}
+    if any(name not in names for name in seen):
+        return None
+
+    reads = []
+    for partition in partitions:
+        fingerprint = seen.get(partition.name)
+        if fingerprint is None:
+            reads.append((partition, 0))
+        elif (partition.size, partition.mtime_ns) == (fingerprint['size'], fingerprint['mtime_ns']):
+            continue
+        elif partition.extends(fingerprint):
+            if partition.size > fingerprint['size']:
+                reads.append((partition, fingerprint['size']))
+        elif partition.fingerprint() != fingerprint:
+            return None
+    return reads
+
+
+def partition_columns(partition):
+    """
+    Column names of a partition, from its Parquet schema or its CSV header.
+
+    Parquet partitions also list the DERIVED_COLUMNS read_partition computes.
+    """
+    if partition.format == 'parquet':
+        import pyarrow.parquet as pq
+
+        names = pq.ParquetFile(partition.path).schema_arrow.names
+        return names + [name for name, needed in DERIVED_COLUMNS.items()
+                        if name not in names and set(needed) <= set(names)]
+    with open(partition.path, 'rb') as f:
+        return f.readline().decode('utf-8').rstrip('\r\n').split(',')
+
+
+def line_start(path, position):
+    """Offset of the first line of ``path`` that starts at or after byte ``position``."""
+    if position == 0:
+        return 0
+    with open(path, 'rb') as f:
+        f.seek(position - 1)
+        f.readline()
+        return f.tell()
+
+
+def read_partition(partition, columns=None, chunk_rows=1_000_000, offset=0, end=None):
+    """
+    Yield a partition's rows as DataFrames of up to ``chunk_rows`` rows.
+
+    CSV partitions can be read from byte ``offset`` up to byte ``end``; both
+    must be line starts (see line_start). Readers that record a partition's
+    fingerprint pass its ``size`` as ``end``, so they read exactly the rows
+    the fingerprint covers.
+    """
+    import pandas as pd
+
+    if partition.format == 'parquet':
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(partition.path)
+        names = columns if columns is not None else partition_columns(partition)
+        stored = set(parquet.schema_arrow.names)
+        read = [name for name in names if name in stored]
+        for name in names:
+            if name not in stored:
+                read += [needed for needed in DERIVED_COLUMNS[name] if needed not in read]
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=read):
+            yield derive_columns(batch.to_pandas(), names)[names]
+        return
+
+    with open(partition.path, 'rb') as f:
+        header = f.readline().decode('utf-8').rstrip('\r\n').split(',')
+        if offset:
+            f.seek(offset)
+        if end is not None and end <= f.tell():
+            return
+        stream = f if end is None else io.BytesIO(f.read(end - f.tell()))
+        reader = pd.read_csv(stream, header=None, names=header, usecols=columns, chunksize=chunk_rows,
+                             encoding='utf-8')
+        yield from reader
@@ -0,0 +1,102 @@
+"""
+Streaming top-N products.
+
+Ranking products with a groupby over the transactions and a sort keeps
+every row in memory and groups it again for each ranking. ProductTotals
+keeps one row of sums per product instead (transactions, units, revenue and
+unit prices, money in integer cents like the cube), updated chunk by chunk,
+so its memory is bounded by the size of the catalog and any number of rows
+can be streamed through it in one pass. The revenue, quantity and average
+price rankings are all read from those sums, each picking its top ``n``
+with a heap of ``n`` entries (see cube.rank_products). The sums are exact,
+so the catalog being small makes a count-min sketch unnecessary.
+"""
+import numpy as np
+
+from .cube import MEASURES, RANKINGS, rank_products, to_cents
+
+
+class ProductTotals:
+    """
+    Running per-product sums of MEASURES over transaction chunks.
+
+    Args:
+        key: Column products are told apart by, 'product_id' or
+            'product_name' (several products can share a name).
+    """
+
+    def __init__(self, key='product_id'):
+        self.key = key
+        self.names = {}
+        self._rows = {}
+        self._totals = np.zeros((0, len(MEASURES)), dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df, chunk_rows=1_000_000, key='product_id'):
+        """Sum an in-memory transaction table, ``chunk_rows`` rows at a time."""
+        totals = cls(key)
+        for start in range(0, len(df), chunk_rows):
+            totals.update(df.iloc[start:start + chunk_rows])
+        return totals
+
+    def _row(self, product_id):
+        row = self._rows.get(product_id)
+        if row is None:
+            row = self._rows[product_id] = len(self._rows)
+            if row >= len(self._totals):
+                grown = np.zeros((max(2 * len(self._totals), 64), len(MEASURES)), dtype=np.int64)
+                grown[:len(self._totals)] = self._totals
+                self._totals = grown
+        return row
+
+    def update(self, chunk):
+        """Add a chunk of transactions."""
+        import pandas as pd
+
+        codes, product_ids = pd.factorize(chunk[self.key].to_numpy())
+        sums = np.zeros((len(product_ids), len(MEASURES)), dtype=np.int64)
+        measures = [np.ones(len(chunk), dtype=np.int64),
+                    chunk['quantity'].to_numpy(dtype=np.int64),
+                    to_cents(chunk['total_sales']),
+                    to_cents(chunk['unit_price'])]
+        for column, values in enumerate(measures):
+            np.add.at(sums[:, column], codes, values)
+        rows = np.array([self._row(product_id) for product_id in product_ids.tolist()], dtype=np.int64)
+        self._totals[rows] += sums
+
+        if self.key != 'product_id':
+            return self
+        _, first = np.unique(codes, return_index=True)
+        for product_id, product_name in zip(product_ids.tolist(), chunk['product_name'].to_numpy()[first].tolist()):
+            self.names.setdefault(product_id, product_name)
+        return self
+
+    def merge(self, other):
+        """Add the sums of another ProductTotals with the same key."""
+        if other.key != self.key:
+            raise ValueError(f"Cannot merge totals by {other.key!r} into totals by {self.key!r}")
+        for product_id, row in other._rows.items():
+            target = self._row(product_id)
+            self._totals[target] += other._totals[row]
+        for product_id, product_name in other.names.items():
+            self.names.setdefault(product_id, product_name)
+        return self
+
+    def totals(self):
+        """The sums as a DataFrame of MEASURES indexed by the key column."""
+        import pandas as pd
+
+        return pd.DataFrame(self._totals[:len(self._rows)], columns=MEASURES,
+                            index=pd.Index(list(self._rows), name=self.key))
+
+    def top(self, n=10, by='revenue'):
+        """Top ``n`` products by 'revenue', 'quantity' or average 'unit_price'."""
+        return rank_products(self.totals(), self._names(), n, by)
+
+    def tops(self, n=10):
+        """Every ranking of ``top``, keyed by ranking name."""
+        totals = self.totals()
+        return {by: rank_products(totals, self._names(), n, by) for by in RANKINGS}
+
+    def _names(self):
+        return self.names if self.key == 'product_id' else None
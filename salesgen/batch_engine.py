@@ -0,0 +1,254 @@
+"""
+Vectorized day-batch transaction engine.
+
+Generates a whole day's transactions with NumPy array operations instead of
+building them one dict at a time. The rules are the loop engine's: the
+segment weights and category preferences, quantity tables, daily volume and
+seasonal and segment pricing are imported from simulation.py, and only the
+drawing is vectorized here. The result is columnar:
+one array per output column, with products, customers and loyalty tiers
+kept as integer codes until `to_frame` maps them back to strings.
+
+The one behavioural difference is that customer selection weights are
+frozen at the start of each day; order counts (and therefore loyalty tiers
+and the weights for the next day) are then updated from the whole batch.
+
+Every day draws from its own random streams (see day_rngs), seeded by the
+run's seed and the day's index in the dataset, so a sequential run, the
+sharded runs of parallel.py and a run continued from a checkpoint all
+produce the same transactions.
+"""
+import numpy as np
+
+from .profiling import NULL_PROFILER
+from .simulation import (CATEGORIES, SEGMENT_PRICE_FACTORS, SEGMENT_WEIGHT_BY_CODE, base_qty,
+                         daily_transactions, seasonal_price_factor, segment_preferences)
+from .state import LOYALTY_TIERS, SEGMENTS, CustomerState, day_number, loyalty_codes
+
+# The loop engine's rules (simulation.py) as arrays indexed by segment code
+SEGMENT_WEIGHTS = np.array(SEGMENT_WEIGHT_BY_CODE)
+SEGMENT_PRICES = np.array([SEGMENT_PRICE_FACTORS[segment] for segment in SEGMENTS])
+
+COLUMNS = ['transaction_id', 'date', 'product_id', 'product_name', 'quantity',
+           'unit_price', 'total_sales', 'customer_id', 'city', 'loyalty_tier']
+
+
+def day_rngs(seed, day_index):
+    """Return the (customer, detail) generators for day ``day_index`` of the dataset."""
+    return (np.random.default_rng([seed, day_index, 0]),
+            np.random.default_rng([seed, day_index, 1]))
+
+
+def order_count_multipliers(order_counts):
+    return np.where(order_counts > 0, np.minimum(order_counts * 0.5 + 1, 5.0), 1.0)
+
+
+def _ragged_table(rows):
+    """Pack a list of lists into a padded 2-D array plus per-row lengths."""
+    lengths = np.array([len(row) for row in rows], dtype=np.int64)
+    table = np.zeros((len(rows), max(lengths.max(), 1)), dtype=np.int64)
+    for i, row in enumerate(rows):
+        table[i, :len(row)] = row
+    return table, lengths
+
+
+def customer_column(customers, name):
+    """One customer field as an array, from a customer table or a list of dicts."""
+    if hasattr(customers, 'columns'):
+        return customers[name].to_numpy(dtype=object)
+    return np.array([c[name] for c in customers], dtype=object)
+
+
+class BatchEngine:
+    """
+    Holds the catalog, customer arrays and RNG for day-batch generation.
+
+    ``customers`` is either a list of customer dicts or a customer table
+    (DataFrame) as built by customers.build_customer_table.
+    """
+
+    def __init__(self, customers, products, seed=42, power_customers=100, profiler=NULL_PROFILER,
+                 base_volume=100):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.profiler = profiler
+        self.base_volume = base_volume
+        self.customers = customers
+        self.products = products
+
+        self.state = CustomerState.for_customers(customers)
+        self.customer_ids = customer_column(customers, 'customer_id')
+        self.cities = customer_column(customers, 'city')
+        self.base_weight = SEGMENT_WEIGHTS[self.state.segment]
+        self._create_power_customers(power_customers)
+
+        category_index = {name: i for i, name in enumerate(CATEGORIES)}
+        self.product_category = np.array([category_index[p['subcategory']] for p in products], dtype=np.int64)
+        self.base_price = np.array([p['base_price'] for p in products], dtype=np.float64)
+
+        # Products of each category, padded so one fancy-index picks them all
+        self.category_products, self.category_sizes = _ragged_table(
+            [np.flatnonzero(self.product_category == c) for c in range(len(CATEGORIES))]
+        )
+        self.segment_categories, self.segment_category_counts = _ragged_table(
+            [[category_index[c] for c in segment_preferences[s]['preferred_categories']] for s in SEGMENTS]
+        )
+        self.qty_table, self.qty_sizes = _ragged_table([base_qty[c] for c in CATEGORIES])
+
+        self.next_transaction_id = 1
+        # Index in the dataset of the day ``day`` generates next
+        self.next_day = 0
+
+    def _create_power_customers(self, num_power_customers):
+        """Give some customers a head start so higher tiers exist from day one."""
+        num_power_customers = min(num_power_customers, len(self.state))
+        chosen = self.rng.choice(len(self.state), size=num_power_customers, replace=False)
+        self.state.set_history(chosen, self.rng.integers(2, 16, size=num_power_customers),
+                               self.rng.integers(500, 5001, size=num_power_customers))
+
+    def daily_volume(self, date_info, base_volume=100, rng=None):
+        """The day's transaction count, drawn as in the loop engine."""
+        return daily_transactions(date_info, self.customers, self.products, base_volume,
+                                  self.rng if rng is None else rng)
+
+    def draw_customers(self, date_info, base_volume=100, rng=None):
+        """Draw the day's volume and its customers; weights are frozen for the day."""
+        rng = self.rng if rng is None else rng
+        n = self.daily_volume(date_info, base_volume, rng)
+        weights = self.base_weight * order_count_multipliers(self.state.order_count)
+        return rng.choice(len(weights), size=n, p=weights / weights.sum())
+
+    def generate_day(self, date_info, base_volume=100, customer_rng=None, detail_rng=None):
+        """
+        Generate one day of transactions as a dict of column arrays.
+
+        Draws come from ``customer_rng`` (volume and customers) and
+        ``detail_rng`` (everything else), the engine's own RNG stream by
+        default. Separate streams let the sharded runner replay the customer
+        draws without generating the details.
+        """
+        profiler = self.profiler
+        with profiler.stage('customer_selection'):
+            customer = self.draw_customers(date_info, base_volume, customer_rng)
+        rng = self.rng if detail_rng is None else detail_rng
+        n = len(customer)
+        segment = self.state.segment[customer]
+
+        with profiler.stage('product_selection'):
+            # Category uniformly among the segment's preferred ones, then product
+            slot = (rng.random(n) * self.segment_category_counts[segment]).astype(np.int64)
+            category = self.segment_categories[segment, slot]
+            slot = (rng.random(n) * self.category_sizes[category]).astype(np.int64)
+            product = self.category_products[category, slot]
+
+        with profiler.stage('quantity'):
+            slot = (rng.random(n) * self.qty_sizes[category]).astype(np.int64)
+            quantity = self.qty_table[category, slot]
+            quantity += (segment == 0) & (rng.random(n) < 0.3)
+
+        with profiler.stage('unit_price'):
+            unit_price = (self.base_price[product]
+                          * seasonal_price_factor(date_info)
+                          * SEGMENT_PRICES[segment]
+                          * rng.uniform(0.95, 1.05, size=n)).round(2)
+            total_sales = (quantity * unit_price).round(2)
+
+        with profiler.stage('cx_history'):
+            # Loyalty is the tier *before* each purchase, so count earlier
+            # purchases by the same customer within this batch.
+            order = np.argsort(customer, kind='stable')
+            sorted_customers = customer[order]
+            group_start = np.flatnonzero(np.r_[True, sorted_customers[1:] != sorted_customers[:-1]])
+            group_sizes = np.diff(np.r_[group_start, n])
+            rank = np.empty(n, dtype=np.int64)
+            rank[order] = np.arange(n) - np.repeat(group_start, group_sizes)
+            loyalty = loyalty_codes(self.state.order_count[customer] + rank)
+            self.state.record_purchases(customer, total_sales, day_number(date_info['date']))
+
+        transaction_id = np.arange(self.next_transaction_id, self.next_transaction_id + n)
+        self.next_transaction_id += n
+
+        return {
+            'transaction_id': transaction_id,
+            'date': np.full(n, np.datetime64(date_info['date'].date())),
+            'product': product,
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'total_sales': total_sales,
+            'customer': customer,
+            'loyalty': loyalty,
+        }
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['profiler']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.profiler = NULL_PROFILER
+
+    def day(self, date_info):
+        """Generate the next day of the dataset from that day's streams (see day_rngs)."""
+        customer_rng, detail_rng = day_rngs(self.seed, self.next_day)
+        self.next_day += 1
+        return self.generate_day(date_info, self.base_volume, customer_rng, detail_rng)
+
+    @staticmethod
+    def rows(batch):
+        return len(batch['transaction_id'])
+
+    def frame(self, batches):
+        """Concatenate day batches into one DataFrame."""
+        with self.profiler.stage('to_frame'):
+            return self.to_frame(concat_batches(batches))
+
+    def to_frame(self, batch):
+        """Map a columnar batch back to the loop engine's DataFrame layout."""
+        import pandas as pd
+
+        product_ids = np.array([p['product_id'] for p in self.products], dtype=object)
+        product_names = np.array([p['product_name'] for p in self.products], dtype=object)
+        tiers = np.array(LOYALTY_TIERS, dtype=object)
+
+        return pd.DataFrame({
+            'transaction_id': np.char.add('T', np.char.zfill(batch['transaction_id'].astype(str), 6)),
+            'date': np.datetime_as_string(batch['date'], unit='D'),
+            'product_id': product_ids[batch['product']],
+            'product_name': product_names[batch['product']],
+            'quantity': batch['quantity'],
+            'unit_price': batch['unit_price'],
+            'total_sales': batch['total_sales'],
+            'customer_id': self.customer_ids[batch['customer']],
+            'city': self.cities[batch['customer']],
+            'loyalty_tier': tiers[batch['loyalty']],
+        }, columns=COLUMNS)
+
+
+def concat_batches(batches):
+    """Concatenate day batches column by column."""
+    if not batches:
+        return {}
+    return {key: np.concatenate([b[key] for b in batches]) for key in batches[0]}
+
+
+def iter_sales_chunks_batch(customers, products, date_data, chunk_rows=None, seed=42, base_volume=100,
+                            profiler=NULL_PROFILER):
+    """
+    Yield transactions as DataFrames of at least ``chunk_rows`` rows.
+
+    Chunks are flushed on day boundaries; with ``chunk_rows=None`` the whole
+    run is yielded as a single chunk.
+    """
+    from .runner import iter_day_chunks
+
+    engine = BatchEngine(customers, products, seed=seed, base_volume=base_volume)
+    for chunk, _ in iter_day_chunks(engine, date_data, chunk_rows, profiler):
+        yield chunk
+
+
+def generate_sales_data_batch(customers, products, date_data, seed=42, base_volume=100):
+    import pandas as pd
+
+    return pd.concat(iter_sales_chunks_batch(customers, products, date_data, seed=seed,
+                                             base_volume=base_volume), ignore_index=True)
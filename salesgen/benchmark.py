@@ -0,0 +1,189 @@
+"""
+Benchmark harness: ``python -m salesgen.benchmark``.
+
+Runs the generator over a grid of customer counts, catalog sizes and date
+spans, or over the fixed-seed 1x/100x/1000x scenarios, and records rows per
+second, peak RSS and the time spent in every stage (population, calendar,
+transaction generation, writing), with transaction generation broken down
+by the engine's profiler stages. Each scenario runs in its own process
+so its peak RSS is not inflated by the ones before it. Results are written
+as JSON so runs can be compared across commits.
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .profiling import Profiler, peak_rss_mb
+
+# Fixed-seed scenarios. 1x is the default dataset (~55k rows over 13
+# months); the larger ones scale customers and daily volume together.
+SCENARIOS = {
+    '1x': {'n_customers': 1000, 'base_volume': 100},
+    '100x': {'n_customers': 100_000, 'base_volume': 10_000},
+    '1000x': {'n_customers': 1_000_000, 'base_volume': 100_000},
+}
+
+START_DATE = dt.datetime(2023, 7, 1)
+
+# Reported engine stages and the profiler stages (see salesgen.profiling)
+# each one adds up. Sharded runs only time the merge's serialization; the
+# other stages run in the workers.
+ENGINE_STAGES = {
+    'customer_selection': ('customer_selection',),
+    'product_selection': ('product_selection',),
+    'quantity': ('quantity',),
+    'pricing': ('unit_price',),
+    'customer_history': ('cx_history',),
+    'serialization': ('to_frame', 'write'),
+}
+
+
+def add_months(date, months):
+    """Last day before ``date`` moved forward by ``months`` months."""
+    year, month = divmod(date.month - 1 + months, 12)
+    return date.replace(year=date.year + year, month=month + 1) - dt.timedelta(days=1)
+
+
+def build_scenarios(scales=None, customers=None, products_per_category=None, months=None):
+    """
+    Expand the requested scales and grid axes into a list of scenarios.
+
+    Grid axes left as None fall back to the default dataset's value; named
+    scales always span the default 13 months.
+    """
+    scenarios = []
+    for scale in scales or []:
+        scenarios.append(dict(name=scale, products_per_category=15, months=13, **SCENARIOS[scale]))
+
+    if customers or products_per_category or months:
+        for n_customers in customers or [1000]:
+            for per_category in products_per_category or [15]:
+                for n_months in months or [13]:
+                    scenarios.append({
+                        'name': f'c{n_customers}-p{per_category}-m{n_months}',
+                        'n_customers': n_customers,
+                        'products_per_category': per_category,
+                        'months': n_months,
+                        'base_volume': 100,
+                    })
+    return scenarios
+
+
+def run_scenario(scenario, engine='batch', fmt='parquet', chunk_rows=None, workers=None,
+                 customer_synthesis='bulk', seed=42):
+    """Generate one scenario into a temporary directory and time every stage."""
+    from .generator import SalesGenerator, output_paths
+    from .writers import open_chunk_writer
+
+    generator = SalesGenerator(start_date=START_DATE,
+                               end_date=add_months(START_DATE, scenario['months']),
+                               n_customers=scenario['n_customers'],
+                               products_per_category=scenario['products_per_category'],
+                               seed=seed, engine=engine, base_volume=scenario['base_volume'],
+                               customer_synthesis=customer_synthesis)
+    profiler = Profiler()
+    started = time.perf_counter()
+
+    with profiler.stage('population'):
+        products = generator.products
+        customers = generator.customer_table
+    with profiler.stage('calendar'):
+        date_data = generator.date_data
+
+    output_dir = tempfile.mkdtemp(prefix='salesgen-bench-')
+    rows = 0
+    try:
+        with open_chunk_writer(output_paths(output_dir, fmt)['sales'], fmt) as writer:
+            chunks = iter(generator.iter_chunks(chunk_rows, workers, profiler))
+            while True:
+                with profiler.stage('transactions'):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                with profiler.stage('write'):
+                    writer.write(chunk)
+                rows += len(chunk)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    seconds = time.perf_counter() - started
+    timings = {name: value['seconds'] for name, value in profiler.report()['stages'].items()}
+    return dict(scenario, engine=engine, format=fmt, chunk_rows=chunk_rows, workers=workers,
+                customer_synthesis=customer_synthesis, seed=seed, rows=rows,
+                products=len(products), customers=len(customers), days=len(date_data),
+                seconds=round(seconds, 3), rows_per_sec=round(rows / seconds, 1),
+                peak_rss_mb=round(peak_rss_mb(), 1),
+                stages={name: round(timings.get(name, 0.0), 3)
+                        for name in ('population', 'calendar', 'transactions', 'write')},
+                engine_stages={name: round(sum(timings.get(stage, 0.0) for stage in stages), 3)
+                               for name, stages in ENGINE_STAGES.items()})
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='salesgen.benchmark',
+                                     description="Benchmark the sales data generator.")
+    parser.add_argument('--scale', action='append', choices=list(SCENARIOS),
+                        help="fixed-seed scenario to run; repeat for several (default: 1x)")
+    parser.add_argument('--customers', type=int, nargs='+',
+                        help="grid: customer counts")
+    parser.add_argument('--products-per-category', type=int, nargs='+',
+                        help="grid: products per subcategory")
+    parser.add_argument('--months', type=int, nargs='+',
+                        help="grid: date spans in months, starting 2023-07-01")
+    parser.add_argument('--engine', choices=['loop', 'batch'], default='batch')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='parquet')
+    parser.add_argument('--customer-synthesis', choices=['faker', 'bulk'], default='bulk')
+    parser.add_argument('--chunk-rows', type=int, default=500_000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help="JSON file the results are written to")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.workers and args.engine != 'batch':
+        parser.error("--workers requires --engine batch")
+
+    grid = args.customers or args.products_per_category or args.months
+    scenarios = build_scenarios(args.scale or ([] if grid else ['1x']),
+                                args.customers, args.products_per_category, args.months)
+
+    results = []
+    for scenario in scenarios:
+        print(f"Running {scenario['name']}...")
+        # A fresh process per scenario keeps peak RSS attributable to it
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(run_scenario, scenario, args.engine, args.format, args.chunk_rows,
+                                 args.workers, args.customer_synthesis, args.seed).result()
+        print(f"  {result['rows']:,} rows in {result['seconds']:.2f}s "
+              f"({result['rows_per_sec']:,.0f} rows/s, peak RSS {result['peak_rss_mb']:.0f} MB)")
+        print("  " + ", ".join(f"{name} {value:.2f}s" for name, value in result['stages'].items()))
+        print("  " + ", ".join(f"{name} {value:.2f}s" for name, value in result['engine_stages'].items()))
+        results.append(result)
+
+    report = {
+        'created': dt.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    import sys
+
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""Product catalog definition and generation."""
+
+# Structure definition
+structure = {
+    'subcategories': ['smartphones', 'laptops', 'tablets', 'accessories', 'smartwatches', 'cameras'],
+    'brands': ['Apple', 'Samsung', 'Sony', 'Dell', 'HP', 'Lenovo', 'Microsoft', 'Google'],
+    'regions': ['North', 'South', 'East', 'West']
+}
+
+
+def build_products(rng, per_category=15):
+    """Generate ``per_category`` products for every subcategory."""
+    all_products = []
+    product_id = 1
+
+    for subcategory in structure['subcategories']:
+        for _ in range(per_category): 
+            brand = rng.choice(structure['brands'])
+            product_name = f"{brand} {subcategory.capitalize()} {rng.choice(['Pro', 'Plus', 'Max', 'Mini', 'SE'])}"
+            base_price = round(rng.uniform(200, 1200), 2)
+
+            product = {
+                'product_id': f'P{product_id:04d}',
+                'product_name': product_name,
+                'subcategory': subcategory,
+                'brand': brand,
+                'base_price': base_price,
+                'cost_price': round(base_price * 0.6, 2), 
+                'popularity_factor': rng.randint(1, 10),  
+                'seasonal_factor': 1.2,
+                'stock_level': rng.randint(15, 80)   
+            }
+
+            all_products.append(product)
+            product_id += 1
+
+    return all_products
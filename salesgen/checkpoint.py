@@ -0,0 +1,53 @@
+"""
+Generator checkpoints, so a dataset can be extended instead of regenerated.
+
+A checkpoint is a pickle stored next to the output it describes. It holds
+everything a run needs to carry on as if it had never stopped: the
+generator parameters, the catalog and customers, the engine (its RNG
+streams, customer history and next transaction_id) and the running
+SalesSummary. It also records how far the sales output had been written
+(see the writers' ``position``), so output written after the checkpoint
+can be discarded before a run continues from it. Checkpoints are written
+to a temporary file and renamed into place, so a crash while saving leaves
+the previous checkpoint intact.
+
+Every checkpoint holds the whole population, so its size grows with the
+number of customers.
+"""
+import os
+import pickle
+
+CHECKPOINT_NAME = 'salesgen_checkpoint.pkl'
+CHECKPOINT_VERSION = 2
+
+
+def checkpoint_path(output_dir):
+    return os.path.join(output_dir, CHECKPOINT_NAME)
+
+
+def remove_checkpoint(output_dir):
+    path = checkpoint_path(output_dir)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def save_checkpoint(path, state):
+    """Atomically write the ``state`` dict to ``path``."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(dict(state, version=CHECKPOINT_VERSION), f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    """Read a checkpoint written by save_checkpoint."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No checkpoint at {path}; write the dataset with checkpoint=True first")
+    with open(path, 'rb') as f:
+        state = pickle.load(f)
+    if state.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Checkpoint {path} has version {state.get('version')!r}; "
+                         f"expected {CHECKPOINT_VERSION}")
+    return state
@@ -0,0 +1,149 @@
+"""Command-line entry point: ``python -m salesgen``."""
+import argparse
+import datetime as dt
+import sys
+
+
+def _date(value):
+    return dt.datetime.strptime(value, '%Y-%m-%d')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='salesgen',
+                                     description="Generate synthetic electronics sales data.")
+    parser.add_argument('--output-dir', default='.',
+                        help="directory the output files are written to")
+    parser.add_argument('--start-date', type=_date, default=dt.datetime(2023, 7, 1),
+                        help="first simulated day (YYYY-MM-DD)")
+    parser.add_argument('--end-date', type=_date, default=dt.datetime(2024, 7, 31),
+                        help="last simulated day (YYYY-MM-DD)")
+    parser.add_argument('--customers', type=int, default=1000,
+                        help="number of customers to generate")
+    parser.add_argument('--customer-synthesis', choices=['faker', 'bulk'], default='faker',
+                        help="'faker' builds customers one Faker call at a time; 'bulk' assembles "
+                             "them with vectorized draws from pre-sampled vocabularies")
+    parser.add_argument('--products-per-category', type=int, default=15,
+                        help="products generated for every subcategory")
+    parser.add_argument('--base-volume', type=int, default=100,
+                        help="average transactions on an ordinary day, before multipliers")
+    parser.add_argument('--seed', type=int, default=42,
+                        help="seed for every random stream")
+    parser.add_argument('--engine', choices=['loop', 'batch'], default='loop',
+                        help="'loop' builds one transaction at a time; 'batch' generates whole days with NumPy")
+    parser.add_argument('--chunk-rows', type=int, default=None,
+                        help="stream transactions to disk in chunks of this many rows instead of "
+                             "building one DataFrame for the whole run")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="generate date-range shards on this many processes (batch engine only); "
+                             "output is identical for any worker count, and to a batch run without --workers")
+    parser.add_argument('--profile', nargs='?', const='-', default=None, metavar='PATH',
+                        help="emit per-stage timings, rows/sec and memory as JSON lines to PATH "
+                             "(stderr when no PATH is given)")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help="'csv' writes flat files; 'parquet' writes a year/month partitioned "
+                             "dataset with integer IDs and dictionary-encoded strings")
+    parser.add_argument('--checkpoint', action='store_true',
+                        help="save the generator state in the output directory so the dataset can "
+                             "later be extended with --append")
+    parser.add_argument('--checkpoint-every', type=int, default=None, metavar='DAYS',
+                        help="also save the generator state every DAYS simulated days, so an "
+                             "interrupted run can be finished with --resume")
+    parser.add_argument('--resume', action='store_true',
+                        help="finish the interrupted run in --output-dir from its last checkpoint; "
+                             "the result is identical to an uninterrupted run")
+    parser.add_argument('--append', action='store_true',
+                        help="extend the checkpointed dataset in --output-dir through --end-date, "
+                             "generating only the new days; population, engine and format options "
+                             "are taken from the checkpoint")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.workers and args.engine != 'batch' and not (args.append or args.resume):
+        parser.error("--workers requires --engine batch")
+    if args.append and args.resume:
+        parser.error("--append and --resume are mutually exclusive")
+
+    from .profiling import NULL_PROFILER, Profiler
+
+    run = append if args.append else resume if args.resume else generate
+    if not args.profile:
+        return run(args, NULL_PROFILER)
+    if args.profile == '-':
+        return run(args, Profiler(sys.stderr))
+    with open(args.profile, 'w') as stream:
+        return run(args, Profiler(stream))
+
+
+def generate(args, profiler):
+    from .generator import SalesGenerator
+
+    generator = SalesGenerator(start_date=args.start_date, end_date=args.end_date,
+                               n_customers=args.customers,
+                               products_per_category=args.products_per_category,
+                               seed=args.seed, engine=args.engine, base_volume=args.base_volume,
+                               customer_synthesis=args.customer_synthesis)
+
+    print("Starting data generation...")
+    with profiler.stage('population'):
+        print(f"Generated {len(generator.products)} products")
+        print(f"Generated {len(generator.customer_table)} customers")
+    with profiler.stage('calendar'):
+        print(f"Generated {len(generator.date_data)} days of data")
+
+    print("Generating sales transactions...")
+    paths, summary = generator.write(args.output_dir, args.format, args.chunk_rows, args.workers,
+                                     profiler, checkpoint=args.checkpoint,
+                                     checkpoint_every=args.checkpoint_every)
+    report(paths, summary)
+    return 0
+
+
+def append(args, profiler):
+    from .generator import SalesGenerator
+
+    generator = SalesGenerator.from_checkpoint(args.output_dir)
+    print(f"Appending {generator.end_date + dt.timedelta(days=1):%Y-%m-%d} to {args.end_date:%Y-%m-%d} "
+          f"to {args.output_dir}...")
+    paths, summary = generator.append(args.output_dir, args.end_date, args.chunk_rows, args.workers,
+                                      profiler, args.checkpoint_every)
+    report(paths, summary)
+    return 0
+
+
+def resume(args, profiler):
+    from .generator import SalesGenerator
+
+    generator = SalesGenerator.from_checkpoint(args.output_dir)
+    if generator.complete:
+        print(f"{args.output_dir} is complete through {generator.end_date:%Y-%m-%d}; nothing to resume")
+    else:
+        print(f"Resuming {args.output_dir} after {generator.end_date:%Y-%m-%d}...")
+    paths, summary = generator.resume(args.output_dir, args.chunk_rows, args.workers, profiler,
+                                      args.checkpoint_every)
+    report(paths, summary)
+    return 0
+
+
+def report(paths, summary):
+    print("\nSample transactions:")
+    print(summary.sample)
+
+    print(f"Generated {summary.rows} total transactions")
+    print(f"Date range: {summary.date_min} to {summary.date_max}")
+    print(f"Total revenue: ${summary.revenue:,.2f}")
+
+    # Monthly summary
+    print("\nMonthly revenue summary:")
+    for month, revenue in sorted(summary.monthly_revenue.items()):
+        print(f"{month}: ${revenue:,.2f}")
+
+    print("\nAll files have been created successfully!")
+    print("Files created:")
+    print(f"- {paths['sales']} (main transaction data)")
+    print(f"- {paths['products']} (product catalog)")
+    print(f"- {paths['customers']} (customer information)")
+    print(f"- {paths['calendar']} (calendar features by date_key)")
+    print(f"- {paths['summary']} (summary statistics)")
@@ -0,0 +1,185 @@
+"""Customer segments, geography and customer generation."""
+
+from .sampling import AliasTable
+
+# Customer segments
+customer_segments = {
+    'Premium': {
+        "percentage": 0.15, 
+        'income_range': (80000, 150000),
+        'avg_order_value': (500, 1000),
+        'order_frequency': 'high', 
+        'preferred_categories': ['smartphones', 'laptops', 'cameras']
+    },
+    'Regular': {
+        'percentage': 0.6,
+        'income_range': (40000, 80000),
+        'avg_order_value': (200, 500),
+        'order_frequency': 'medium',
+        'preferred_categories': ['tablets', 'accessories', 'smartwatches']
+    },
+    'Budget': {
+        'percentage': 0.25,
+        'income_range': (20000, 40000),
+        'avg_order_value': (50, 200),
+        'order_frequency': 'low',
+        'preferred_categories': ['accessories', 'smartwatches']
+    }
+}
+
+# Cities distribution
+cities_distribution = {
+    'New York': {'weight': 20, 'state': 'NY'},
+    'Los Angeles': {'weight': 15, 'state': 'CA'},
+    'Chicago': {'weight': 12, 'state': 'IL'},
+    'Houston': {'weight': 10, 'state': 'TX'},
+    'Phoenix': {'weight': 8, 'state': 'AZ'},
+    'Philadelphia': {'weight': 7, 'state': 'PA'},
+    'San Antonio': {'weight': 6, 'state': 'TX'},
+    'San Diego': {'weight': 5, 'state': 'CA'},
+    'Dallas': {'weight': 5, 'state': 'TX'},
+    'Other': {'weight': 12, 'state': 'Various'}
+}
+
+# Alias tables for the static customer draws, built once at import
+SEGMENT_TABLE = AliasTable([s['percentage'] for s in customer_segments.values()],
+                           items=list(customer_segments))
+CITY_TABLE = AliasTable([c['weight'] for c in cities_distribution.values()],
+                        items=list(cities_distribution))
+
+
+def build_customers(rng, n_customers=1000, seed=None):
+    """Generate ``n_customers`` customers; faker is only imported here."""
+    from faker import Faker
+
+    faker = Faker()
+    if seed is not None:
+        faker.seed_instance(seed)
+
+    customers = []
+    customer_id = 1
+
+    for _ in range(n_customers):  
+        segment = SEGMENT_TABLE.choice(rng.random)
+
+        first_name = faker.first_name()
+        last_name = faker.last_name()
+        email = f'{first_name.lower()}.{last_name.lower()}@{faker.free_email_domain()}'
+
+        if segment == 'Premium': 
+            age = rng.randint(30, 55)
+            income = rng.randint(80000, 150000)
+            total_orders = rng.randint(10, 50)
+        elif segment == 'Regular': 
+            age = rng.randint(25, 45)
+            income = rng.randint(40000, 80000)
+            total_orders = rng.randint(5, 30)
+        else:  # Budget
+            age = rng.randint(18, 35)
+            income = rng.randint(20000, 40000)
+            total_orders = rng.randint(1, 10)
+
+        customer = {
+            'customer_id': f'C{customer_id:04d}', 
+            'first_name': first_name,
+            'last_name': last_name,
+            'email': email,
+            'segment': segment,
+            'age': age,
+            'income': income,
+            'total_orders': total_orders,
+            'city': CITY_TABLE.choice(rng.random)
+        }
+        customers.append(customer)
+        customer_id += 1
+
+    return customers
+
+
+# Per-segment (low, high) ranges, inclusive, shared by both generators
+SEGMENT_RANGES = {
+    'Premium': {'age': (30, 55), 'income': (80000, 150000), 'total_orders': (10, 50)},
+    'Regular': {'age': (25, 45), 'income': (40000, 80000), 'total_orders': (5, 30)},
+    'Budget': {'age': (18, 35), 'income': (20000, 40000), 'total_orders': (1, 10)},
+}
+
+CUSTOMER_COLUMNS = ['customer_id', 'first_name', 'last_name', 'email', 'segment',
+                    'age', 'income', 'total_orders', 'city']
+
+
+def sample_vocabulary(size=2000, seed=None):
+    """
+    Draw first names, last names and email domains from Faker once.
+
+    Names keep their repeats, so Faker's own frequency weighting carries
+    over when the bulk generator picks from them uniformly.
+    """
+    import numpy as np
+    from faker import Faker
+
+    faker = Faker()
+    if seed is not None:
+        faker.seed_instance(seed)
+
+    return {
+        'first_name': np.array([faker.first_name() for _ in range(size)], dtype=object),
+        'last_name': np.array([faker.last_name() for _ in range(size)], dtype=object),
+        'domain': np.array(sorted({faker.free_email_domain() for _ in range(size // 10 or 1)}), dtype=object),
+    }
+
+
+def customer_ids(n_customers):
+    """``C0001``-style ids, assembled from a thousands part and a 3-digit part."""
+    import numpy as np
+
+    numbers = np.arange(1, n_customers + 1)
+    thousands = np.array([f'C{h}' for h in range(n_customers // 1000 + 1)], dtype=object)
+    units = np.array([f'{u:03d}' for u in range(1000)], dtype=object)
+    return thousands[numbers // 1000] + units[numbers % 1000]
+
+
+def build_customer_table(n_customers=1000, seed=None, vocabulary=None):
+    """
+    Generate ``n_customers`` customers column by column.
+
+    Same columns and per-segment rules as build_customers, but every field
+    is a vectorized NumPy draw and Faker is only touched to sample the
+    vocabularies, so this scales to tens of millions of customers. Returns
+    a pandas DataFrame.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    if vocabulary is None:
+        vocabulary = sample_vocabulary(seed=seed)
+
+    segment_codes = SEGMENT_TABLE.sample_k(n_customers, rng)
+    segments = np.array(SEGMENT_TABLE.items, dtype=object)
+
+    columns = {}
+    for field in ['age', 'income', 'total_orders']:
+        low, high = np.array([SEGMENT_RANGES[s][field] for s in SEGMENT_TABLE.items]).T
+        columns[field] = rng.integers(low[segment_codes], high[segment_codes] + 1).astype(np.int32)
+
+    first = rng.integers(0, len(vocabulary['first_name']), n_customers)
+    last = rng.integers(0, len(vocabulary['last_name']), n_customers)
+    domain = rng.integers(0, len(vocabulary['domain']), n_customers)
+
+    # One concatenation per row: "first." + "last@domain" from small tables
+    local = np.array([f'{name.lower()}.' for name in vocabulary['first_name']], dtype=object)
+    suffix = np.array([f'{name.lower()}@{d}' for name in vocabulary['last_name']
+                       for d in vocabulary['domain']], dtype=object)
+
+    return pd.DataFrame({
+        'customer_id': customer_ids(n_customers),
+        'first_name': vocabulary['first_name'][first],
+        'last_name': vocabulary['last_name'][last],
+        'email': local[first] + suffix[last * len(vocabulary['domain']) + domain],
+        'segment': pd.Categorical.from_codes(segment_codes, categories=segments),
+        'age': columns['age'],
+        'income': columns['income'],
+        'total_orders': columns['total_orders'],
+        'city': pd.Categorical.from_codes(CITY_TABLE.sample_k(n_customers, rng),
+                                          categories=CITY_TABLE.items),
+    }, columns=CUSTOMER_COLUMNS)
@@ -0,0 +1,113 @@
+"""
+Date range and per-day calendar features.
+
+build_calendar computes every feature for the whole range at once as a
+calendar dimension table keyed by an integer ``date_key`` (YYYYMMDD). The
+engines read their per-day features from it, the writers emit it next to
+the sales data, and analysis joins on date_key instead of re-deriving
+features from date strings row by row. data_information is the original
+one-day version of the same features.
+"""
+CALENDAR_COLUMNS = ['date_key', 'date', 'date_str', 'year', 'month', 'day', 'weekday',
+                    'weekday_name', 'month_name', 'quarter', 'is_weekend', 'week_of_year',
+                    'seasonal_multiplier', 'weekday_multiplier', 'is_holiday_season',
+                    'is_summer', 'is_black_friday', 'is_christmas']
+
+
+def generate_dates(start_date, end_date):
+    import pandas as pd
+
+    return list(pd.date_range(start_date, end_date, freq='D').to_pydatetime())
+
+
+# Date information function
+def data_information(date_obj):
+    date_info = {
+        'date': date_obj,
+        'year': date_obj.year, 
+        'month': date_obj.month, 
+        'day': date_obj.day,
+        'weekday': date_obj.weekday(), 
+        'weekday_name': date_obj.strftime('%A'),
+        'month_name': date_obj.strftime('%B'), 
+        'quarter': (date_obj.month - 1) // 3 + 1,
+        'is_weekend': date_obj.weekday() >= 5,
+        'week_of_year': date_obj.isocalendar()[1]
+    }
+
+    # Seasonal factors
+    month = date_obj.month
+    if month in [11, 12]:  # Holiday season
+        seasonal_factor = 1.5
+    elif month in [6, 7, 8]:  # Summer
+        seasonal_factor = 1.2
+    elif month in [1, 2, 3]:  # Post-holiday
+        seasonal_factor = 0.8
+    else:
+        seasonal_factor = 1.0
+
+    weekday_multiplier = 1.3 if date_obj.weekday() >= 4 else 1.0
+    date_info.update({
+        'seasonal_multiplier': seasonal_factor,
+        'weekday_multiplier': weekday_multiplier
+    })
+    return date_info
+
+
+def date_keys(dates):
+    """YYYYMMDD integer keys for a datetime-like Series."""
+    return (dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day).astype('int32')
+
+
+def build_calendar(start_date, end_date):
+    """
+    One row per day from ``start_date`` to ``end_date`` with every calendar
+    feature the generator and the analysis use, computed column-wise.
+    """
+    import numpy as np
+    import pandas as pd
+
+    dates = pd.Series(pd.date_range(start_date, end_date, freq='D'))
+    month = dates.dt.month.to_numpy()
+    day = dates.dt.day.to_numpy()
+    weekday = dates.dt.dayofweek.to_numpy()
+
+    calendar = pd.DataFrame({
+        'date_key': date_keys(dates),
+        'date': dates,
+        'date_str': dates.dt.strftime('%Y-%m-%d'),
+        'year': dates.dt.year.astype('int16'),
+        'month': month.astype('int8'),
+        'day': day.astype('int8'),
+        'weekday': weekday.astype('int8'),
+        'weekday_name': dates.dt.day_name(),
+        'month_name': dates.dt.month_name(),
+        'quarter': dates.dt.quarter.astype('int8'),
+        'is_weekend': weekday >= 5,
+        'week_of_year': dates.dt.isocalendar().week.to_numpy().astype('int8'),
+        # Holiday season, summer, post-holiday lull, otherwise 1.0
+        'seasonal_multiplier': np.select([np.isin(month, [11, 12]), np.isin(month, [6, 7, 8]),
+                                          np.isin(month, [1, 2, 3])], [1.5, 1.2, 0.8], 1.0),
+        'weekday_multiplier': np.where(weekday >= 4, 1.3, 1.0),
+        'is_holiday_season': np.isin(month, [11, 12]),
+        'is_summer': np.isin(month, [6, 7, 8]),
+        # The price-promotion windows used by call_unit_price
+        'is_black_friday': (month == 11) & (day >= 21) & (day <= 26),
+        'is_christmas': (month == 12) & (day >= 21) & (day <= 30),
+    }, columns=CALENDAR_COLUMNS)
+    return calendar
+
+
+def calendar_records(calendar):
+    """
+    The calendar as one dict per day, the ``date_info`` layout the engines
+    take, with plain Python values and ``date`` as a datetime.
+    """
+    records = calendar.to_dict('records')
+    for record, date in zip(records, calendar['date'].dt.to_pydatetime()):
+        record['date'] = date
+    return records
+
+
+def build_date_data(start_date, end_date):
+    return calendar_records(build_calendar(start_date, end_date))
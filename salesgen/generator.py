@@ -0,0 +1,480 @@
+"""High-level API tying the catalog, customers, calendar and engines together."""
+import datetime as dt
+import os
+import random as rd
+
+from .profiling import NULL_PROFILER
+
+ENGINES = ('loop', 'batch')
+FORMATS = ('csv', 'parquet')
+CUSTOMER_SYNTHESIS = ('faker', 'bulk')
+
+
+def output_paths(output_dir, fmt=None):
+    """
+    Paths of the files a run writes to ``output_dir`` in format ``fmt``.
+
+    With ``fmt=None`` the format is that of the data already in
+    ``output_dir``: Parquet if its sales directory exists, CSV otherwise.
+    """
+    if fmt is None:
+        fmt = 'parquet' if os.path.isdir(os.path.join(output_dir, 'sales_transactions')) else 'csv'
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+    return {
+        'sales': os.path.join(output_dir, 'sales_transactions.csv' if fmt == 'csv' else 'sales_transactions'),
+        'products': os.path.join(output_dir, f'products.{fmt}'),
+        'customers': os.path.join(output_dir, f'customers.{fmt}'),
+        'calendar': os.path.join(output_dir, f'calendar.{fmt}'),
+        'summary': os.path.join(output_dir, 'data_summary.csv'),
+    }
+
+
+class SalesGenerator:
+    """
+    Synthetic electronics sales generator.
+
+    Constructing a generator is free: products, customers and the calendar
+    are built on first use, and numpy, pandas and faker are only imported
+    at that point.
+
+    Args:
+        start_date, end_date: inclusive date range to simulate.
+        n_customers: number of customers to generate.
+        products_per_category: products generated for every subcategory.
+        seed: seed for every random stream (catalog, customers, engines).
+        engine: 'loop' (one transaction at a time) or 'batch' (NumPy day batches).
+        base_volume: average transactions per ordinary day before multipliers.
+        customer_synthesis: 'faker' (one Faker call per field, per customer)
+            or 'bulk' (vectorized columns from pre-sampled vocabularies, for
+            populations in the millions).
+    """
+
+    def __init__(self, start_date=dt.datetime(2023, 7, 1), end_date=dt.datetime(2024, 7, 31),
+                 n_customers=1000, products_per_category=15, seed=42, engine='loop',
+                 base_volume=100, customer_synthesis='faker'):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}; expected one of {ENGINES}")
+        if customer_synthesis not in CUSTOMER_SYNTHESIS:
+            raise ValueError(f"Unknown customer synthesis {customer_synthesis!r}; "
+                             f"expected one of {CUSTOMER_SYNTHESIS}")
+        self.start_date = start_date
+        self.end_date = end_date
+        self.n_customers = n_customers
+        self.products_per_category = products_per_category
+        self.seed = seed
+        self.engine = engine
+        self.base_volume = base_volume
+        self.customer_synthesis = customer_synthesis
+
+        self._rng = rd.Random(seed)
+        self._population_state = None
+        self._products = None
+        self._customers = None
+        self._customer_table = None
+        self._calendar = None
+        self._date_data = None
+        self._checkpoint = None
+
+    def _build_population(self):
+        # Products and customers share one random stream, in that order, so
+        # the population does not depend on which attribute is read first.
+        # Bulk customers draw from their own NumPy generator instead.
+        from .catalog import build_products
+        from .customers import build_customer_table, build_customers
+
+        self._products = build_products(self._rng, self.products_per_category)
+        if self.customer_synthesis == 'bulk':
+            self._customer_table = build_customer_table(self.n_customers, self.seed)
+        else:
+            self._customers = build_customers(self._rng, self.n_customers, self.seed)
+        self._population_state = self._rng.getstate()
+
+    @property
+    def products(self):
+        if self._products is None:
+            self._build_population()
+        return self._products
+
+    @property
+    def customers(self):
+        """Customers as a list of dicts, the layout the loop engine works on."""
+        if self._customers is None:
+            if self._population_state is None:
+                self._build_population()
+            if self._customers is None:
+                self._customers = self.customer_table.to_dict('records')
+        return self._customers
+
+    @property
+    def customer_table(self):
+        """Customers as a columnar DataFrame."""
+        if self._customer_table is None:
+            if self._population_state is None:
+                self._build_population()
+            if self._customer_table is None:
+                import pandas as pd
+
+                self._customer_table = pd.DataFrame(self.customers)
+        return self._customer_table
+
+    def _engine_customers(self):
+        # The batch engines read customers column-wise, so a bulk table is
+        # handed over as is rather than expanded into dicts.
+        if self.customer_synthesis == 'bulk':
+            return self.customer_table
+        return self.customers
+
+    @property
+    def calendar(self):
+        """Calendar dimension table, one row per simulated day keyed by date_key."""
+        if self._calendar is None:
+            from .dates import build_calendar
+
+            self._calendar = build_calendar(self.start_date, self.end_date)
+        return self._calendar
+
+    @property
+    def date_data(self):
+        """The calendar as per-day dicts, the layout the engines iterate over."""
+        if self._date_data is None:
+            from .dates import calendar_records
+
+            self._date_data = calendar_records(self.calendar)
+        return self._date_data
+
+    def _new_engine(self):
+        """An engine at the start of the run, before its first day."""
+        if self.engine == 'batch':
+            from .batch_engine import BatchEngine
+
+            return BatchEngine(self._engine_customers(), self.products, seed=self.seed,
+                               base_volume=self.base_volume)
+
+        import numpy as np
+        from .simulation import LoopEngine
+
+        # Transactions continue the catalog/customer random stream, restarted
+        # from the same point on every call so repeated runs match.
+        products, customers = self.products, self.customers
+        rng = rd.Random()
+        rng.setstate(self._population_state)
+        return LoopEngine(customers, products, rng, np.random.RandomState(self.seed), self.base_volume)
+
+    def _run_engine(self, engine, date_data, chunk_rows=None, workers=None, profiler=NULL_PROFILER,
+                    day_offset=0, flush_every=None):
+        """
+        Yield ``(chunk, days_done)`` pairs for ``date_data``, day ``day_offset``
+        of the dataset onwards, advancing ``engine``.
+
+        ``days_done`` is the number of days of ``date_data`` the chunks so far
+        cover when ``engine`` holds the state at the end of exactly those
+        days, and None when it does not. ``flush_every`` also flushes a chunk
+        every that many days, so such a state comes up at least that often.
+        """
+        if not workers:
+            from .runner import iter_day_chunks
+
+            return iter_day_chunks(engine, date_data, chunk_rows, profiler, flush_every)
+        if self.engine != 'batch':
+            raise ValueError("workers requires the 'batch' engine")
+        return self._run_shards(engine, date_data, chunk_rows, workers, profiler, day_offset, flush_every)
+
+    def _run_shards(self, engine, date_data, chunk_rows, workers, profiler, day_offset, flush_every):
+        from .parallel import iter_sales_chunks_parallel
+
+        # Planning the shards moves the engine to the end of the whole range
+        # at once, so its state only matches the output at the end of a
+        # range. Ranges of flush_every days keep that point coming up.
+        step = flush_every or max(len(date_data), 1)
+        for start in range(0, len(date_data), step):
+            days = date_data[start:start + step]
+            chunks = iter_sales_chunks_parallel(engine.customers, engine.products, days, workers,
+                                                chunk_rows, self.seed, self.base_volume, profiler,
+                                                engine, day_offset + start)
+            chunk = None
+            for next_chunk in chunks:
+                if chunk is not None:
+                    yield chunk, None
+                chunk = next_chunk
+            if chunk is not None:
+                yield chunk, start + len(days)
+
+    def iter_chunks(self, chunk_rows=None, workers=None, profiler=NULL_PROFILER):
+        """
+        Yield the transactions as DataFrame chunks of about ``chunk_rows`` rows.
+
+        ``workers`` runs the batch engine on that many processes; the output
+        is identical for any worker count, and to a batch run without
+        workers. ``profiler`` (a salesgen.profiling.Profiler) collects
+        per-stage timings.
+        """
+        if workers and self.engine != 'batch':
+            raise ValueError("workers requires the 'batch' engine")
+        pairs = self._run_engine(self._new_engine(), self.date_data, chunk_rows, workers, profiler)
+        return (chunk for chunk, _ in pairs)
+
+    def stream(self, sink, rate=None, compression=None, endless=False, max_lag=1.0, limit=None,
+               profiler=NULL_PROFILER):
+        """
+        Emit the transactions as NDJSON events to the binary file object
+        ``sink`` as the simulated days go by, from ``start_date`` through
+        ``end_date`` or, with ``endless``, indefinitely.
+
+        ``rate`` caps the events per second and ``compression`` paces the
+        simulated days (simulated seconds per wall-clock second); see
+        salesgen.stream. Returns the run's stats as a dict.
+        """
+        from .stream import iter_calendar, stream_events
+
+        days = iter_calendar(self.start_date, None if endless else self.end_date)
+        return stream_events(self._new_engine(), days, sink, rate, compression, max_lag, self.seed, limit,
+                             profiler)
+
+    def generate(self):
+        """Generate every transaction into a single DataFrame."""
+        import pandas as pd
+
+        return pd.concat(self.iter_chunks(), ignore_index=True)
+
+    @staticmethod
+    def _paths(output_dir, fmt):
+        return output_paths(output_dir, fmt)
+
+    @staticmethod
+    def _write_sales(writer, chunks, summary, profiler, save=None, every=None):
+        """Write ``(chunk, days_done)`` pairs, calling ``save(days_done)`` every ``every`` days."""
+        saved = 0
+        for chunk, days_done in chunks:
+            with profiler.stage('summary'):
+                summary.update(chunk)
+            with profiler.stage('write'):
+                writer.write(chunk)
+            profiler.count('chunks')
+            if save is not None and days_done is not None and days_done - saved >= every:
+                with profiler.stage('checkpoint'):
+                    save(days_done)
+                saved = days_done
+
+    def _write_dimensions(self, paths, fmt, summary, population=True):
+        """Write the calendar and summary, plus products and customers with ``population``."""
+        import pandas as pd
+        from .columnar import write_dimension_table
+
+        if population:
+            df_products = pd.DataFrame(self.products)
+            df_customers = self.customer_table
+            if fmt == 'parquet':
+                write_dimension_table(df_products, paths['products'], ['subcategory', 'brand'])
+                write_dimension_table(df_customers, paths['customers'], ['segment', 'city'])
+            else:
+                df_products.to_csv(paths['products'], index=False)
+                df_customers.to_csv(paths['customers'], index=False)
+
+        df_calendar = self.calendar.drop(columns='date_str')
+        if fmt == 'parquet':
+            write_dimension_table(df_calendar, paths['calendar'], ['weekday_name', 'month_name'])
+        else:
+            df_calendar.to_csv(paths['calendar'], index=False, date_format='%Y-%m-%d')
+
+        summary.to_frame().to_csv(paths['summary'], index=False)
+
+    def write(self, output_dir='.', fmt='csv', chunk_rows=None, workers=None, profiler=NULL_PROFILER,
+              checkpoint=False, checkpoint_every=None):
+        """
+        Stream transactions to ``output_dir`` and write the products,
+        customers and summary tables next to them. A ``profiler`` gets a
+        final ``summary`` line once everything is written.
+
+        With ``checkpoint=True`` the generator state is saved next to the
+        output, so ``append`` can later extend the dataset.
+        ``checkpoint_every`` also saves it every that many days while the
+        run is in progress; ``resume`` finishes an interrupted run from the
+        last one.
+
+        Returns a (paths, summary) tuple: the files written, keyed by table,
+        and the SalesSummary of the transactions.
+        """
+        from .checkpoint import remove_checkpoint
+        from .summary import SalesSummary
+        from .writers import open_chunk_writer
+
+        paths = self._paths(output_dir, fmt)
+        if workers and self.engine != 'batch':
+            raise ValueError("workers requires the 'batch' engine")
+        os.makedirs(output_dir, exist_ok=True)
+        # A checkpoint left by an earlier run no longer matches the output
+        remove_checkpoint(output_dir)
+
+        summary = SalesSummary()
+        engine = self._new_engine()
+        with open_chunk_writer(paths['sales'], fmt) as writer:
+            save = None
+            if checkpoint_every:
+                def save(days_done):
+                    self._save_checkpoint(output_dir, engine, summary, writer, days_done,
+                                          fmt, chunk_rows, workers, checkpoint_every)
+
+                save(0)
+            chunks = self._run_engine(engine, self.date_data, chunk_rows, workers, profiler,
+                                      flush_every=checkpoint_every)
+            self._write_sales(writer, chunks, summary, profiler, save, checkpoint_every)
+
+        with profiler.stage('write_dimensions'):
+            self._write_dimensions(paths, fmt, summary)
+
+        if checkpoint or checkpoint_every:
+            self._save_checkpoint(output_dir, engine, summary, writer, len(self.date_data),
+                                  fmt, chunk_rows, workers, checkpoint_every)
+
+        profiler.rows = summary.rows
+        profiler.emit('summary', engine=self.engine, workers=workers, format=fmt)
+        return paths, summary
+
+    def _save_checkpoint(self, output_dir, engine, summary, writer, days_done, fmt, chunk_rows,
+                         workers, checkpoint_every):
+        """Save the state after the first ``days_done`` days from ``start_date``."""
+        from .checkpoint import checkpoint_path, save_checkpoint
+
+        state = {
+            'params': {
+                'start_date': self.start_date,
+                'end_date': self.start_date + dt.timedelta(days=days_done - 1),
+                'n_customers': self.n_customers,
+                'products_per_category': self.products_per_category,
+                'seed': self.seed,
+                'engine': self.engine,
+                'base_volume': self.base_volume,
+                'customer_synthesis': self.customer_synthesis,
+            },
+            # Where the run that saved this checkpoint was heading; later
+            # than end_date while it is still in progress.
+            'target_end_date': self.end_date,
+            # Used when a continuation does not pick a worker count; any
+            # count, or none, continues the run identically.
+            'workers': workers,
+            'format': fmt,
+            'chunk_rows': chunk_rows,
+            'checkpoint_every': checkpoint_every,
+            'writer': writer.position(),
+            'products': self._products,
+            'customers': self._customers,
+            'customer_table': self._customer_table,
+            'population_state': self._population_state,
+            'engine': engine,
+            'summary': summary,
+        }
+        save_checkpoint(checkpoint_path(output_dir), state)
+        self._checkpoint = state
+
+    @classmethod
+    def from_checkpoint(cls, output_dir):
+        """
+        Restore the generator from the checkpoint in ``output_dir``.
+
+        Its ``end_date`` is the last day the checkpoint covers.
+        """
+        from .checkpoint import checkpoint_path, load_checkpoint
+
+        state = load_checkpoint(checkpoint_path(output_dir))
+        generator = cls(**state['params'])
+        generator._products = state['products']
+        generator._customers = state['customers']
+        generator._customer_table = state['customer_table']
+        generator._population_state = state['population_state']
+        generator._rng.setstate(state['population_state'])
+        generator._checkpoint = state
+        return generator
+
+    def _require_checkpoint(self):
+        if self._checkpoint is None:
+            raise ValueError("no checkpoint; restore the generator with SalesGenerator.from_checkpoint "
+                             "or write with checkpoint=True")
+        return self._checkpoint
+
+    @property
+    def complete(self):
+        """Whether the checkpointed run has been generated through the end date it was started with."""
+        return self._require_checkpoint()['target_end_date'] <= self.end_date
+
+    def append(self, output_dir, end_date, chunk_rows=None, workers=None, profiler=NULL_PROFILER,
+               checkpoint_every=None):
+        """
+        Extend the dataset in ``output_dir`` through ``end_date``.
+
+        Only the days after the current ``end_date`` are generated. They
+        continue from the checkpointed state, so the result matches a
+        single run over the whole range. Sales are appended to the existing
+        output, the calendar and summary are rewritten and the checkpoint is
+        moved forward. Products and customers do not change.
+        """
+        state = self._require_checkpoint()
+        if end_date <= self.end_date:
+            raise ValueError(f"end_date {end_date:%Y-%m-%d} is not after the checkpointed "
+                             f"end date {self.end_date:%Y-%m-%d}")
+        # An interrupted run never wrote its products and customers
+        population = state['target_end_date'] > self.end_date
+        return self._continue(output_dir, end_date, chunk_rows, workers, profiler, checkpoint_every,
+                              population)
+
+    def resume(self, output_dir, chunk_rows=None, workers=None, profiler=NULL_PROFILER,
+               checkpoint_every=None):
+        """
+        Finish the run that was interrupted after the checkpoint in ``output_dir``.
+
+        Output written after the checkpoint is discarded and generated again
+        from the checkpointed state, so the finished dataset is the same as
+        the one an uninterrupted run writes. Options left as None keep the
+        values the run was started with. A ``complete`` run is left as it is.
+        """
+        state = self._require_checkpoint()
+        if self.complete:
+            return self._paths(output_dir, state['format']), state['summary']
+        return self._continue(output_dir, state['target_end_date'], chunk_rows, workers, profiler,
+                              checkpoint_every, population=True)
+
+    def _continue(self, output_dir, end_date, chunk_rows, workers, profiler, checkpoint_every,
+                  population):
+        from .dates import build_calendar, calendar_records
+        from .writers import open_chunk_writer
+
+        state = self._checkpoint
+        if workers is None:
+            workers = state['workers']
+        if chunk_rows is None:
+            chunk_rows = state['chunk_rows']
+        if checkpoint_every is None:
+            checkpoint_every = state['checkpoint_every']
+
+        fmt = state['format']
+        paths = self._paths(output_dir, fmt)
+        engine, summary = state['engine'], state['summary']
+
+        day_offset = (self.end_date - self.start_date).days + 1
+        new_days = calendar_records(build_calendar(self.end_date + dt.timedelta(days=1), end_date))
+        self.end_date = end_date
+        self._calendar = self._date_data = None
+
+        with open_chunk_writer(paths['sales'], fmt, append=True) as writer:
+            # Drop whatever was written after the checkpoint was saved
+            writer.resume(state['writer'])
+            save = None
+            if checkpoint_every:
+                def save(days_done):
+                    self._save_checkpoint(output_dir, engine, summary, writer, day_offset + days_done,
+                                          fmt, chunk_rows, workers, checkpoint_every)
+
+            chunks = self._run_engine(engine, new_days, chunk_rows, workers, profiler, day_offset,
+                                      checkpoint_every)
+            self._write_sales(writer, chunks, summary, profiler, save, checkpoint_every)
+
+        with profiler.stage('write_dimensions'):
+            self._write_dimensions(paths, fmt, summary, population)
+
+        self._save_checkpoint(output_dir, engine, summary, writer, day_offset + len(new_days),
+                              fmt, chunk_rows, workers, checkpoint_every)
+
+        profiler.rows = summary.rows
+        profiler.emit('summary', engine=self.engine, workers=workers, format=fmt,
+                      appended_days=len(new_days))
+        return paths, summary
@@ -0,0 +1,172 @@
+"""
+Process-pool generation sharded by date range.
+
+The date range is split into contiguous shards that run in parallel on the
+batch engine. Two rules keep the output bit-identical for any worker count:
+
+* Seeding is per day, not per process. Day ``d`` draws its volume and
+  customers from ``default_rng([seed, d, 0])`` and everything else
+  (products, quantities, prices) from ``default_rng([seed, d, 1])`` (see
+  batch_engine.day_rngs), so a day's draws never depend on which shard it
+  landed in. A sequential BatchEngine seeds its days the same way, so the
+  output also equals a run without workers.
+
+* Customer state is handed over by a sequential pre-pass. Only order counts
+  carry over between days (they drive customer weights and loyalty tiers),
+  and they depend only on the customer stream. The pre-pass replays just
+  that stream for every day, and records the order counts and the next
+  transaction_id at each shard boundary. Each shard starts from its
+  snapshot, so it sees exactly the state a single sequential run would.
+  Spending (total_spent, last_purchase_day) never feeds back into a draw;
+  the parent adds it to its engine from the merged chunks, in
+  transaction_id order, so the engine a checkpoint saves after the range
+  holds the same customer state as a sequential run's.
+
+Day indexes count from the first day of the whole dataset, not of the
+current call, so a run that continues an earlier one from its checkpoint
+(``engine`` and ``day_offset``) draws the same days a single run would.
+
+Shards write their own Parquet part files, and the parts are read back in
+shard order. Shards cover contiguous day ranges, so shard order is also
+transaction_id order.
+"""
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .batch_engine import BatchEngine, concat_batches, day_rngs
+from .profiling import NULL_PROFILER
+from .state import loyalty_codes
+from .writers import ParquetChunkWriter
+
+
+def plan_shards(customers, products, date_data, n_shards, seed=42, base_volume=100,
+                engine=None, day_offset=0):
+    """
+    Split ``date_data`` into ``n_shards`` day ranges and run the pre-pass.
+
+    Returns one dict per shard: its day range, first transaction_id and the
+    order counts at the start of its first day. ``date_data[0]`` is day
+    ``day_offset`` of the dataset. The pre-pass starts from ``engine`` (a
+    fresh BatchEngine by default) and leaves it at the end of the range:
+    order counts, loyalty tiers, next transaction_id and next day.
+    """
+    if engine is None:
+        engine = BatchEngine(customers, products, seed=seed)
+    bounds = np.linspace(0, len(date_data), min(n_shards, len(date_data)) + 1).astype(int)
+
+    shards = []
+    next_transaction_id = engine.next_transaction_id
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        shards.append({
+            'start': int(start),
+            'end': int(end),
+            'day_offset': day_offset,
+            'first_transaction_id': next_transaction_id,
+            'order_count': engine.state.order_count.copy(),
+        })
+        for day_index in range(start, end):
+            customer_rng, _ = day_rngs(seed, day_offset + day_index)
+            customer = engine.draw_customers(date_data[day_index], base_volume, customer_rng)
+            engine.state.order_count += np.bincount(customer, minlength=len(engine.state)).astype(np.int32)
+            next_transaction_id += len(customer)
+
+    engine.state.loyalty[:] = loyalty_codes(engine.state.order_count)
+    engine.next_transaction_id = next_transaction_id
+    engine.next_day = day_offset + len(date_data)
+    return shards
+
+
+def record_spending(state, customer_index, chunk):
+    """
+    Add the spend and purchase dates of a chunk of transactions to the
+    CustomerState ``state``; ``customer_index`` maps customer IDs to ordinals.
+    """
+    ordinals = customer_index.get_indexer(chunk['customer_id'])
+    days = np.asarray(chunk['date'], dtype='datetime64[D]').astype(np.int64).astype(np.int32)
+    # Added one purchase at a time, in order, as record_purchases does day by day
+    np.add.at(state.total_spent, ordinals, chunk['total_sales'].to_numpy(dtype=np.float64))
+    np.maximum.at(state.last_purchase_day, ordinals, days)
+
+
+def run_shard(customers, products, date_data, shard, path, chunk_rows=None,
+              seed=42, base_volume=100):
+    """Generate one shard's days and write them to ``path``."""
+    engine = BatchEngine(customers, products, seed=seed)
+    engine.state.order_count[:] = shard['order_count']
+    engine.next_transaction_id = shard['first_transaction_id']
+
+    with ParquetChunkWriter(path) as writer:
+        batches = []
+        pending_rows = 0
+        for day_index in range(shard['start'], shard['end']):
+            customer_rng, detail_rng = day_rngs(seed, shard['day_offset'] + day_index)
+            batch = engine.generate_day(date_data[day_index], base_volume, customer_rng, detail_rng)
+            batches.append(batch)
+            pending_rows += len(batch['transaction_id'])
+            if chunk_rows and pending_rows >= chunk_rows:
+                writer.write(engine.to_frame(concat_batches(batches)))
+                batches = []
+                pending_rows = 0
+        if batches:
+            writer.write(engine.to_frame(concat_batches(batches)))
+    return path
+
+
+def _run_shard_task(task):
+    return run_shard(*task)
+
+
+def _read_part(path, chunk_rows):
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows or 1_000_000):
+        yield batch.to_pandas()
+
+
+def iter_sales_chunks_parallel(customers, products, date_data, workers, chunk_rows=None,
+                               seed=42, base_volume=100, profiler=NULL_PROFILER,
+                               engine=None, day_offset=0):
+    """
+    Generate the date range on ``workers`` processes and yield the merged
+    transactions as DataFrame chunks in transaction_id order.
+
+    ``engine`` and ``day_offset`` continue an earlier run (see plan_shards);
+    the engine's order counts are advanced to the end of ``date_data`` once
+    the shards are planned, and its spending as the chunks are merged, so it
+    is at the end of ``date_data`` once the last chunk has been yielded.
+    ``profiler`` sees the pre-pass, the shard runs and the merge as whole
+    stages; per-transaction stages happen in the workers and are not timed.
+    """
+    import pandas as pd
+
+    if engine is None:
+        engine = BatchEngine(customers, products, seed=seed)
+    with profiler.stage('plan_shards'):
+        shards = plan_shards(customers, products, date_data, workers, seed, base_volume,
+                             engine, day_offset)
+    profiler.emit('plan_shards', shards=len(shards), days=len(date_data))
+
+    part_dir = tempfile.mkdtemp(prefix='sales_shards_')
+    try:
+        tasks = [
+            (customers, products, date_data, shard,
+             os.path.join(part_dir, f'part-{i:05d}.parquet'), chunk_rows, seed, base_volume)
+            for i, shard in enumerate(shards)
+        ]
+        with profiler.stage('run_shards'), ProcessPoolExecutor(max_workers=workers) as pool:
+            paths = list(pool.map(_run_shard_task, tasks))
+
+        customer_index = pd.Index(engine.customer_ids)
+        rows = 0
+        for i, path in enumerate(paths):
+            for chunk in _read_part(path, chunk_rows):
+                record_spending(engine.state, customer_index, chunk)
+                rows += len(chunk)
+                profiler.progress(rows, shards_merged=i, total_shards=len(paths))
+                yield chunk
+    finally:
+        shutil.rmtree(part_dir, ignore_errors=True)
@@ -0,0 +1,38 @@
+"""
+Day-by-day driver shared by the sequential engines.
+
+An engine owns all of a run's state and exposes three methods: ``day``
+generates one day and advances the state, ``rows`` counts the rows of a
+day's output and ``frame`` turns a list of day outputs into a DataFrame.
+Chunks are only cut on day boundaries, so the engine state at every chunk
+is the state at the end of a whole day and can be checkpointed.
+"""
+from .profiling import NULL_PROFILER
+
+
+def iter_day_chunks(engine, date_data, chunk_rows=None, profiler=NULL_PROFILER, flush_every=None):
+    """
+    Run ``engine`` over ``date_data`` and yield ``(chunk, days_done)`` pairs.
+
+    A chunk is flushed once it holds at least ``chunk_rows`` rows (the whole
+    run with ``chunk_rows=None``) and, with ``flush_every``, after every
+    that many days. ``days_done`` is the number of days of ``date_data``
+    the chunks so far cover.
+    """
+    engine.profiler = profiler
+    first_transaction_id = engine.next_transaction_id
+    days = []
+    pending_rows = 0
+    for i, date_info in enumerate(date_data):
+        day = engine.day(date_info)
+        days.append(day)
+        pending_rows += engine.rows(day)
+        if (chunk_rows and pending_rows >= chunk_rows) or (flush_every and (i + 1) % flush_every == 0):
+            yield engine.frame(days), i + 1
+            days = []
+            pending_rows = 0
+
+        rows = engine.next_transaction_id - first_transaction_id
+        profiler.progress(rows, days=i + 1, total_days=len(date_data))
+    if days:
+        yield engine.frame(days), len(date_data)
@@ -0,0 +1,156 @@
+import random as rd
+
+
+class FenwickSampler:
+    """
+    Dynamic weighted sampler backed by a Fenwick (binary indexed) tree.
+
+    Each leaf holds the weight of one item. Changing a single weight and
+    drawing an item proportionally to its weight both cost O(log N), so
+    the weights can change between draws without rebuilding anything.
+    """
+
+    def __init__(self, weights):
+        self._size = len(weights)
+        self._weights = [float(w) for w in weights]
+        self._tree = [0.0] * (self._size + 1)
+
+        # O(N) build: push each partial sum up to its parent once
+        for i, weight in enumerate(self._weights, start=1):
+            self._tree[i] += weight
+            parent = i + (i & -i)
+            if parent <= self._size:
+                self._tree[parent] += self._tree[i]
+
+        self._top_bit = 1
+        while self._top_bit * 2 <= self._size:
+            self._top_bit *= 2
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def total(self):
+        """Sum of all weights."""
+        total = 0.0
+        i = self._size
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def weight(self, index):
+        """Current weight of the item at ``index``."""
+        return self._weights[index]
+
+    def update(self, index, weight):
+        """Set the weight of the item at ``index``."""
+        delta = float(weight) - self._weights[index]
+        if delta == 0:
+            return
+        self._weights[index] = float(weight)
+
+        i = index + 1
+        while i <= self._size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def sample(self, rand=rd.random):
+        """Draw one index with probability proportional to its weight."""
+        target = rand() * self.total
+
+        # Walk down the implicit tree, skipping every block whose
+        # cumulative weight is still below the target.
+        position = 0
+        step = self._top_bit
+        while step:
+            nxt = position + step
+            if nxt <= self._size and self._tree[nxt] <= target:
+                position = nxt
+                target -= self._tree[nxt]
+            step //= 2
+
+        # Guard against rounding pushing us past the last positive weight
+        if position >= self._size:
+            position = self._size - 1
+        while self._weights[position] <= 0 and position > 0:
+            position -= 1
+        return position
+
+
+class AliasTable:
+    """
+    Static weighted sampler using Walker's alias method (Vose's build).
+
+    The table is built once in O(N); every draw afterwards costs O(1) no
+    matter how many categories there are, where ``random.choices`` rebuilds
+    the cumulative weights and bisects on each call. Use it for
+    distributions that never change during a run; FenwickSampler covers
+    weights that do.
+
+    ``items`` is optional; without it the draws return indices.
+    """
+
+    def __init__(self, weights, items=None):
+        weights = [float(w) for w in weights]
+        total = sum(weights)
+        if not weights or total <= 0 or min(weights) < 0:
+            raise ValueError("weights must be non-negative with a positive sum")
+        if items is not None and len(items) != len(weights):
+            raise ValueError("items and weights must have the same length")
+
+        size = len(weights)
+        scaled = [w * size / total for w in weights]
+        self._prob = [1.0] * size
+        self._alias = list(range(size))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._prob[less] = scaled[less]
+            self._alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left is 1.0 up to rounding and keeps its own column
+
+        self._size = size
+        self.items = list(items) if items is not None else None
+        self._arrays = None
+
+    def __len__(self):
+        return self._size
+
+    def sample(self, rand=rd.random):
+        """Draw one index; a single uniform picks both column and coin."""
+        u = rand() * self._size
+        column = int(u)
+        if column == self._size:
+            column -= 1
+        return column if u - column < self._prob[column] else self._alias[column]
+
+    def choice(self, rand=rd.random):
+        """Draw one item (or index when the table has no items)."""
+        index = self.sample(rand)
+        return self.items[index] if self.items is not None else index
+
+    def sample_k(self, k, rng=None):
+        """Draw ``k`` indices at once with a NumPy ``Generator``."""
+        import numpy as np
+
+        if self._arrays is None:
+            items = np.asarray(self.items) if self.items is not None else None
+            self._arrays = (np.asarray(self._prob), np.asarray(self._alias, dtype=np.int64), items)
+        prob, alias, _ = self._arrays
+        if rng is None:
+            rng = np.random.default_rng()
+
+        u = rng.random(k) * self._size
+        column = np.minimum(u.astype(np.int64), self._size - 1)
+        return np.where(u - column < prob[column], column, alias[column])
+
+    def choices(self, k, rng=None):
+        """Draw ``k`` items (or indices) at once as a NumPy array."""
+        index = self.sample_k(k, rng)
+        items = self._arrays[2]
+        return items[index] if items is not None else index
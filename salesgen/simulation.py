@@ -0,0 +1,279 @@
+"""
+Loop engine: builds one transaction at a time.
+
+Every random draw goes through the ``rng`` (a ``random.Random``) and
+``np_rng`` (a ``numpy.random.RandomState``) arguments, so a generator can
+own its random state instead of sharing the module-level one.
+"""
+import random as rd
+
+import numpy as np
+
+from .profiling import NULL_PROFILER
+from .sampling import AliasTable, FenwickSampler
+from .state import SEGMENTS, CustomerState, day_number
+
+def daily_transactions(date_info, customers, products, base_volume=100, np_rng=np.random):
+    daily_volume = base_volume
+    daily_volume *= date_info['seasonal_multiplier']
+    daily_volume *= date_info['weekday_multiplier']
+    
+    rand_factor = np_rng.uniform(0.8, 1.2)
+    daily_volume *= rand_factor
+    
+    if date_info['month'] in [11, 12]:
+        if date_info['is_weekend'] and date_info['day'] in [24, 25, 31]:
+            daily_volume *= 3
+        elif date_info['is_weekend']:
+            daily_volume *= 1.8
+    elif date_info['month'] in [6, 7, 8]:
+        if date_info['is_weekend']:
+            daily_volume *= 1.6
+    elif date_info['month'] in [1, 2, 3]:
+        daily_volume *= np_rng.uniform(0.5, 1.1)
+    
+    return max(50, int(daily_volume))
+
+segment_preferences = {
+    'Premium': {
+        'preferred_categories': ['smartphones', 'laptops', 'cameras'],
+        'weights': [0.4, 0.35, 0.25]
+    },
+    'Regular': {
+        'preferred_categories': ['tablets', 'accessories', 'smartwatches'],
+        'weights': [0.4, 0.35, 0.25]
+    },
+    'Budget': {
+        'preferred_categories': ['accessories', 'smartwatches'],
+        'weights': [0.6, 0.4]
+    }
+}
+
+def build_product_index(products):
+    """
+    Build the alias tables behind select_product_for_customer.
+
+    ``segment`` maps to a table over that segment's preferred categories and
+    ``(segment, category)`` to a table over the products a customer of that
+    segment can draw. Both draws are uniform and do not depend on the
+    season, so the season is not part of the key.
+    """
+    by_category = {}
+    for product in products:
+        by_category.setdefault(product['subcategory'], []).append(product)
+
+    index = {}
+    for segment, prefs in segment_preferences.items():
+        categories = prefs['preferred_categories']
+        index[segment] = AliasTable([1.0] * len(categories), items=categories)
+        for category in categories:
+            candidates = by_category.get(category) or products
+            index[(segment, category)] = AliasTable([1.0] * len(candidates), items=candidates)
+    return index
+
+def select_product_for_customer(products, customer, date_info, rng=rd, product_index=None):
+    if product_index is None:
+        product_index = build_product_index(products)
+
+    selected_category = product_index[customer['segment']].choice(rng.random)
+    return product_index[(customer['segment'], selected_category)].choice(rng.random)
+
+base_qty = {
+    'smartphones': [1, 1, 1, 2],
+    'laptops': [1, 1, 1, 1],
+    'tablets': [1, 1, 2],
+    'accessories': [1, 2, 3, 4, 5],
+    'smartwatches': [1, 1, 2],
+    'cameras': [1, 1, 1, 1]
+}
+
+def qty_table(quantities):
+    """Alias table over the distinct values of a quantity list."""
+    values = sorted(set(quantities))
+    return AliasTable([quantities.count(v) for v in values], items=values)
+
+# Product subcategories, in the order the batch engine codes them
+CATEGORIES = list(base_qty)
+QTY_TABLES = {category: qty_table(quantities) for category, quantities in base_qty.items()}
+DEFAULT_QTY_TABLE = qty_table([1, 1, 2])
+
+def determine_qty(product, customer, date_info, rng=rd):
+    qty = QTY_TABLES.get(product['subcategory'], DEFAULT_QTY_TABLE).choice(rng.random)
+    
+    if customer['segment'] == 'Premium' and rng.random() < 0.3:
+        qty += 1
+    
+    return max(1, qty)
+
+SEGMENT_PRICE_FACTORS = {'Premium': 0.98, 'Regular': 1.0, 'Budget': 0.92}
+
+def seasonal_price_factor(date_info):
+    """Seasonal price multiplier shared by every transaction of the day."""
+    month, day = date_info['month'], date_info['day']
+    if month == 11:
+        return 0.7 if 21 <= day <= 26 else 0.9  # Black Friday
+    if month == 12:
+        return 0.8 if 21 <= day <= 30 else 0.9  # Christmas
+    if month in [6, 7, 8]:
+        return 0.95
+    return 1.0
+
+def call_unit_price(product, customer, date_info, np_rng=np.random): 
+    unit_price = product['base_price']
+    unit_price *= seasonal_price_factor(date_info)
+    unit_price *= SEGMENT_PRICE_FACTORS[customer['segment']]
+
+    daily_variation = np_rng.uniform(0.95, 1.05)
+    unit_price *= daily_variation
+    
+    return round(unit_price, 2)
+
+SEGMENT_WEIGHTS = {'Premium': 3.0, 'Regular': 2.0, 'Budget': 1.0}
+SEGMENT_WEIGHT_BY_CODE = [SEGMENT_WEIGHTS[segment] for segment in SEGMENTS]
+
+def order_count_multiplier(order_count):
+    if order_count > 0: 
+        return min(order_count * 0.5 + 1, 5.0)
+    return 1.0
+
+def build_customer_sampler(customers, cx_history):
+    """Index every customer's selection weight in a Fenwick tree."""
+    weights = [SEGMENT_WEIGHT_BY_CODE[segment] * order_count_multiplier(order_count)
+               for segment, order_count in zip(cx_history.segment.tolist(),
+                                               cx_history.order_count.tolist())]
+    return FenwickSampler(weights)
+
+def customer_selection_with_history(customers, date_info, cx_history, sampler, rng=rd):
+    """Draw a customer ordinal (an index into ``customers`` and ``cx_history``)."""
+    # The month boost (1.5 in Nov-Dec, 1.2 in Jun-Aug) scales every customer
+    # by the same factor, so it cancels out of the draw and is not stored.
+    return sampler.sample(rng.random)
+
+def update_cx_history(cx_history, ordinal, total_sales, date_info, sampler=None):
+    """Record a purchase in the CustomerState ``cx_history`` and reweight the customer."""
+    order_count = cx_history.record_purchase(ordinal, total_sales, day_number(date_info['date']))
+
+    if sampler is not None:
+        sampler.update(ordinal, SEGMENT_WEIGHT_BY_CODE[cx_history.segment[ordinal]]
+                       * order_count_multiplier(order_count))
+
+def create_power_customers(customers, cx_history, num_power_customers=50, rng=rd):
+    # Sampling ordinals draws exactly what sampling the customers would
+    power_customers = rng.sample(range(len(customers)), num_power_customers)
+    
+    for ordinal in power_customers:
+        fake_orders = rng.randint(2, 15)
+        fake_spending = rng.randint(500, 5000)
+        cx_history.set_history(ordinal, fake_orders, fake_spending)
+
+class LoopEngine:
+    """
+    State of a loop-engine run: the random streams, customer history and
+    next transaction_id.
+
+    ``day`` continues exactly where the previous day stopped, so an engine
+    restored from a pickle (see salesgen.checkpoint) resumes a run bit for
+    bit. Creating the engine seeds the power customers from ``rng``.
+    """
+
+    def __init__(self, customers, products, rng=rd, np_rng=np.random, base_volume=100):
+        self.customers = customers
+        self.products = products
+        self.rng = rng
+        self.np_rng = np_rng
+        self.base_volume = base_volume
+        self.profiler = NULL_PROFILER
+
+        self.cx_history = CustomerState.for_customers(customers)
+        create_power_customers(customers, self.cx_history, 100, rng)
+        self.sampler = build_customer_sampler(customers, self.cx_history)
+        self.product_index = build_product_index(products)
+        self.next_transaction_id = 1
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['profiler']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.profiler = NULL_PROFILER
+
+    def day(self, date_info):
+        """Generate one day of transactions as a list of row dicts."""
+        customers, products, rng, np_rng = self.customers, self.products, self.rng, self.np_rng
+        cx_history, sampler = self.cx_history, self.sampler
+
+        profiler = self.profiler
+        select_customer = profiler.wrap('customer_selection', customer_selection_with_history)
+        select_product = profiler.wrap('product_selection', select_product_for_customer)
+        quantity_for = profiler.wrap('quantity', determine_qty)
+        price_for = profiler.wrap('unit_price', call_unit_price)
+        record_purchase = profiler.wrap('cx_history', update_cx_history)
+
+        sales_transactions = []
+        transaction_id = self.next_transaction_id
+        daily_volume = daily_transactions(date_info, customers, products, self.base_volume, np_rng)
+
+        for _ in range(daily_volume):
+            ordinal = select_customer(customers, date_info, cx_history, sampler, rng)
+            customer = customers[ordinal]
+            product = select_product(products, customer, date_info, rng, self.product_index)
+            quantity = quantity_for(product, customer, date_info, rng)
+            unit_price = price_for(product, customer, date_info, np_rng)
+            total_sales = round(quantity * unit_price, 2)
+
+            current_loyalty = cx_history.loyalty_tier(ordinal)
+            record_purchase(cx_history, ordinal, total_sales, date_info, sampler)
+
+            transaction = {
+                'transaction_id': f'T{transaction_id:06d}', 
+                'date': date_info['date_str'],
+                'product_id': product['product_id'],
+                'product_name': product['product_name'],
+                'quantity': quantity,
+                'unit_price': unit_price, 
+                'total_sales': total_sales, 
+                'customer_id': customer['customer_id'], 
+                'city': customer['city'],
+                'loyalty_tier': current_loyalty 
+            }         
+            sales_transactions.append(transaction)
+            transaction_id += 1
+
+        self.next_transaction_id = transaction_id
+        return sales_transactions
+
+    @staticmethod
+    def rows(day):
+        return len(day)
+
+    def frame(self, days):
+        """Concatenate day outputs into one DataFrame."""
+        import pandas as pd
+
+        with self.profiler.stage('to_frame'):
+            return pd.DataFrame([row for day in days for row in day])
+
+def iter_sales_chunks(customers, products, date_data, chunk_rows=None, rng=rd, np_rng=np.random,
+                      base_volume=100, profiler=NULL_PROFILER):
+    """
+    Yield the sales transactions as DataFrames of at least ``chunk_rows``
+    rows, flushed on day boundaries.
+
+    With ``chunk_rows=None`` everything is yielded as a single chunk.
+    ``profiler`` times every per-transaction stage (see salesgen.profiling).
+    """
+    from .runner import iter_day_chunks
+
+    engine = LoopEngine(customers, products, rng, np_rng, base_volume)
+    for chunk, _ in iter_day_chunks(engine, date_data, chunk_rows, profiler):
+        yield chunk
+
+def generate_sales_data(customers, products, date_data, rng=rd, np_rng=np.random,
+                        profiler=NULL_PROFILER): 
+    import pandas as pd
+
+    return pd.concat(iter_sales_chunks(customers, products, date_data, rng=rng, np_rng=np_rng,
+                                       profiler=profiler),
+                     ignore_index=True)
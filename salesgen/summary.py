@@ -0,0 +1,55 @@
+"""Summary statistics accumulated while transactions are streamed to disk."""
+
+
+class SalesSummary:
+    """Running totals over transaction chunks, so no chunk has to be kept."""
+
+    def __init__(self):
+        self.rows = 0
+        self.revenue = 0.0
+        self.monthly_revenue = {}
+        self.product_ids = set()
+        self.customer_ids = set()
+        self.date_min = None
+        self.date_max = None
+        self.sample = None
+
+    def update(self, chunk):
+        if self.sample is None:
+            self.sample = chunk.head(10)
+        self.rows += len(chunk)
+        self.revenue += chunk['total_sales'].sum()
+        for month, revenue in chunk.groupby(chunk['date'].str[:7])['total_sales'].sum().items():
+            self.monthly_revenue[month] = self.monthly_revenue.get(month, 0.0) + revenue
+        self.product_ids.update(chunk['product_id'].unique())
+        self.customer_ids.update(chunk['customer_id'].unique())
+        if self.date_min is None:
+            self.date_min, self.date_max = chunk['date'].min(), chunk['date'].max()
+        else:
+            self.date_min = min(self.date_min, chunk['date'].min())
+            self.date_max = max(self.date_max, chunk['date'].max())
+
+    def to_frame(self):
+        """The data_summary.csv report."""
+        import pandas as pd
+
+        return pd.DataFrame({
+            'metric': [
+                'Total Transactions',
+                'Total Revenue',
+                'Average Order Value',
+                'Unique Products',
+                'Unique Customers',
+                'Date Range Start',
+                'Date Range End'
+            ],
+            'value': [
+                self.rows,
+                f"${self.revenue:,.2f}",
+                f"${self.revenue / self.rows:.2f}",
+                len(self.product_ids),
+                len(self.customer_ids),
+                self.date_min,
+                self.date_max
+            ]
+        })
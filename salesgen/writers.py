@@ -0,0 +1,100 @@
+"""
+Incremental writers for streaming transaction chunks to disk.
+
+Each writer accepts DataFrame chunks one at a time, so only the chunk
+being written has to be held in memory. CSV output writes the header with
+the first chunk and appends afterwards; with ``append=True`` the writers
+add to existing output instead of replacing it. ``position`` reports how
+far the output has been written and ``resume`` cuts existing output back
+to such a position before appending, which is how checkpointed runs
+discard whatever was written after their last checkpoint. ParquetChunkWriter writes one row
+group per chunk to a single file and keeps the string layout (it is used
+for intermediate shard files); the 'parquet' output format writes the
+typed, partitioned dataset described in columnar.py.
+"""
+import os
+
+from .columnar import PartitionedParquetWriter
+
+
+class CsvChunkWriter:
+    def __init__(self, path, append=False):
+        self.path = path
+        self.append = append
+        self.rows_written = 0
+
+    def write(self, chunk):
+        first = self.rows_written == 0 and not self.append
+        chunk.to_csv(self.path, mode='w' if first else 'a', header=first, index=False)
+        self.rows_written += len(chunk)
+
+    def position(self):
+        if self.rows_written == 0 and not self.append:
+            return {'bytes': 0}
+        return {'bytes': os.path.getsize(self.path)}
+
+    def resume(self, position):
+        """Truncate the file to ``position`` and append from there."""
+        size = position['bytes']
+        if size and os.path.getsize(self.path) < size:
+            raise ValueError(f"{self.path} is shorter than the checkpointed {size} bytes")
+        if os.path.exists(self.path):
+            os.truncate(self.path, size)
+        # An empty file still needs its header
+        self.append = size > 0
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParquetChunkWriter:
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._pq = pq
+        self.path = path
+        self.rows_written = 0
+        self._writer = None
+
+    def write(self, chunk):
+        table = self._pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+        self.rows_written += len(chunk)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+WRITERS = {
+    'csv': CsvChunkWriter,
+    'parquet': PartitionedParquetWriter,
+}
+
+
+def open_chunk_writer(path, fmt='csv', append=False):
+    """Return a chunk writer for ``fmt`` ('csv' or 'parquet')."""
+    try:
+        writer = WRITERS[fmt]
+    except KeyError:
+        raise ValueError(f"Unsupported output format: {fmt!r}") from None
+    return writer(path, append=append)
@@ -14,12 +14,20 @@
 # Spikes on weekends and holidays as well as random sale events
 # black friday as well as chrsitmas
 
-import pandas as pd
+# Nothing runs on import: pandas and faker are imported inside the
+# functions that need them and the export only happens through main().
+import os
+import sys
 import numpy as np
 import random as rd
 import datetime as dt
 import time 
-from faker import Faker
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from salesgen.sampling import AliasTable, FenwickSampler
+from salesgen.dates import build_date_data
+from salesgen.state import SEGMENTS, CustomerState, day_number, loyalty_discount
 
 
 """"
@@ -69,37 +77,35 @@ columns = [
 """
 Creating products based on the structure defined above.
 """
-
-all_products = []
-product_id = 1
-
-for subcategory in structure['subcategories']:
-    for _ in range(15): 
-        brand = rd.choice(structure['brands']) #we're picking a random brand
-        #attribbutes
-        product_name = f"{brand} {subcategory.capitalize()} {rd.choice(['Pro', 'Plus', 'Max', 'Mini', 'SE'])}"
-        base_price = round(rd.uniform(200, 1200), 2)  # Random price between 200 and 1200
-
-        #recording the product
-        product = {
-            'product_id': f'P{product_id:04d}',
-            'product_name': product_name,
-            'subcategory': subcategory,
-            'brand': brand,
-            'base_price': base_price,
-            'cost_price': round(base_price * 0.6, 2), 
-            'popularity_factor': rd.randint(1, 10),  
-            'seasonal factor': 1.2,
-            'stock_level': rd.randint(15, 80)   
-        }
-
-        all_products.append(product)
-        product_id += 1
-
-""""Converting the product list to a DataFrame."""
-
-df_product = pd.DataFrame(all_products)
-print(f"Generated {len(df_product)} products")
+def build_products():
+    all_products = []
+    product_id = 1
+
+    for subcategory in structure['subcategories']:
+        for _ in range(15): 
+            brand = rd.choice(structure['brands']) #we're picking a random brand
+            #attribbutes
+            product_name = f"{brand} {subcategory.capitalize()} {rd.choice(['Pro', 'Plus', 'Max', 'Mini', 'SE'])}"
+            base_price = round(rd.uniform(200, 1200), 2)  # Random price between 200 and 1200
+
+            #recording the product
+            product = {
+                'product_id': f'P{product_id:04d}',
+                'product_name': product_name,
+                'subcategory': subcategory,
+                'brand': brand,
+                'base_price': base_price,
+                'cost_price': round(base_price * 0.6, 2), 
+                'popularity_factor': rd.randint(1, 10),  
+                'seasonal factor': 1.2,
+                'stock_level': rd.randint(15, 80)   
+            }
+
+            all_products.append(product)
+            product_id += 1
+
+    print(f"Generated {len(all_products)} products")
+    return all_products
 
 """SECTION: CUSTOMER DATA GENERATION"""
 
@@ -149,51 +155,59 @@ cities_distribution = {
     'Other': {'weight': 12, 'state': 'Various'}
 }
 
+# Alias tables for the static customer draws (segments are drawn uniformly)
+SEGMENT_TABLE = AliasTable([1.0] * len(customer_segments), items=list(customer_segments))
+CITY_TABLE = AliasTable([v['weight'] for v in cities_distribution.values()], items=list(cities_distribution))
+
 """Generating customer data"""
 
-faker = Faker()
-customers = []
-customer_id = 1
-age = 1
-income = 1
-total_orders = 1
-
-for i in range(1000):  
-    segment = rd.choices(['Premium', 'Regular', 'Budget'])[0]  
-
-    first_name = faker.first_name()
-    last_name = faker.last_name()
-    email = f'{first_name.lower()}.{last_name.lower()}@{faker.free_email_domain()}'
-
-    if segment == 'Premium': 
-        age = rd.randint(30, 55)
-        income = rd.randint(80000, 150000)
-        total_orders = rd.randint(10, 50)
-
-    elif segment == 'Regular': 
-        age = rd.randint(25, 45)
-        income = rd.randint(40000, 80000)
-        total_orders = rd.randint(5, 30)
-
-    elif segment == 'Budget':
-        age = rd.randint(18, 35)
-        income = rd.randint(20000, 40000)
-        total_orders = rd.randint(1, 10)
-
-    customer = {
-        'customer_id': f'C{customer_id:04d}', 
-        'first_name': first_name,
-        'last_name': last_name,
-        'email': email,
-        'segment': segment,
-        'age': age,
-        'income': income,
-        'total_orders': total_orders,
-        'city': rd.choices(list(cities_distribution.keys()), weights=[v['weight'] for v in cities_distribution.values()])[0]
-    }
-    customers.append(customer)
-    customer_id += 1
+def build_customers(n_customers=1000):
+    from faker import Faker
+
+    faker = Faker()
+    customers = []
+    customer_id = 1
+    age = 1
+    income = 1
+    total_orders = 1
+
+    for i in range(n_customers):  
+        segment = SEGMENT_TABLE.choice()
+
+        first_name = faker.first_name()
+        last_name = faker.last_name()
+        email = f'{first_name.lower()}.{last_name.lower()}@{faker.free_email_domain()}'
+
+        if segment == 'Premium': 
+            age = rd.randint(30, 55)
+            income = rd.randint(80000, 150000)
+            total_orders = rd.randint(10, 50)
+
+        elif segment == 'Regular': 
+            age = rd.randint(25, 45)
+            income = rd.randint(40000, 80000)
+            total_orders = rd.randint(5, 30)
+
+        elif segment == 'Budget':
+            age = rd.randint(18, 35)
+            income = rd.randint(20000, 40000)
+            total_orders = rd.randint(1, 10)
+
+        customer = {
+            'customer_id': f'C{customer_id:04d}', 
+            'first_name': first_name,
+            'last_name': last_name,
+            'email': email,
+            'segment': segment,
+            'age': age,
+            'income': income,
+            'total_orders': total_orders,
+            'city': CITY_TABLE.choice()
+        }
+        customers.append(customer)
+        customer_id += 1
 
+    return customers
 
 
 """"Date generation"""
@@ -210,7 +224,6 @@ def generate_dates(start_date, end_date, n):
         current_date += dt.timedelta(days=1)
     return date_list
     
-daily_dates = generate_dates(start_date, end_date, n=365)
 
 """Date information for sales analysis"""
 def data_information(date_obj):
@@ -247,11 +260,6 @@ def data_information(date_obj):
     })
     return date_info
 
-
-date_data = [data_information(date) for date in daily_dates]
-df_dates = pd.DataFrame(date_data)
-# Converting the product list to a DataFrame
-
 """SECTION: SALES DATA GENERATION"""
 
 def daily_transactions(date_info, customers, products, base_volume=100):
@@ -291,17 +299,25 @@ def customer_selection(customers, date_info):
     selected_customer = rd.choices(customers, weights=weights)[0]
     return selected_customer
 
+base_qty = {
+    'smartphones': [1, 1, 1, 2],
+    'laptops': [1, 1, 1, 1],
+    'tablets': [1, 1, 2],
+    'accessories': [1, 2, 3, 4, 5],
+    'smartwatches': [1, 1, 2],
+    'cameras': [1, 1, 1, 1]
+}
+
+def qty_table(quantities):
+    # Collapse repeated quantities into weights for one alias table
+    values = sorted(set(quantities))
+    return AliasTable([quantities.count(v) for v in values], items=values)
+
+QTY_TABLES = {category: qty_table(quantities) for category, quantities in base_qty.items()}
+DEFAULT_QTY_TABLE = qty_table([1, 1, 2])
+
 def determine_qty(product, customer, date_info):
-    base_qty = {
-        'smartphones': [1, 1, 1, 2],
-        'laptops': [1, 1, 1, 1],
-        'tablets': [1, 1, 2],
-        'accessories': [1, 2, 3, 4, 5],
-        'smartwatches': [1, 1, 2],
-        'cameras': [1, 1, 1, 1]
-    }
-    possible_qty = base_qty.get(product['subcategory'], [1, 1, 2])
-    qty = rd.choice(possible_qty)
+    qty = QTY_TABLES.get(product['subcategory'], DEFAULT_QTY_TABLE).choice()
     
     if customer['segment'] == 'Premium' and rd.random() < 0.3:
         qty += int(np.random.uniform(1, 3))
@@ -340,175 +356,166 @@ def call_unit_price(product, customer, date_info):
 
 ## Product selection: 
 
-def select_product_for_customer(products, customer, date_info):
-    # Use the customer segments you already defined
-    segment_preferences = {
-        'Premium': {
-            'preferred_categories': ['smartphones', 'laptops', 'cameras'],
-            'weights': [0.4, 0.35, 0.25]
-        },
-        'Regular': {
-            'preferred_categories': ['tablets', 'accessories', 'smartwatches'],
-            'weights': [0.4, 0.35, 0.25]
-        },
-        'Budget': {
-            'preferred_categories': ['accessories', 'smartwatches'],
-            'weights': [0.6, 0.4]
-        }
+# Use the customer segments you already defined
+segment_preferences = {
+    'Premium': {
+        'preferred_categories': ['smartphones', 'laptops', 'cameras'],
+        'weights': [0.4, 0.35, 0.25]
+    },
+    'Regular': {
+        'preferred_categories': ['tablets', 'accessories', 'smartwatches'],
+        'weights': [0.4, 0.35, 0.25]
+    },
+    'Budget': {
+        'preferred_categories': ['accessories', 'smartwatches'],
+        'weights': [0.6, 0.4]
     }
-    
-    # Get customer's preferred categories
-    customer_prefs = segment_preferences[customer['segment']]
-    preferred_categories = customer_prefs['preferred_categories']
-    category_weights = customer_prefs['weights']
-    
-    # Apply seasonal adjustments to preferences
-    if date_info['month'] in [6, 7, 8]:  # Summer
-        if 'cameras' in preferred_categories:
-            # Boost camera preference in summer
-            idx = preferred_categories.index('cameras')
-            category_weights[idx] *= 1.5
-    
-    if date_info['month'] in [11, 12]:  # Holiday season
-        if 'smartphones' in preferred_categories:
-            # Boost smartphone preference during holidays
-            idx = preferred_categories.index('smartphones')
-            category_weights[idx] *= 1.3
-    
-    # Normalize weights
-    total_weight = sum(category_weights)
-    category_weights = [w/total_weight for w in category_weights]
-    
+}
+
+def season_of(month):
+    if month in [6, 7, 8]:
+        return 'summer'
+    if month in [11, 12]:
+        return 'holiday'
+    return None
+
+def build_product_index(products):
+    """
+    Precompute every draw select_product_for_customer makes.
+
+    (segment, season) holds an alias table over the preferred categories
+    with the seasonal boost applied; (segment, category) holds an alias
+    table over the category's products with the price preference applied.
+    Picking a product is then two O(1) draws instead of a filter, a sort
+    and two weight rebuilds per transaction.
+    """
+    index = {}
+    for segment, prefs in segment_preferences.items():
+        preferred_categories = prefs['preferred_categories']
+
+        for season in [None, 'summer', 'holiday']:
+            # Copy so the seasonal boosts never leak into the base weights
+            category_weights = list(prefs['weights'])
+
+            # Apply seasonal adjustments to preferences
+            if season == 'summer' and 'cameras' in preferred_categories:
+                # Boost camera preference in summer
+                category_weights[preferred_categories.index('cameras')] *= 1.5
+            if season == 'holiday' and 'smartphones' in preferred_categories:
+                # Boost smartphone preference during holidays
+                category_weights[preferred_categories.index('smartphones')] *= 1.3
+
+            # AliasTable normalizes the weights itself
+            index[(segment, season)] = AliasTable(category_weights, items=preferred_categories)
+
+        for category in preferred_categories:
+            # If no products in preferred category, fall back to all products
+            category_products = [p for p in products if p['subcategory'] == category] or list(products)
+
+            if segment == 'Premium':
+                # Sort by price and give higher weight to expensive items
+                category_products.sort(key=lambda x: x['base_price'], reverse=True)
+                weights = [1.5 if i < len(category_products)//2 else 1.0 for i in range(len(category_products))]
+            elif segment == 'Budget':
+                # Sort by price and give higher weight to cheaper items
+                category_products.sort(key=lambda x: x['base_price'])
+                weights = [1.5 if i < len(category_products)//2 else 1.0 for i in range(len(category_products))]
+            else:
+                # Regular customers - equal weights
+                weights = [1.0] * len(category_products)
+            index[(segment, category)] = AliasTable(weights, items=category_products)
+
+    return index
+
+def select_product_for_customer(products, customer, date_info, product_index=None):
+    if product_index is None:
+        product_index = build_product_index(products)
+    segment = customer['segment']
+
     # Select category based on preferences
-    selected_category = rd.choices(preferred_categories, weights=category_weights)[0]
-    
-    # Filter products by selected category
-    category_products = [p for p in products if p['subcategory'] == selected_category]
-    
-    # If no products in preferred category, fall back to all products
-    if not category_products:
-        category_products = products
-    
-    # For premium customers, prefer higher-priced items within category
-    if customer['segment'] == 'Premium':
-        # Sort by price and give higher weight to expensive items
-        category_products.sort(key=lambda x: x['base_price'], reverse=True)
-        weights = [1.5 if i < len(category_products)//2 else 1.0 for i in range(len(category_products))]
-    elif customer['segment'] == 'Budget':
-        # Sort by price and give higher weight to cheaper items
-        category_products.sort(key=lambda x: x['base_price'])
-        weights = [1.5 if i < len(category_products)//2 else 1.0 for i in range(len(category_products))]
-    else:
-        # Regular customers - equal weights
-        weights = [1.0] * len(category_products)
-    
+    selected_category = product_index[(segment, season_of(date_info['month']))].choice()
+
     # Select final product
-    selected_product = rd.choices(category_products, weights=weights)[0]
-    
-    return selected_product
+    return product_index[(segment, selected_category)].choice()
 
-def customer_selection_with_history(customers, date_info, cx_history):
-    weights = []
-    
-    for customer in customers:
-        weight = 1.0
-        # If customer bought before, make them 2x more likely to buy again
-        if customer['segment'] == 'Premium': 
-            weight = 3.0
-        elif customer['segment'] == 'Regular': 
-            weight = 2.0
-        else: 
-            weight = 1.0
-        
-        order_count  = cx_history[customer['customer_id']]['order_count']
-        if order_count > 0: 
-            multiplier  = min(order_count*0.5 + 1, 5.0)
-            weight *= multiplier
-        
-        if date_info['month'] in [11,12]:  
-            weight *= 1.5
-        elif date_info['month'] in [6, 7, 8]: 
-            weight *= 1.2
-        weights.append(weight)
-
-    return rd.choices(customers, weights=weights)[0]
-
-def loyalty_discount(unit_price, customer_id, cx_history): #dct code for loyalty from us to the cx
-    order_count=cx_history[customer_id]['order_count']
-    dct = min(order_count // 5 *0.01, 0.10)
-    return unit_price * (1-dct)
-
-def update_cx_history(cx_history, customer_id, total_sales, date_info): #creating tiers based on History
-    history = cx_history[customer_id]
-    history['order_count'] += 1
-    history['total_spent'] += total_sales
-    history['last_purchase'] = date_info['date']
-
-    if history['order_count'] >= 10: 
-        history['loyalty'] = 'Gold'
-    elif history['order_count'] >= 5: 
-        history['loyalty'] = 'Silver'
-    elif history['order_count'] >= 1: 
-        history['loyalty'] = 'Bronze'
-    else: 
-        history['loyalty'] = 'New'
+SEGMENT_WEIGHTS = {'Premium': 3.0, 'Regular': 2.0, 'Budget': 1.0}
+SEGMENT_WEIGHT_BY_CODE = [SEGMENT_WEIGHTS[segment] for segment in SEGMENTS]
+
+def order_count_multiplier(order_count):
+    # If customer bought before, make them more likely to buy again (capped at 5x)
+    if order_count > 0: 
+        return min(order_count*0.5 + 1, 5.0)
+    return 1.0
+
+def build_customer_sampler(customers, cx_history):
+    """Index every customer's selection weight in a Fenwick tree."""
+    weights = [SEGMENT_WEIGHT_BY_CODE[segment] * order_count_multiplier(order_count)
+               for segment, order_count in zip(cx_history.segment.tolist(),
+                                               cx_history.order_count.tolist())]
+    return FenwickSampler(weights)
+
+def customer_selection_with_history(customers, date_info, cx_history, sampler):
+    # Returns the customer's ordinal, its index in customers and cx_history.
+    # The month boost (1.5 in Nov-Dec, 1.2 in Jun-Aug) scales every customer
+    # by the same factor, so it cancels out of the draw and is not stored.
+    return sampler.sample()
+
+# loyalty_discount(unit_price, ordinal, cx_history) comes from salesgen.state:
+# 1% off per 5 orders, capped at 10%
+
+def update_cx_history(cx_history, ordinal, total_sales, date_info, sampler=None): #creating tiers based on History
+    # cx_history is a CustomerState; the loyalty tier is updated with the order count
+    order_count = cx_history.record_purchase(ordinal, total_sales, day_number(date_info['date']))
+
+    if sampler is not None:
+        sampler.update(ordinal, SEGMENT_WEIGHT_BY_CODE[cx_history.segment[ordinal]]
+                       * order_count_multiplier(order_count))
 
 
 def create_power_customers(customers, cx_history, num_power_customers=50):
     """Give some customers a head start to ensure we have higher-tier customers"""
-    power_customers = rd.sample(customers, num_power_customers)
+    power_customers = rd.sample(range(len(customers)), num_power_customers)
     
-    for customer in power_customers:
-        customer_id = customer['customer_id']
+    for ordinal in power_customers:
         # Give them 2-15 previous "purchases" 
         fake_orders = rd.randint(2, 15)
         fake_spending = rd.randint(500, 5000)
         
-        cx_history[customer_id]['order_count'] = fake_orders
-        cx_history[customer_id]['total_spent'] = fake_spending
-        
-        # Update their loyalty tier based on fake history
-        if fake_orders >= 10:
-            cx_history[customer_id]['loyalty'] = 'Gold'
-        elif fake_orders >= 5:
-            cx_history[customer_id]['loyalty'] = 'Silver'
-        else:
-            cx_history[customer_id]['loyalty'] = 'Bronze' 
+        # Their loyalty tier follows from the fake history
+        cx_history.set_history(ordinal, fake_orders, fake_spending)
 
 
 ## Generating the sales data and getting a CSV doc
-def generate_sales_data (customers, products, data_data): 
+def generate_sales_data (customers, products, date_data): 
+    import pandas as pd
+
+
     sales_transactions = []
     transaction_id = 1
 
-    cx_history = {}
-
-    for customer in customers: 
-        cx_history[customer['customer_id']] = {
-            'order_count': 0,
-            'total_spent': 0,
-            'last_purchase': None,
-            'loyalty': 'New'
-        }
+    cx_history = CustomerState.for_customers(customers)
     create_power_customers(customers, cx_history, 100)
+    sampler = build_customer_sampler(customers, cx_history)
+    product_index = build_product_index(products)
 
-    for date_info in date_data: 
+    for i, date_info in enumerate(date_data): 
         daily_volume = daily_transactions(date_info, customers, products)
         for _ in range(daily_volume):
-            customer = customer_selection_with_history(customers, date_info, cx_history)
-            product = select_product_for_customer(products, customer, date_info)
+            ordinal = customer_selection_with_history(customers, date_info, cx_history, sampler)
+            customer = customers[ordinal]
+            product = select_product_for_customer(products, customer, date_info, product_index)
             quantity = determine_qty(product, customer, date_info) 
             unit_price = call_unit_price(product, customer, date_info)
             total_sales = round(quantity *unit_price)
 
-            current_loyalty = cx_history[customer['customer_id']]['loyalty']
+            current_loyalty = cx_history.loyalty_tier(ordinal)
 
-            update_cx_history(cx_history, customer['customer_id'], total_sales, date_info)
+            update_cx_history(cx_history, ordinal, total_sales, date_info, sampler)
 
 
             transaction ={
                 'transaction_id' : f'T{transaction_id:06d}', 
-                'date' : date_info['date'].strftime('%Y-%m-%d'),
+                'date' : date_info['date_str'],
                 'product_id': product['product_id'],
                 'product_name': product['product_name'],
                 'quantity': quantity,
@@ -524,21 +531,17 @@ def generate_sales_data (customers, products, data_data):
 
         if i % 30 == 0:
             print(f"Processed {i+1}/{len(date_data)} days, {len(sales_transactions)} transactions so far")
-        df_sales = pd.DataFrame(sales_transactions)
-        print(f"Generated {len(df_sales)} total transactions")    
-        return df_sales
-    
 
-df_sales = generate_sales_data(customers, all_products, date_data)
-df_sales.to_csv('sales_data.csv', index=False)
-print('sales data exported')
+    df_sales = pd.DataFrame(sales_transactions)
+    print(f"Generated {len(df_sales)} total transactions")
+    return df_sales
+    
 
-df_products = pd.DataFrame(all_products)
-df_product.to_csv('customers.csv', index=False)
+def generate_summary_stats(df_sales):
+    import pandas as pd
 
-print("All data exported successfully.")
+    from salesgen.analysis import ProductTotals
 
-def generate_summary_stats(df_sales):
     print("=== SALES DATA SUMMARY ===")
     print(f"Total Records: {len(df_sales):,}")
     print(f"Date Range: {df_sales['date'].min()} to {df_sales['date'].max()}")
@@ -553,15 +556,14 @@ def generate_summary_stats(df_sales):
         print(f"{month}: ${sales:,.2f}")
     
     print("\n=== TOP 5 PRODUCTS ===")
-    top_products = df_sales.groupby('product_name')['total_sales'].sum().sort_values(ascending=False).head()
-    for product, sales in top_products.items():
+    top_products = ProductTotals.from_frame(df_sales, key='product_name').top(5, by='revenue')
+    for product, sales in top_products['total_sales'].items():
         print(f"{product}: ${sales:,.2f}")
 
-generate_summary_stats(df_sales)
-
-
 
 def create_data_dictionary():
+    import pandas as pd
+
     data_dict = {
         'Field Name': [
             'transaction_id', 'date', 'product_id', 'product_name', 
@@ -597,12 +599,8 @@ def create_data_dictionary():
     print("Data dictionary saved to 'data_dictionary.csv'")
     return df_dict
 
-# Create and display data dictionary
-data_dict = create_data_dictionary()
-print(data_dict)
 
-
-def create_documentation():
+def create_documentation(df_sales, customers):
     doc_content = f"""
 # Sales Data Generation Documentation
 
@@ -651,12 +649,10 @@ Generated on: {dt.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
     
     print("Documentation saved to 'README.md'")
 
-# Create documentation
-create_documentation()
-
-
 
 def validate_data(df_sales):
+    import pandas as pd
+
     print("=== DATA VALIDATION REPORT ===")
     
     missing_values = df_sales.isnull().sum()
@@ -676,10 +672,9 @@ def validate_data(df_sales):
     
     print("\n=== VALIDATION COMPLETE ===")
 
-# Run validation
-validate_data(df_sales)
+def export_all_data(customers, all_products, date_data):
+    import pandas as pd
 
-def export_all_data():
     print("Starting data export...")
     
     df_sales = generate_sales_data(customers, all_products, date_data)
@@ -689,7 +684,7 @@ def export_all_data():
     pd.DataFrame(customers).to_csv('customers.csv', index=False)
     
     create_data_dictionary()
-    create_documentation()
+    create_documentation(df_sales, customers)
     
     generate_summary_stats(df_sales)
     validate_data(df_sales)
@@ -702,5 +697,13 @@ def export_all_data():
     print("- data_dictionary.csv")
     print("- README.md")
 
-# Run complete export
-export_all_data()
\ No newline at end of file
+def main():
+    all_products = build_products()
+    customers = build_customers()
+    # Calendar features for the whole range at once (same rules as data_information)
+    date_data = build_date_data(start_date, end_date)
+    export_all_data(customers, all_products, date_data)
+
+
+if __name__ == '__main__':
+    main()
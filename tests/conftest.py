@@ -0,0 +1,68 @@
+"""
+Shared fixtures: a small dataset (four months, 150 customers, three products
+per subcategory, about 20 transactions a day), small enough that every
+engine, writer and analysis path runs over it in about a second.
+"""
+import datetime as dt
+
+import pytest
+
+from salesgen import SalesGenerator
+
+START_DATE = dt.datetime(2023, 7, 1)
+END_DATE = dt.datetime(2023, 10, 31)
+SMALL_DATASET = {
+    'start_date': START_DATE,
+    'end_date': END_DATE,
+    'n_customers': 150,
+    'products_per_category': 3,
+    'base_volume': 20,
+    'customer_synthesis': 'bulk',
+}
+
+
+def small_generator(**options):
+    """A SalesGenerator over the small dataset, ``options`` overriding its settings."""
+    return SalesGenerator(**dict(SMALL_DATASET, **options))
+
+
+@pytest.fixture
+def make_generator():
+    return small_generator
+
+
+@pytest.fixture(scope='session')
+def csv_dataset(tmp_path_factory):
+    """Paths of the small dataset written as CSV by the batch engine."""
+    paths, _ = small_generator(engine='batch').write(str(tmp_path_factory.mktemp('csv')), fmt='csv')
+    return paths
+
+
+@pytest.fixture(scope='session')
+def parquet_dataset(tmp_path_factory):
+    """Paths of the same dataset written as Parquet."""
+    paths, _ = small_generator(engine='batch').write(str(tmp_path_factory.mktemp('parquet')), fmt='parquet')
+    return paths
+
+
+def split_csv(path, rows):
+    """The bytes of a CSV file up to the end of its ``rows``-th row, and the bytes after."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    end = 0
+    for _ in range(rows + 1):
+        end = data.index(b'\n', end) + 1
+    return data[:end], data[end:]
+
+
+def append_after_listing(monkeypatch, module, path, data):
+    """Make ``module``'s list_partitions append ``data`` to ``path`` once it has listed the partitions."""
+    list_partitions = module.list_partitions
+
+    def listing_then_append(source):
+        partitions = list_partitions(source)
+        with open(path, 'ab') as f:
+            f.write(data)
+        return partitions
+
+    monkeypatch.setattr(module, 'list_partitions', listing_then_append)
@@ -0,0 +1,130 @@
+import shutil
+import time
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from salesgen.analysis import cache as cache_module
+from salesgen.analysis.cache import MISSING, ResultCache, partition_cubes
+from salesgen.analysis.cube import SalesCube
+from salesgen.analysis.sources import list_partitions
+
+from .conftest import append_after_listing, split_csv
+
+
+def put(cache, key, size=1000):
+    cache.put(key, b'x' * size)
+    # Recency is the file modification time, whose clock may be coarse
+    time.sleep(0.02)
+
+
+def test_writing_evicts_the_least_recently_used_entries(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=3500)
+    for key in ['a', 'b', 'c']:
+        put(cache, key)
+    cache.get('a')
+    put(cache, 'd')
+
+    assert cache.get('b') is MISSING
+    assert all(cache.get(key) is not MISSING for key in ['a', 'c', 'd'])
+    assert cache.size() <= 3500
+
+
+def test_an_entry_larger_than_the_cache_is_kept_alone(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=3500)
+    put(cache, 'small')
+    put(cache, 'large', 5000)
+
+    assert cache.get('small') is MISSING
+    assert cache.get('large') == b'x' * 5000
+
+
+def test_memoize_computes_once_per_key(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'value': len(calls)}
+
+    assert cache.memoize(['result', {'n': 10}], compute) == {'value': 1}
+    assert cache.memoize(['result', {'n': 10}], compute) == {'value': 1}
+    assert cache.memoize(['result', {'n': 5}], compute) == {'value': 2}
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """(partition name, start) of every partition scan."""
+    scan, calls = SalesCube.scan, []
+
+    def recording_scan(partition, start=0, *args, **kwargs):
+        calls.append((partition.name, start))
+        return scan(partition, start, *args, **kwargs)
+
+    monkeypatch.setattr(SalesCube, 'scan', recording_scan)
+    return calls
+
+
+def assert_same_cube(cube, source):
+    expected = SalesCube().refresh(source)
+    pd.testing.assert_frame_equal(cube.cells, expected.cells)
+    assert cube.customers_by_product.counts().equals(expected.customers_by_product.counts())
+
+
+def test_only_changed_partitions_are_scanned_again(parquet_dataset, tmp_path, scans):
+    source = str(tmp_path / 'sales')
+    shutil.copytree(parquet_dataset['sales'], source)
+    cache = ResultCache(str(tmp_path / 'cache'))
+    partitions = list_partitions(source)
+
+    partition_cubes(source, cache)
+    assert sorted(scans) == sorted((partition.name, 0) for partition in partitions)
+
+    scans.clear()
+    partition_cubes(source, cache)
+    assert scans == []
+
+    # Rewrite the last month without its first rows
+    changed = partitions[-1]
+    table = pq.read_table(changed.path)
+    pq.write_table(table.slice(10), changed.path)
+    cube = partition_cubes(source, cache)
+
+    assert scans == [(changed.name, 0)]
+    assert_same_cube(cube, source)
+
+
+def test_appended_csv_rows_are_added_to_the_cached_cube(csv_dataset, tmp_path, scans):
+    path = str(tmp_path / 'sales.csv')
+    head, rest = split_csv(csv_dataset['sales'], 1000)
+    with open(path, 'wb') as f:
+        f.write(head)
+    cache = ResultCache(str(tmp_path / 'cache'))
+    partition_cubes(path, cache)
+    with open(path, 'ab') as f:
+        f.write(rest)
+
+    cube = partition_cubes(path, cache)
+
+    assert scans[-1] == ('sales.csv', len(head))
+    assert_same_cube(cube, path)
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_rows_appended_after_listing_are_cached_once(csv_dataset, tmp_path, monkeypatch, workers):
+    path = str(tmp_path / 'sales.csv')
+    head, rest = split_csv(csv_dataset['sales'], 1000)
+    with open(path, 'wb') as f:
+        f.write(head)
+    cache = ResultCache(str(tmp_path / 'cache'))
+
+    # Some rows and part of the next one land between listing and reading
+    append_after_listing(monkeypatch, cache_module, path, rest[:len(rest) // 3])
+    cube = partition_cubes(path, cache, workers=workers)
+    assert cube.cells['transactions'].sum() == 1000
+
+    monkeypatch.undo()
+    with open(path, 'ab') as f:
+        f.write(rest[len(rest) // 3:])
+    assert_same_cube(partition_cubes(path, cache, workers=workers), path)
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from salesgen.analysis.charts import dashboard_data, heatmap_matrix, lttb, revenue_series, trend_series
+from salesgen.analysis.pipeline import build_cube
+
+
+@pytest.fixture(scope='module')
+def cube(csv_dataset):
+    return build_cube(csv_dataset['sales'])
+
+
+@pytest.mark.parametrize('n, n_out', [(1000, 100), (1000, 3), (101, 100), (10, 7)])
+def test_lttb_keeps_the_endpoints_and_returns_n_out_sorted_points(n, n_out):
+    values = np.random.default_rng(0).normal(size=n)
+
+    keep = lttb(values, n_out)
+
+    assert len(keep) == n_out
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert (np.diff(keep) > 0).all()
+
+
+@pytest.mark.parametrize('n_out', [10, 50])
+def test_lttb_returns_short_series_whole(n_out):
+    assert lttb(np.arange(10.0), n_out).tolist() == list(range(10))
+
+
+@pytest.mark.parametrize('n_out, expected', [(0, []), (1, [0]), (2, [0, 9])])
+def test_lttb_below_three_points_keeps_the_endpoints(n_out, expected):
+    assert lttb(np.arange(10.0), n_out).tolist() == expected
+
+
+def test_lttb_keeps_spikes():
+    values = np.zeros(1000)
+    values[[137, 600]] = [50.0, -80.0]
+
+    keep = lttb(values, 20)
+
+    assert {137, 600} <= set(keep.tolist())
+
+
+def test_trend_series_fits_the_trend_on_the_full_series():
+    values = np.arange(500, dtype=np.float64) * 2 + 10
+    labels = [f'd{i}' for i in range(500)]
+
+    series = trend_series(labels, values, max_points=50)
+
+    assert len(series['x']) == len(series['y']) == len(series['trend']) == 50
+    assert series['x'][0] == 'd0' and series['x'][-1] == 'd499'
+    assert np.allclose(series['trend'], series['y'])
+
+
+@pytest.mark.parametrize('grain', ['day', 'week', 'month'])
+def test_revenue_series_adds_up_to_the_total_revenue(csv_dataset, cube, grain):
+    labels, values = revenue_series(cube, grain)
+
+    assert len(labels) == len(values) == len(set(labels))
+    assert sum(values) == pytest.approx(pd.read_csv(csv_dataset['sales'])['total_sales'].sum())
+
+
+def test_revenue_series_rejects_unknown_grains(cube):
+    with pytest.raises(ValueError, match='grain'):
+        revenue_series(cube, 'hour')
+
+
+def test_heatmap_matrix_has_every_month(cube):
+    matrix = heatmap_matrix(cube.heatmap())
+
+    assert len(matrix['z']) == 12 and all(len(row) == 7 for row in matrix['z'])
+    assert matrix['z'][0] == [0] * 7
+    assert matrix['x'][0] == 'Monday' and matrix['y'][0] == 'Jan'
+
+
+def test_dashboard_data_caps_line_traces(cube):
+    data = dashboard_data(cube, grain='day', max_points=30)
+
+    assert len(data['revenue']['x']) == 30
+    assert data['quarterly']['x'] == ['Q3', 'Q4']
+    assert len(data['top_products']['y']) == 10
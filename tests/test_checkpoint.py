@@ -0,0 +1,147 @@
+import datetime as dt
+import filecmp
+
+import pandas as pd
+import pytest
+
+from salesgen import SalesGenerator
+from salesgen.analysis.loader import load_sales
+from salesgen.cli import main
+from salesgen.profiling import Profiler
+
+from .conftest import END_DATE, small_generator
+
+MIDPOINT = dt.datetime(2023, 8, 20)
+COMPARED_TABLES = ['sales', 'products', 'customers', 'calendar', 'summary']
+
+
+def single_run(directory, engine, fmt='csv'):
+    paths, _ = small_generator(engine=engine).write(str(directory), fmt=fmt)
+    return paths
+
+
+def assert_same_csv_output(paths, expected):
+    for table in COMPARED_TABLES:
+        assert filecmp.cmp(paths[table], expected[table], shallow=False), table
+
+
+@pytest.mark.parametrize('engine', ['loop', 'batch'])
+def test_append_matches_a_single_run(tmp_path, engine):
+    expected = single_run(tmp_path / 'single', engine)
+    output_dir = str(tmp_path / 'appended')
+    small_generator(engine=engine, end_date=MIDPOINT).write(output_dir, checkpoint=True)
+
+    paths, summary = SalesGenerator.from_checkpoint(output_dir).append(output_dir, END_DATE)
+
+    assert_same_csv_output(paths, expected)
+    assert summary.rows == len(pd.read_csv(expected['sales']))
+
+
+def test_appending_in_steps_and_with_workers_matches_a_single_run(tmp_path):
+    expected = single_run(tmp_path / 'single', 'batch')
+    output_dir = str(tmp_path / 'appended')
+    small_generator(engine='batch', end_date=dt.datetime(2023, 7, 31)).write(output_dir, checkpoint=True)
+
+    SalesGenerator.from_checkpoint(output_dir).append(output_dir, MIDPOINT, workers=2)
+    paths, _ = SalesGenerator.from_checkpoint(output_dir).append(output_dir, END_DATE)
+
+    assert_same_csv_output(paths, expected)
+
+
+def test_parquet_append_matches_a_single_run(tmp_path, parquet_dataset):
+    output_dir = str(tmp_path)
+    small_generator(engine='batch', end_date=MIDPOINT).write(output_dir, fmt='parquet', checkpoint=True)
+
+    paths, _ = SalesGenerator.from_checkpoint(output_dir).append(output_dir, END_DATE)
+
+    pd.testing.assert_frame_equal(load_sales(paths['sales']), load_sales(parquet_dataset['sales']))
+
+
+def test_append_needs_a_later_end_date(tmp_path):
+    output_dir = str(tmp_path)
+    small_generator(engine='batch', end_date=MIDPOINT).write(output_dir, checkpoint=True)
+
+    with pytest.raises(ValueError, match='not after'):
+        SalesGenerator.from_checkpoint(output_dir).append(output_dir, MIDPOINT)
+
+
+def test_append_needs_a_checkpoint(tmp_path):
+    with pytest.raises(ValueError, match='checkpoint'):
+        small_generator().append(str(tmp_path), END_DATE)
+
+
+class Crash(Exception):
+    pass
+
+
+class CrashingProfiler(Profiler):
+    """Kills the run, as a crash would, before it writes chunk number ``writes + 1``."""
+
+    def __init__(self, writes):
+        super().__init__()
+        self.writes_left = writes
+
+    def stage(self, name):
+        if name == 'write':
+            if not self.writes_left:
+                raise Crash
+            self.writes_left -= 1
+        return super().stage(name)
+
+
+def crashed_run(output_dir, engine='batch', fmt='csv', workers=None, writes=8):
+    """A run checkpointed every 10 days that crashes between two checkpoints."""
+    with pytest.raises(Crash):
+        small_generator(engine=engine).write(output_dir, fmt=fmt, workers=workers, chunk_rows=200,
+                                             checkpoint_every=10, profiler=CrashingProfiler(writes))
+
+
+@pytest.mark.parametrize('engine', ['loop', 'batch'])
+def test_resume_after_a_crash_matches_an_uninterrupted_run(tmp_path, engine):
+    expected = single_run(tmp_path / 'single', engine)
+    output_dir = str(tmp_path / 'crashed')
+    crashed_run(output_dir, engine)
+
+    paths, _ = SalesGenerator.from_checkpoint(output_dir).resume(output_dir)
+
+    assert_same_csv_output(paths, expected)
+
+
+def test_resume_of_a_sharded_run_matches_an_uninterrupted_run(tmp_path):
+    expected = single_run(tmp_path / 'single', 'batch')
+    output_dir = str(tmp_path / 'crashed')
+    crashed_run(output_dir, workers=2, writes=9)
+
+    paths, _ = SalesGenerator.from_checkpoint(output_dir).resume(output_dir)
+
+    assert_same_csv_output(paths, expected)
+
+
+def test_parquet_resume_discards_files_written_after_the_checkpoint(tmp_path, parquet_dataset):
+    output_dir = str(tmp_path)
+    crashed_run(output_dir, fmt='parquet')
+
+    paths, _ = SalesGenerator.from_checkpoint(output_dir).resume(output_dir)
+
+    pd.testing.assert_frame_equal(load_sales(paths['sales']), load_sales(parquet_dataset['sales']))
+
+
+def test_resuming_a_finished_run_changes_nothing(tmp_path, capsys):
+    output_dir = str(tmp_path)
+    paths, _ = small_generator(engine='batch').write(output_dir, checkpoint=True)
+    before = open(paths['sales'], 'rb').read()
+    generator = SalesGenerator.from_checkpoint(output_dir)
+
+    assert generator.complete
+    generator.resume(output_dir)
+
+    assert open(paths['sales'], 'rb').read() == before
+    assert capsys.readouterr().out == ''
+    main(['--output-dir', output_dir, '--resume'])
+    assert 'nothing to resume' in capsys.readouterr().out
+
+
+def test_an_interrupted_run_is_not_complete(tmp_path):
+    crashed_run(str(tmp_path))
+
+    assert not SalesGenerator.from_checkpoint(str(tmp_path)).complete
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from salesgen.analysis import cube as cube_module
+from salesgen.analysis.cube import SalesCube
+
+from .conftest import append_after_listing, split_csv
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_rows_appended_after_listing_are_read_once(csv_dataset, tmp_path, monkeypatch, workers):
+    path = str(tmp_path / 'sales.csv')
+    head, rest = split_csv(csv_dataset['sales'], 1000)
+    with open(path, 'wb') as f:
+        f.write(head)
+    # 100 rows and half of the next one land between listing and reading
+    appended, _ = split_csv(csv_dataset['sales'], 1100)
+    appended = appended[len(head):]
+    partial = rest[len(appended):rest.index(b'\n', len(appended)) // 2]
+
+    append_after_listing(monkeypatch, cube_module, path, appended + partial)
+    cube = SalesCube().refresh(path, chunk_rows=300, workers=workers)
+    assert cube.cells['transactions'].sum() == 1000
+
+    monkeypatch.undo()
+    with open(path, 'ab') as f:
+        f.write(rest[len(appended) + len(partial):])
+    cube.refresh(path, chunk_rows=300, workers=workers)
+    expected = SalesCube.from_frame(pd.read_csv(csv_dataset['sales']))
+
+    pd.testing.assert_frame_equal(cube.cells, expected.cells)
+    assert cube.customers_by_month.counts().equals(expected.customers_by_month.counts())
+
+
+def test_a_failed_scan_leaves_the_cube_as_it_was(csv_dataset, tmp_path, monkeypatch):
+    path = str(tmp_path / 'sales.csv')
+    head, rest = split_csv(csv_dataset['sales'], 1000)
+    with open(path, 'wb') as f:
+        f.write(head)
+    cube = SalesCube().refresh(path)
+    with open(path, 'ab') as f:
+        f.write(rest)
+
+    update, calls = SalesCube.update, []
+
+    def failing_update(self, chunk):
+        # The second chunk of the new rows fails to read
+        calls.append(len(chunk))
+        if len(calls) == 2:
+            raise OSError('read failed')
+        return update(self, chunk)
+
+    monkeypatch.setattr(SalesCube, 'update', failing_update)
+    with pytest.raises(OSError):
+        cube.refresh(path, chunk_rows=300)
+    assert cube.cells['transactions'].sum() == 1000
+
+    monkeypatch.undo()
+    cube.refresh(path)
+    assert cube.cells['transactions'].sum() == len(pd.read_csv(csv_dataset['sales']))
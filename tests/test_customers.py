@@ -0,0 +1,76 @@
+import random
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from salesgen.customers import (CUSTOMER_COLUMNS, SEGMENT_RANGES, build_customer_table, build_customers,
+                                cities_distribution, customer_segments, sample_vocabulary)
+
+N_CUSTOMERS = 20_000
+
+
+@pytest.fixture(scope='module')
+def vocabulary():
+    return sample_vocabulary(seed=7)
+
+
+@pytest.fixture(scope='module')
+def table(vocabulary):
+    return build_customer_table(N_CUSTOMERS, seed=7, vocabulary=vocabulary)
+
+
+def test_bulk_table_has_the_faker_schema(table):
+    faker = pd.DataFrame(build_customers(random.Random(7), 200, seed=7))
+
+    assert list(table.columns) == list(faker.columns) == CUSTOMER_COLUMNS
+    for name in ['age', 'income', 'total_orders']:
+        assert table[name].dtype == np.int32
+        assert pd.api.types.is_integer_dtype(faker[name])
+    assert isinstance(table['segment'].dtype, pd.CategoricalDtype)
+    assert isinstance(table['city'].dtype, pd.CategoricalDtype)
+    assert list(table['segment'].cat.categories) == list(customer_segments)
+    assert list(table['city'].cat.categories) == list(cities_distribution)
+
+
+def test_customer_ids_are_unique_and_formatted_like_faker_ids():
+    ids = build_customer_table(12_345, seed=1)['customer_id']
+
+    assert ids.is_unique
+    # The Faker path's f'C{n:04d}', past four digits too
+    assert ids.tolist() == [f'C{n:04d}' for n in range(1, 12_346)]
+
+
+def test_fields_stay_within_their_segment_ranges(table):
+    for segment, ranges in SEGMENT_RANGES.items():
+        rows = table[table['segment'] == segment]
+        for field, (low, high) in ranges.items():
+            assert rows[field].between(low, high).all()
+            if field != 'income':
+                # Both ends of the inclusive ranges are drawn
+                assert rows[field].min() == low and rows[field].max() == high
+
+
+def test_segments_and_cities_follow_their_weights(table):
+    segments = table['segment'].value_counts(normalize=True)
+    cities = table['city'].value_counts(normalize=True)
+    city_total = sum(city['weight'] for city in cities_distribution.values())
+
+    for segment, spec in customer_segments.items():
+        assert segments[segment] == pytest.approx(spec['percentage'], abs=0.015)
+    for city, spec in cities_distribution.items():
+        assert cities[city] == pytest.approx(spec['weight'] / city_total, abs=0.015)
+
+
+def test_names_and_emails_come_from_the_vocabulary(table, vocabulary):
+    assert table['first_name'].isin(vocabulary['first_name']).all()
+    assert table['last_name'].isin(vocabulary['last_name']).all()
+    expected = table['first_name'].str.lower() + '.' + table['last_name'].str.lower() + '@'
+    assert (table['email'].str.split('@').str[0] + '@' == expected).all()
+    assert table['email'].str.split('@').str[1].isin(vocabulary['domain']).all()
+    assert all(re.fullmatch(r'[^@\s]+@[^@\s]+\.[a-z]+', email) for email in table['email'].head(1000))
+
+
+def test_same_seed_builds_the_same_table(table, vocabulary):
+    pd.testing.assert_frame_equal(build_customer_table(N_CUSTOMERS, seed=7, vocabulary=vocabulary), table)
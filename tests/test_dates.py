@@ -0,0 +1,47 @@
+import datetime as dt
+
+import pytest
+
+from salesgen.dates import build_calendar, calendar_records, data_information, generate_dates
+
+# Two leap days, and every Nov-Dec and Jun-Aug boundary of five years
+START_DATE = dt.datetime(2019, 12, 15)
+END_DATE = dt.datetime(2025, 1, 10)
+
+
+@pytest.fixture(scope='module')
+def records():
+    return calendar_records(build_calendar(START_DATE, END_DATE))
+
+
+def test_calendar_matches_the_per_day_features(records):
+    dates = generate_dates(START_DATE, END_DATE)
+
+    assert len(records) == len(dates) == 1854
+    for record, date in zip(records, dates):
+        legacy = data_information(date)
+        assert {name: record[name] for name in legacy} == legacy
+        # Plain Python values, as data_information returns them
+        assert all(type(record[name]) is type(value) for name, value in legacy.items())
+
+
+def test_leap_days_and_season_boundaries(records):
+    by_date = {record['date_str']: record for record in records}
+
+    assert '2020-02-29' in by_date and '2024-02-29' in by_date and '2023-02-29' not in by_date
+    for date, multiplier in [('2023-05-31', 1.0), ('2023-06-01', 1.2), ('2023-08-31', 1.2),
+                             ('2023-09-01', 1.0), ('2023-10-31', 1.0), ('2023-11-01', 1.5),
+                             ('2023-12-31', 1.5), ('2024-01-01', 0.8), ('2024-03-31', 0.8),
+                             ('2024-04-01', 1.0)]:
+        assert by_date[date]['seasonal_multiplier'] == multiplier
+
+
+def test_calendar_only_columns(records):
+    for record in records:
+        date = record['date']
+        assert record['date_key'] == date.year * 10000 + date.month * 100 + date.day
+        assert record['date_str'] == date.strftime('%Y-%m-%d')
+        assert record['is_holiday_season'] == (date.month in [11, 12])
+        assert record['is_summer'] == (date.month in [6, 7, 8])
+        assert record['is_black_friday'] == (date.month == 11 and 21 <= date.day <= 26)
+        assert record['is_christmas'] == (date.month == 12 and 21 <= date.day <= 30)
@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+
+@pytest.mark.parametrize('engine', ['loop', 'batch'])
+def test_same_seed_generates_the_same_transactions(make_generator, engine):
+    first = make_generator(engine=engine).generate()
+    second = make_generator(engine=engine).generate()
+
+    assert len(first) > 1000
+    pd.testing.assert_frame_equal(first, second)
+
+
+@pytest.mark.parametrize('engine', ['loop', 'batch'])
+def test_repeated_runs_of_one_generator_match(make_generator, engine):
+    generator = make_generator(engine=engine)
+
+    pd.testing.assert_frame_equal(generator.generate(), generator.generate())
+
+
+@pytest.mark.parametrize('engine', ['loop', 'batch'])
+def test_chunking_does_not_change_the_transactions(make_generator, engine):
+    whole = make_generator(engine=engine).generate()
+    chunks = list(make_generator(engine=engine).iter_chunks(chunk_rows=500))
+
+    assert len(chunks) > 1
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), whole)
+
+
+def test_seed_changes_the_transactions(make_generator):
+    first = make_generator(engine='loop', seed=1).generate()
+    second = make_generator(engine='loop', seed=2).generate()
+
+    assert not first.equals(second)
+
+
+def test_population_does_not_depend_on_access_order(make_generator):
+    first = make_generator(customer_synthesis='faker')
+    second = make_generator(customer_synthesis='faker')
+    customers_first = first.customers
+    products_first = first.products
+    products_second = second.products
+
+    assert products_first == products_second
+    assert customers_first == second.customers
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from salesgen.analysis.loader import load_customers, load_products, load_sales
+
+PARQUET_ONLY_COLUMNS = ['date_key', 'year', 'month']
+
+
+@pytest.mark.parametrize('float_dtype', ['float32', 'float64'])
+def test_csv_and_parquet_sales_load_identically(csv_dataset, parquet_dataset, float_dtype):
+    from_csv = load_sales(csv_dataset['sales'], float_dtype=float_dtype)
+    from_parquet = load_sales(parquet_dataset['sales'], float_dtype=float_dtype)
+
+    pd.testing.assert_frame_equal(from_parquet.drop(columns=PARQUET_ONLY_COLUMNS), from_csv)
+
+
+@pytest.mark.parametrize('loader, table', [(load_products, 'products'), (load_customers, 'customers')])
+def test_csv_and_parquet_dimensions_load_identically(csv_dataset, parquet_dataset, loader, table):
+    pd.testing.assert_frame_equal(loader(parquet_dataset[table]), loader(csv_dataset[table]))
+
+
+def test_sales_types(csv_dataset):
+    df = load_sales(csv_dataset['sales'])
+
+    assert df['transaction_id'].tolist()[:3] == [1, 2, 3]
+    assert str(df['product_id'].dtype) == 'int32'
+    assert isinstance(df['city'].dtype, pd.CategoricalDtype)
+    assert str(df['date'].dtype).startswith('datetime64')
+    assert str(df['total_sales'].dtype) == 'float32'
+
+
+def test_total_sales_matches_the_csv_when_read_alone(csv_dataset, parquet_dataset):
+    # The Parquet dataset does not store total_sales; it is derived on load
+    from_csv = load_sales(csv_dataset['sales'], columns=['total_sales'], float_dtype='float64')
+    from_parquet = load_sales(parquet_dataset['sales'], columns=['total_sales'], float_dtype='float64')
+
+    assert from_parquet.columns.tolist() == ['total_sales']
+    assert from_parquet['total_sales'].tolist() == pd.read_csv(csv_dataset['sales'])['total_sales'].tolist()
+    pd.testing.assert_frame_equal(from_parquet, from_csv)
+
+
+@pytest.mark.parametrize('dataset', ['csv', 'parquet'])
+def test_filters(csv_dataset, parquet_dataset, dataset):
+    source = (csv_dataset if dataset == 'csv' else parquet_dataset)['sales']
+    everything = load_sales(source)
+
+    df = load_sales(source, columns=['date', 'product_id', 'quantity'], start='2023-08-01', end='2023-09-30',
+                    products=['P0004', 7])
+
+    expected = everything[everything['date'].between('2023-08-01', '2023-09-30')
+                          & everything['product_id'].isin([4, 7])]
+    assert df.columns.tolist() == ['date', 'product_id', 'quantity']
+    assert len(df) > 0
+    pd.testing.assert_frame_equal(df.reset_index(drop=True),
+                                  expected[df.columns].reset_index(drop=True))
@@ -0,0 +1,57 @@
+import filecmp
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from salesgen.analysis.loader import load_sales
+from salesgen.checkpoint import checkpoint_path, load_checkpoint
+
+from .conftest import small_generator
+
+
+@pytest.fixture(scope='module')
+def sequential(tmp_path_factory):
+    """The small dataset written by the batch engine without workers."""
+    paths, _ = small_generator(engine='batch').write(str(tmp_path_factory.mktemp('sequential')))
+    return paths
+
+
+@pytest.mark.parametrize('workers', [1, 2, 3])
+def test_any_worker_count_writes_the_sequential_output(make_generator, sequential, tmp_path, workers):
+    paths, _ = make_generator(engine='batch').write(str(tmp_path), workers=workers)
+
+    assert filecmp.cmp(paths['sales'], sequential['sales'], shallow=False)
+    assert filecmp.cmp(paths['summary'], sequential['summary'], shallow=False)
+
+
+def test_chunk_size_does_not_change_sharded_output(make_generator, sequential, tmp_path):
+    paths, _ = make_generator(engine='batch').write(str(tmp_path), workers=2, chunk_rows=300)
+
+    assert filecmp.cmp(paths['sales'], sequential['sales'], shallow=False)
+
+
+def test_sharded_parquet_matches_sequential_parquet(make_generator, parquet_dataset, tmp_path):
+    paths, _ = make_generator(engine='batch').write(str(tmp_path), fmt='parquet', workers=2)
+
+    pd.testing.assert_frame_equal(load_sales(paths['sales']), load_sales(parquet_dataset['sales']))
+
+
+def test_workers_require_the_batch_engine(make_generator, tmp_path):
+    with pytest.raises(ValueError, match='batch'):
+        make_generator(engine='loop').write(str(tmp_path), workers=2)
+
+
+def checkpointed_engine(output_dir, **options):
+    small_generator(engine='batch').write(output_dir, checkpoint=True, **options)
+    return load_checkpoint(checkpoint_path(output_dir))['engine']
+
+
+@pytest.mark.parametrize('options', [{'workers': 2}, {'workers': 3, 'checkpoint_every': 10}])
+def test_sharded_checkpoint_holds_the_sequential_customer_state(tmp_path, options):
+    expected = checkpointed_engine(str(tmp_path / 'sequential'))
+    engine = checkpointed_engine(str(tmp_path / 'sharded'), **options)
+
+    for name in ['order_count', 'total_spent', 'last_purchase_day', 'loyalty', 'segment']:
+        np.testing.assert_array_equal(getattr(engine.state, name), getattr(expected.state, name), err_msg=name)
+    assert (engine.next_transaction_id, engine.next_day) == (expected.next_transaction_id, expected.next_day)
@@ -0,0 +1,123 @@
+"""analyze() against the groupbys main_analyis.ipynb runs on the whole table."""
+import pandas as pd
+import pytest
+
+from salesgen.analysis.pipeline import analyze, write_results
+
+PRODUCT_TABLES = ['top_revenue', 'top_quantity', 'highest_priced']
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+@pytest.fixture(scope='module')
+def df_sales(csv_dataset):
+    """The sales table with the notebook's datetime features."""
+    df = pd.read_csv(csv_dataset['sales'])
+    df['date'] = pd.to_datetime(df['date'])
+    df['year'] = df['date'].dt.year
+    df['month'] = df['date'].dt.month
+    df['quarter'] = df['date'].dt.quarter
+    df['day_name'] = df['date'].dt.day_name()
+    return df
+
+
+@pytest.fixture(scope='module')
+def tables(csv_dataset):
+    return analyze(csv_dataset['sales'])
+
+
+def assert_same_table(result, expected):
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_index_type=False,
+                                  check_column_type=False)
+
+
+def test_monthly_summary(df_sales, tables):
+    expected = df_sales.groupby(['year', 'month']).agg({
+        'total_sales': ['sum', 'mean', 'count'],
+        'quantity': 'sum',
+        'customer_id': 'nunique',
+    }).round(2)
+    expected.columns = ['total_revenue', 'avg_transaction', 'transaction_count', 'total_units', 'unique_customers']
+    expected = expected.reset_index()
+    expected['month_year'] = expected['year'].astype(str) + '-' + expected['month'].astype(str).str.zfill(2)
+    expected['avg_order_value'] = expected['total_revenue'] / expected['transaction_count']
+    expected['revenue_growth'] = expected['total_revenue'].pct_change() * 100
+    expected['transaction_growth'] = expected['transaction_count'].pct_change() * 100
+
+    assert_same_table(tables['monthly_summary'].reset_index(drop=True), expected)
+
+
+def test_quarterly_sales(df_sales, tables):
+    expected = df_sales.groupby('quarter').agg({
+        'total_sales': 'sum',
+        'quantity': 'sum',
+        'customer_id': 'nunique',
+    }).round(2)
+    expected.columns = ['total_revenue', 'total_units_sold', 'unique_customers']
+
+    assert_same_table(tables['quarterly_sales'], expected)
+
+
+def test_daily_patterns(df_sales, tables):
+    expected = df_sales.groupby('day_name').agg({
+        'total_sales': ['sum', 'mean'],
+        'customer_id': 'count',
+    }).round(2)
+    expected.columns = ['total_sales', 'avg_transaction_value', 'transaction_count']
+
+    assert_same_table(tables['daily_patterns'], expected.reindex(DAY_NAMES))
+
+
+def test_seasonal_indices(df_sales, tables):
+    monthly_averages = df_sales.groupby('month')['total_sales'].mean()
+    expected = (monthly_averages / df_sales['total_sales'].mean() * 100).round(1)
+
+    seasonal = tables['seasonal_df']
+    assert seasonal['month'].tolist() == expected.index.tolist()
+    assert seasonal['seasonal_index'].tolist() == expected.tolist()
+    assert seasonal['status'].tolist() == ["Above average" if index > 100 else "Below average"
+                                           for index in expected]
+
+
+def test_heatmap(df_sales, tables):
+    expected = df_sales.groupby(['month', 'day_name'])['total_sales'].sum().unstack(fill_value=0)
+
+    assert_same_table(tables['heatmap_data'], expected.reindex(columns=DAY_NAMES))
+
+
+@pytest.mark.parametrize('name, aggregations, order', [
+    ('top_revenue', {'total_sales': 'sum', 'quantity': 'sum'}, 'total_sales'),
+    ('top_quantity', {'quantity': 'sum', 'total_sales': 'sum'}, 'quantity'),
+    ('highest_priced', {'unit_price': 'mean', 'total_sales': 'sum'}, 'unit_price'),
+])
+def test_product_rankings(df_sales, tables, name, aggregations, order):
+    expected = (df_sales.groupby(['product_id', 'product_name']).agg(aggregations)
+                .sort_values(order, ascending=False).head(10))
+
+    assert_same_table(tables[name], expected)
+
+
+@pytest.mark.parametrize('options', [{'chunk_rows': 250}, {'workers': 2}])
+def test_chunking_and_workers_do_not_change_the_tables(csv_dataset, tables, options):
+    result = analyze(csv_dataset['sales'], **options)
+
+    for name, table in tables.items():
+        assert_same_table(result[name], table)
+
+
+def test_parquet_input_gives_the_same_tables(parquet_dataset, tables):
+    result = analyze(parquet_dataset['sales'])
+
+    for name, table in tables.items():
+        # Parquet keeps product IDs as integer codes
+        if name in PRODUCT_TABLES:
+            assert result[name].to_numpy().tolist() == table.to_numpy().tolist()
+        else:
+            assert_same_table(result[name], table)
+
+
+def test_write_results_saves_the_notebook_files(tables, tmp_path):
+    paths = write_results(tables, str(tmp_path))
+
+    monthly = pd.read_csv(paths['monthly_summary'])
+    assert monthly['total_revenue'].tolist() == tables['monthly_summary']['total_revenue'].tolist()
+    assert set(paths) == {'monthly_summary', 'quarterly_sales', 'daily_patterns', 'top_revenue', 'seasonal_df'}
@@ -0,0 +1,102 @@
+import random
+
+import numpy as np
+import pytest
+
+from salesgen.sampling import AliasTable, FenwickSampler
+from salesgen.simulation import SEGMENT_WEIGHTS, build_customer_sampler, order_count_multiplier
+from salesgen.state import SEGMENTS, CustomerState
+
+DRAWS = 200_000
+
+
+def counts(draw, size, n=DRAWS):
+    """How often each of ``size`` indices comes out of ``n`` calls to ``draw``."""
+    return np.bincount([draw() for _ in range(n)], minlength=size)
+
+
+def assert_distribution(observed, weights):
+    """Chi-square test of draw counts against ``weights``, at about five standard deviations."""
+    weights = np.asarray(weights, dtype=np.float64)
+    assert observed[weights == 0].sum() == 0
+    expected = observed.sum() * weights / weights.sum()
+    drawn = weights > 0
+    statistic = ((observed[drawn] - expected[drawn]) ** 2 / expected[drawn]).sum()
+    dof = drawn.sum() - 1
+    assert statistic <= dof + 5 * np.sqrt(2 * dof)
+
+
+WEIGHTS = [3.0, 0.0, 1.0, 2.5, 0.0, 7.0, 0.5, 1.0, 4.0, 0.0, 2.0]
+
+
+def test_fenwick_draws_in_proportion_to_the_weights():
+    sampler = FenwickSampler(WEIGHTS)
+    rng = random.Random(1)
+
+    assert sampler.total == pytest.approx(sum(WEIGHTS))
+    assert_distribution(counts(lambda: sampler.sample(rng.random), len(WEIGHTS)), WEIGHTS)
+
+
+def test_fenwick_update_changes_the_distribution():
+    sampler = FenwickSampler(WEIGHTS)
+    weights = list(WEIGHTS)
+    for index, weight in [(0, 0.0), (1, 6.0), (5, 1.0), (10, 9.0)]:
+        sampler.update(index, weight)
+        weights[index] = weight
+    rng = random.Random(2)
+
+    assert [sampler.weight(i) for i in range(len(weights))] == weights
+    assert sampler.total == pytest.approx(sum(weights))
+    assert_distribution(counts(lambda: sampler.sample(rng.random), len(weights)), weights)
+
+
+def test_fenwick_never_draws_zero_weights_at_the_edges():
+    # The largest uniform draws land on the last items, which have no weight
+    sampler = FenwickSampler([0.0, 1.0, 2.0, 0.0, 0.0])
+
+    assert {sampler.sample(lambda: u) for u in [0.0, 0.5, 0.999999, 1.0 - 2 ** -53]} <= {1, 2}
+
+
+@pytest.mark.parametrize('weights', [WEIGHTS, [1, 1, 2], [0, 0, 5, 0], [9], [1e-3, 1, 1000]])
+def test_alias_table_draws_in_proportion_to_the_weights(weights):
+    table = AliasTable(weights)
+    rng = random.Random(5)
+
+    assert_distribution(counts(lambda: table.sample(rng.random), len(weights)), weights)
+    assert_distribution(np.bincount(table.sample_k(DRAWS, np.random.default_rng(5)), minlength=len(weights)),
+                        weights)
+
+
+def test_alias_table_single_non_zero_weight_is_always_drawn():
+    table = AliasTable([0, 0, 3, 0], items='abcd')
+
+    assert {table.choice(lambda: u) for u in [0.0, 0.3, 0.6, 0.999999, 1.0 - 2 ** -53]} == {'c'}
+    assert set(table.choices(1000, np.random.default_rng(0)).tolist()) == {'c'}
+
+
+def test_alias_table_rejects_invalid_weights():
+    for weights in [[], [0, 0], [1, -1]]:
+        with pytest.raises(ValueError):
+            AliasTable(weights)
+    with pytest.raises(ValueError):
+        AliasTable([1, 2], items=['a'])
+
+
+@pytest.mark.parametrize('boost', [1.0, 1.2, 1.5])
+def test_customer_sampler_matches_weighted_choices(boost):
+    # The selection it replaced: random.choices over every customer's
+    # segment weight, order count multiplier and month boost
+    rng = np.random.default_rng(0)
+    segments = rng.integers(0, len(SEGMENTS), 300)
+    state = CustomerState(300, segments)
+    state.set_history(np.arange(0, 300, 7), rng.integers(1, 15, 43), 1000)
+    customers = [{'segment': SEGMENTS[segment]} for segment in segments]
+    weights = [SEGMENT_WEIGHTS[SEGMENTS[segment]] * order_count_multiplier(order_count) * boost
+               for segment, order_count in zip(segments, state.order_count)]
+
+    sampler = build_customer_sampler(customers, state)
+    rng = random.Random(3)
+    old = random.Random(4).choices(range(300), weights=weights, k=DRAWS)
+
+    assert_distribution(counts(lambda: sampler.sample(rng.random), 300), weights)
+    assert_distribution(np.bincount(old, minlength=300), weights)
@@ -0,0 +1,146 @@
+import datetime as dt
+import json
+import os
+import shutil
+import threading
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+from salesgen import SalesGenerator
+from salesgen.analysis.cube import SalesCube
+from salesgen.analysis.pipeline import analyze
+from salesgen.analysis.server import DashboardResults, make_server
+from salesgen.analysis.sources import list_partitions
+
+from .conftest import END_DATE, small_generator
+
+
+@pytest.fixture(scope='module')
+def server(csv_dataset):
+    results = DashboardResults(csv_dataset['sales'])
+    results.refresh()
+    server = make_server(results, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+def fetch(url, headers=None):
+    """(status, headers, decoded JSON body or None) of a GET request."""
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            body = response.read()
+            return response.status, response.headers, json.loads(body) if body else None
+    except urllib.error.HTTPError as error:
+        body = error.read()
+        return error.code, error.headers, json.loads(body) if body else None
+
+
+def records(frame):
+    if any(name is not None for name in frame.index.names):
+        frame = frame.reset_index()
+    return json.loads(frame.to_json(orient='records'))
+
+
+@pytest.mark.parametrize('endpoint, table', [
+    ('monthly', 'monthly_summary'),
+    ('quarterly', 'quarterly_sales'),
+    ('daily', 'daily_patterns'),
+    ('seasonal', 'seasonal_df'),
+    ('top-products', 'top_revenue'),
+    ('top-products?by=quantity', 'top_quantity'),
+    ('top-products?by=unit_price', 'highest_priced'),
+])
+def test_endpoints_serve_the_analysis_tables(server, csv_dataset, endpoint, table):
+    status, headers, body = fetch(f'{server}/api/{endpoint}')
+
+    assert status == 200
+    assert headers['Content-Type'] == 'application/json'
+    assert body == records(analyze(csv_dataset['sales'])[table])
+
+
+def test_charts_and_heatmap(server):
+    _, _, heatmap = fetch(f'{server}/api/heatmap')
+    _, _, charts = fetch(f'{server}/api/charts?grain=day')
+
+    assert len(heatmap['z']) == 12
+    assert charts['revenue']['x'][0] == '2023-07-01'
+    assert charts['heatmap'] == heatmap
+
+
+def test_unchanged_responses_are_not_sent_again(server):
+    _, headers, _ = fetch(f'{server}/api/monthly')
+    status, _, body = fetch(f'{server}/api/monthly', {'If-None-Match': headers['ETag']})
+
+    assert status == 304
+    assert body is None
+
+
+def test_unknown_endpoints_list_the_known_ones(server):
+    status, _, body = fetch(f'{server}/api/nothing')
+
+    assert status == 404
+    assert '/api/monthly' in body['endpoints']
+
+
+def test_refresh_picks_up_appended_days(tmp_path):
+    output_dir = str(tmp_path)
+    paths, _ = small_generator(engine='batch', end_date=dt.datetime(2023, 8, 31)).write(output_dir,
+                                                                                       checkpoint=True)
+    results = DashboardResults(paths['sales'])
+    assert results.refresh()
+    months_before = json.loads(results.get('/api/status')[0])['months']
+    assert not results.refresh()
+
+    SalesGenerator.from_checkpoint(output_dir).append(output_dir, END_DATE)
+
+    assert results.refresh()
+    status = json.loads(results.get('/api/status')[0])
+    assert (months_before, status['months'], status['version']) == (2, 4, 2)
+    assert status['transactions'] == len(pd.read_csv(paths['sales']))
+    assert json.loads(results.get('/api/monthly')[0]) == records(analyze(paths['sales'])['monthly_summary'])
+
+
+def test_parquet_source_with_a_cache_directory(parquet_dataset, csv_dataset, tmp_path):
+    results = DashboardResults(parquet_dataset['sales'], cache_dir=str(tmp_path))
+    results.refresh()
+
+    assert json.loads(results.get('/api/monthly')[0]) == records(analyze(csv_dataset['sales'])['monthly_summary'])
+
+
+def test_a_failed_refresh_keeps_serving_the_previous_version(parquet_dataset, tmp_path, monkeypatch):
+    source = str(tmp_path / 'sales')
+    shutil.copytree(parquet_dataset['sales'], source)
+    results = DashboardResults(source)
+    results.refresh()
+    before = dict(results.responses)
+    transactions = results.cube.cells['transactions'].sum()
+    # A removed partition makes the refresh rebuild the cube from every partition
+    os.remove(list_partitions(source)[-1].path)
+
+    scan, calls = SalesCube.scan, []
+
+    def failing_scan(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise OSError('read failed')
+        return scan(*args, **kwargs)
+
+    monkeypatch.setattr(SalesCube, 'scan', failing_scan)
+    with pytest.raises(OSError):
+        results.refresh()
+    assert results.responses == before
+    assert results.cube.cells['transactions'].sum() == transactions
+
+    monkeypatch.undo()
+    assert results.refresh()
+    status = json.loads(results.get('/api/status')[0])
+    expected = analyze(source)['monthly_summary']
+    assert (status['version'], status['transactions']) == (2, expected['transaction_count'].sum())
+    assert json.loads(results.get('/api/monthly')[0]) == records(expected)
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from salesgen.analysis.pipeline import analyze
+from salesgen.analysis.sketches import DistinctCounter, relative_error
+
+# Three standard errors, the bound the sketches module documents for 99.7% of estimates
+BOUND = 3 * relative_error(14)
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def customer_ids(start, stop):
+    return np.array([f'C{i:07d}' for i in range(start, stop)], dtype=object)
+
+
+@pytest.mark.parametrize('n', [100, 5_000, 60_000, 250_000])
+def test_approx_counts_are_within_the_documented_error(n):
+    counter = DistinctCounter('approx', 14)
+    ids = customer_ids(0, n)
+    # Every ID twice, in two chunks
+    counter.add(np.zeros(n, dtype=np.int64), ids)
+    counter.add(np.zeros(n, dtype=np.int64), ids[::-1])
+
+    assert abs(counter.count(0) - n) <= BOUND * n
+
+
+def test_merged_sketches_equal_the_sketch_of_the_union():
+    first, second, whole = (DistinctCounter('approx', 14) for _ in range(3))
+    months = np.repeat([202301, 202302], 30_000)
+    ids = np.concatenate([customer_ids(0, 30_000), customer_ids(20_000, 50_000)])
+    first.add(months[:40_000], ids[:40_000])
+    second.add(months[40_000:], ids[40_000:])
+    whole.add(months, ids)
+
+    first.merge(second)
+
+    pd.testing.assert_frame_equal(first.to_frame(), whole.to_frame())
+    assert first.count(202301, 202302) == whole.count(202301, 202302)
+    assert abs(whole.count(202301, 202302) - 50_000) <= BOUND * 50_000
+
+
+def test_merge_needs_the_same_mode_and_precision():
+    with pytest.raises(ValueError):
+        DistinctCounter('approx', 14).merge(DistinctCounter('approx', 12))
+    with pytest.raises(ValueError):
+        DistinctCounter('exact').merge(DistinctCounter('approx'))
+
+
+def test_approx_monthly_customers_are_within_the_error_of_exact(csv_dataset, tmp_path):
+    subprocess.run([sys.executable, '-m', 'salesgen.analysis', csv_dataset['sales'], '--distinct', 'approx',
+                    '--output-dir', str(tmp_path)], cwd=REPOSITORY, check=True, capture_output=True)
+    approx = pd.read_csv(tmp_path / 'monthly_summary_enhanced.csv')
+    exact = analyze(csv_dataset['sales'])['monthly_summary']
+
+    assert list(approx['month_year']) == list(exact['month_year'])
+    error = (approx['unique_customers'] - exact['unique_customers']).abs()
+    assert (error <= BOUND * exact['unique_customers']).all()
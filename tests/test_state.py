@@ -0,0 +1,54 @@
+import datetime as dt
+
+import numpy as np
+import pytest
+
+from salesgen.state import LOYALTY_TIERS, CustomerState, day_number, loyalty_code, loyalty_codes
+
+FIELDS = ['order_count', 'total_spent', 'last_purchase_day', 'loyalty', 'segment']
+
+
+def seeded_state(rng, n_customers=50):
+    state = CustomerState(n_customers, rng.integers(0, 3, n_customers))
+    state.set_history(np.arange(0, n_customers, 4), rng.integers(1, 12, len(range(0, n_customers, 4))),
+                      rng.integers(500, 5000, len(range(0, n_customers, 4))))
+    return state
+
+
+def assert_same_state(state, expected):
+    for name in FIELDS:
+        np.testing.assert_array_equal(getattr(state, name), getattr(expected, name), err_msg=name)
+
+
+def test_batch_update_matches_one_purchase_at_a_time():
+    rng = np.random.default_rng(0)
+    batched, looped = seeded_state(rng), seeded_state(np.random.default_rng(0))
+    start = dt.date(2023, 11, 20)
+    for offset in range(10):
+        day = day_number(start + dt.timedelta(days=offset))
+        # Few customers per day, so most of them buy several times in a batch
+        ordinals = rng.integers(0, 50, 120)
+        total_sales = rng.uniform(5, 2000, 120).round(2)
+
+        batched.record_purchases(ordinals, total_sales, day)
+        for ordinal, amount in zip(ordinals.tolist(), total_sales.tolist()):
+            looped.record_purchase(ordinal, amount, day)
+
+        assert_same_state(batched, looped)
+
+
+def test_repeat_customer_in_one_batch():
+    state = CustomerState(3)
+    state.record_purchases(np.array([1, 1, 1, 1, 1, 2]), np.array([10.0, 20.0, 30.0, 40.0, 50.0, 5.0]), 100)
+
+    assert state.order_count.tolist() == [0, 5, 1]
+    assert state.total_spent.tolist() == [0.0, 150.0, 5.0]
+    assert state.last_purchase_day.tolist()[1:] == [100, 100]
+    assert [state.loyalty_tier(i) for i in range(3)] == ['New', 'Silver', 'Bronze']
+
+
+@pytest.mark.parametrize('order_count, tier', [(0, 'New'), (1, 'Bronze'), (4, 'Bronze'), (5, 'Silver'),
+                                               (9, 'Silver'), (10, 'Gold'), (100, 'Gold')])
+def test_loyalty_codes_match_the_scalar_rule(order_count, tier):
+    assert LOYALTY_TIERS[loyalty_code(order_count)] == tier
+    assert loyalty_codes(np.array([order_count]))[0] == loyalty_code(order_count)
@@ -0,0 +1,96 @@
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from salesgen.stream import Pacer
+
+
+def stream_frame(generator, **options):
+    """Stream ``generator`` into memory; return the events as a DataFrame and the stats."""
+    sink = io.BytesIO()
+    stats = generator.stream(sink, **options)
+    events = [json.loads(line) for line in sink.getvalue().decode('utf-8').splitlines()]
+    return pd.DataFrame(events), stats
+
+
+@pytest.mark.parametrize('engine', ['loop', 'batch'])
+def test_events_without_timestamp_are_the_generated_rows(make_generator, engine):
+    events, stats = stream_frame(make_generator(engine=engine))
+    rows = make_generator(engine=engine).generate()
+
+    assert (stats['events'], stats['days'], stats['stalls']) == (len(rows), 123, 0)
+    pd.testing.assert_frame_equal(events.drop(columns='timestamp'), rows)
+
+
+def test_timestamps_fall_within_their_day_in_transaction_order(make_generator):
+    events, _ = stream_frame(make_generator(engine='batch'))
+    timestamps = pd.to_datetime(events['timestamp'])
+
+    assert (timestamps.dt.strftime('%Y-%m-%d') == events['date']).all()
+    assert timestamps.is_monotonic_increasing
+
+
+def test_limit_stops_an_endless_stream(make_generator):
+    events, stats = stream_frame(make_generator(engine='batch'), endless=True, limit=1000)
+    rows = make_generator(engine='batch').generate()
+
+    assert stats['events'] == len(events) == 1000
+    pd.testing.assert_frame_equal(events.drop(columns='timestamp'), rows.head(1000))
+
+
+class FakeClock:
+    """A clock that only moves when slept on, or when a test advances it."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        self.slept += seconds
+
+
+def test_rate_spaces_blocks_by_their_size():
+    clock = FakeClock()
+    pacer = Pacer(rate=1000, clock=clock, sleep=clock.sleep)
+    for _ in range(5):
+        pacer.wait(100, 0)
+
+    assert clock.now == pytest.approx(0.4)
+    assert pacer.stalls == 0
+
+
+def test_compression_waits_for_simulated_time():
+    clock = FakeClock()
+    pacer = Pacer(compression=86400, clock=clock, sleep=clock.sleep)
+    pacer.wait(10, 0)
+    pacer.wait(10, 86400 * 2)
+
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_a_late_stream_moves_its_schedule_instead_of_bursting():
+    clock = FakeClock()
+    pacer = Pacer(rate=100, max_lag=1.0, clock=clock, sleep=clock.sleep)
+    pacer.wait(100, 0)
+    clock.now += 5.0
+    pacer.wait(100, 0)
+    pacer.wait(100, 0)
+
+    assert (pacer.stalls, pacer.lag) == (1, pytest.approx(4.0))
+    # The next block is due a full second after the late one, not straight away
+    assert clock.slept == pytest.approx(1.0)
+
+
+def test_unpaced_blocks_cover_the_day():
+    seconds = list(range(100000))
+
+    blocks = Pacer().blocks(seconds, 0)
+
+    assert blocks[0][0] == 0 and blocks[-1][1] == 100000
+    assert all(end == start for (_, end), (start, _) in zip(blocks, blocks[1:]))
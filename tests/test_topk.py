@@ -0,0 +1,51 @@
+"""ProductTotals against the notebook's groupby(...).sum().nlargest(n)."""
+import pandas as pd
+import pytest
+
+from salesgen.analysis.topk import ProductTotals
+
+RANKINGS = [
+    ('revenue', {'total_sales': 'sum', 'quantity': 'sum'}, 'total_sales'),
+    ('quantity', {'quantity': 'sum', 'total_sales': 'sum'}, 'quantity'),
+    ('unit_price', {'unit_price': 'mean', 'total_sales': 'sum'}, 'unit_price'),
+]
+
+
+@pytest.fixture(scope='module')
+def df_sales(csv_dataset):
+    return pd.read_csv(csv_dataset['sales'])
+
+
+def assert_same_ranking(result, expected):
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_index_type=False)
+
+
+@pytest.mark.parametrize('by, aggregations, order', RANKINGS)
+def test_rankings_by_product(df_sales, by, aggregations, order):
+    expected = df_sales.groupby(['product_id', 'product_name']).agg(aggregations).nlargest(10, order)
+
+    assert_same_ranking(ProductTotals.from_frame(df_sales, chunk_rows=500).top(10, by), expected)
+
+
+@pytest.mark.parametrize('by, aggregations, order', RANKINGS)
+def test_rankings_by_product_name(df_sales, by, aggregations, order):
+    # The mode scripts/data_generate.py uses: products sharing a name are summed together
+    expected = df_sales.groupby('product_name').agg(aggregations).nlargest(5, order)
+
+    assert_same_ranking(ProductTotals.from_frame(df_sales, key='product_name').top(5, by), expected)
+
+
+@pytest.mark.parametrize('key', ['product_id', 'product_name'])
+def test_merged_partial_totals_equal_one_pass(df_sales, key):
+    whole = ProductTotals.from_frame(df_sales, key=key)
+    merged = ProductTotals.from_frame(df_sales.iloc[:1500], key=key)
+    merged.merge(ProductTotals.from_frame(df_sales.iloc[1500:], key=key))
+
+    pd.testing.assert_frame_equal(merged.totals().sort_index(), whole.totals().sort_index())
+    for by, ranking in whole.tops().items():
+        assert_same_ranking(merged.tops()[by], ranking)
+
+
+def test_merge_needs_the_same_key():
+    with pytest.raises(ValueError):
+        ProductTotals('product_id').merge(ProductTotals('product_name'))